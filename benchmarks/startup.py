@@ -0,0 +1,80 @@
+"""
+Startup benchmark: the import time of wn_editor and whether the heavy modules of wn are loaded by the import.
+
+Every statement runs ``--repeat`` times in a fresh interpreter with ``-X importtime``; the median of the summed self
+times of the modules it imports (without those every interpreter imports at startup) is reported. The heavy modules
+are loaded if they show up in the import time log, i.e. if they were executed during the import (lazily loaded modules
+are only executed on first attribute access).
+
+    python benchmarks/startup.py [--repeat 5]
+
+Exits with status 1 if one of the wn_editor imports loads one of the heavy modules.
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+STATEMENTS = {
+    "import wn_editor": True,
+    "import wn_editor.editor": True,
+    "from wn_editor import SynsetEditor": True,
+    "import wn_editor.cli": True,
+    # For comparison: what the editors load on their first database access
+    "import wn": False,
+}
+
+HEAVY_MODULES = ("wn._add", "wn._queries", "wn.lmf")
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def _import_times(statement: str) -> dict[str, float]:
+    """
+    Returns the self time in seconds of every module imported by the interpreter running the statement
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement], cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "self [us]" not in line:
+            own, _, name = (part.strip() for part in line[len("import time:"):].split("|"))
+            times[name] = int(own) / 1e6
+    return times
+
+
+def measure(statement: str, startup: set[str]) -> tuple[float, set[str]]:
+    """
+    Returns the import time of the statement in seconds and the modules it imports, without those in ``startup``
+    """
+    times = {name: own for name, own in _import_times(statement).items() if name not in startup}
+    return sum(times.values()), set(times)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=5, help="runs per statement")
+    args = parser.parse_args(argv)
+
+    startup = set(_import_times("pass"))
+    failed = False
+    print(f"{'statement':<38}{'median ms':>10}{'min ms':>9}  heavy modules loaded")
+    for statement, lazy in STATEMENTS.items():
+        runs = [measure(statement, startup) for _ in range(args.repeat)]
+        totals = [total for total, _ in runs]
+        loaded = [name for name in HEAVY_MODULES if name in runs[0][1]]
+        print(
+            f"{statement:<38}{statistics.median(totals) * 1000:>10.1f}{min(totals) * 1000:>9.1f}  "
+            f"{', '.join(loaded) or '-'}"
+        )
+        failed |= lazy and bool(loaded)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
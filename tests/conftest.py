@@ -0,0 +1,23 @@
+import pytest
+import wn
+
+from wn_editor.editor import LexiconEditor, RelationType, connect
+
+
+@pytest.fixture
+def conn(tmp_path, monkeypatch):
+    """
+    The connection to a fresh wn database with all relation types of the editors
+    """
+    monkeypatch.setattr(wn.config, "data_directory", tmp_path)
+    conn = connect()
+    conn.executemany("INSERT INTO relation_types VALUES (?,?)", [(t.value, t.name) for t in RelationType])
+    conn.commit()
+    yield conn
+    conn.close()
+    wn._db.pool.clear()
+
+
+@pytest.fixture
+def lexicon(conn):
+    return LexiconEditor.create_new_lexicon("x", "X", "en", "a@b.c", "MIT", "1")
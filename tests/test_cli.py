@@ -0,0 +1,84 @@
+import json
+import sqlite3
+
+from wn_editor.cli import main
+from wn_editor.editor import RelationType, Workspace, _statements
+
+
+def _database(path):
+    workspace = Workspace(path)
+    conn = workspace.connect()
+    conn.executemany("INSERT INTO relation_types VALUES (?,?)", [(t.value, t.name) for t in RelationType])
+    workspace.close()
+    return path
+
+
+def _write(path, ops):
+    path.write_text("".join(json.dumps(op) + "\n" for op in ops), encoding="utf-8")
+    return path
+
+
+def _apply(database, path):
+    return main(["--database", str(database), "apply", str(path), "--lexicon", "x"])
+
+
+def test_apply_relations_with_database(tmp_path):
+    database = _database(tmp_path / "build.db")
+    lexicon = {"op": "create_lexicon", "id": "x", "label": "X", "language": "en", "email": "a@b.c", "license": "MIT",
+               "version": "1"}
+    synsets = [{"op": "create_synset", "ref": ref, "words": [ref]} for ref in ("animal", "dog", "cat")]
+    relations = [
+        {"op": "add_relation", "source": "animal", "target": "dog", "type": "hypernym"},
+        {"op": "add_relation", "source": "animal", "target": "cat", "type": "hypernym"},
+        {"op": "delete_relation", "source": "animal", "target": "cat", "type": "hypernym"},
+    ]
+    assert _apply(database, _write(tmp_path / "ops.jsonl", [lexicon, *synsets, *relations])) == 0
+
+    conn = sqlite3.connect(database)
+    rows = conn.execute(
+        """
+        SELECT f_src.form, f_tgt.form, r.type_rowid FROM synset_relations AS r
+        JOIN senses AS s_src ON s_src.synset_rowid = r.source_rowid
+        JOIN forms AS f_src ON f_src.entry_rowid = s_src.entry_rowid
+        JOIN senses AS s_tgt ON s_tgt.synset_rowid = r.target_rowid
+        JOIN forms AS f_tgt ON f_tgt.entry_rowid = s_tgt.entry_rowid
+        """
+    ).fetchall()
+    conn.close()
+    assert rows == [("animal", "dog", RelationType.hypernym)]
+
+
+def test_apply_generates_ids_once_per_batch(tmp_path):
+    database = _database(tmp_path / "build.db")
+    lexicon = {"op": "create_lexicon", "id": "x", "label": "X", "language": "en", "email": "a@b.c", "license": "MIT",
+               "version": "1"}
+    synsets = [{"op": "create_synset", "words": [f"w{n}", f"v{n}"]} for n in range(30)]
+    _statements.reset_stats()
+    assert main(["--database", str(database), "apply", str(_write(tmp_path / "ops.jsonl", [lexicon, *synsets])),
+                 "--lexicon", "x", "--batch-size", "10"]) == 0
+    statements = _statements.stats()["statements"]
+    assert statements["synsets.max_generated_id"] == 4
+    assert statements["entries.max_generated_id"] == 4
+
+    conn = sqlite3.connect(database)
+    assert [r[0] for r in conn.execute("SELECT id FROM synsets ORDER BY rowid")] == [f"x-{n}-u" for n in range(30)]
+    assert [r[0] for r in conn.execute("SELECT id FROM entries ORDER BY rowid")] == [f"w{n}" for n in range(60)]
+    conn.close()
+
+
+def test_resume_skips_committed_lines_unparsed(tmp_path):
+    database = _database(tmp_path / "build.db")
+    lexicon = {"op": "create_lexicon", "id": "x", "label": "X", "language": "en", "email": "a@b.c", "license": "MIT",
+               "version": "1"}
+    path = _write(tmp_path / "ops.jsonl", [lexicon, {"op": "create_synset", "ref": "dog", "words": ["dog"]}])
+    assert _apply(database, path) == 0
+    # The committed lines are not parsed again
+    path.write_text(
+        "not json\nnot json either\n" + json.dumps({"op": "add_word", "synset": "dog", "word": "hound"}) + "\n",
+        encoding="utf-8",
+    )
+    assert _apply(database, path) == 0
+
+    conn = sqlite3.connect(database)
+    assert conn.execute("SELECT count(*) FROM senses").fetchone()[0] == 2
+    conn.close()
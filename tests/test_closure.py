@@ -0,0 +1,75 @@
+import sqlite3
+
+import pytest
+import wn
+
+from wn_editor import closure
+from wn_editor.editor import LexiconEditor, RelationType, SynsetEditor, Workspace, transaction
+
+
+@pytest.fixture
+def hierarchy(conn, lexicon):
+    closure.enable_hypernym_closure()
+    animal = lexicon.create_synset().add_word("animal")
+    mammal = lexicon.create_synset().add_word("mammal")
+    dog = lexicon.create_synset().add_word("dog")
+    animal.set_relation_to_synset(mammal, RelationType.hypernym)
+    mammal.set_relation_to_synset(dog, RelationType.hypernym)
+    yield animal, mammal, dog
+    closure.disable_hypernym_closure()
+
+
+def test_relations_added(hierarchy):
+    animal, mammal, dog = hierarchy
+    assert closure.ancestors(dog) == [(mammal.rowid, 1), (animal.rowid, 2)]
+    assert closure.descendants(animal) == [(mammal.rowid, 1), (dog.rowid, 2)]
+    assert closure.depth_between(dog, animal) == 2
+    assert closure.depth_between(animal, dog) is None
+
+
+def test_relation_and_synset_deleted(hierarchy):
+    animal, mammal, dog = hierarchy
+    mammal.delete_relation_to_synset(dog, RelationType.hypernym)
+    assert closure.ancestors(dog) == []
+    assert closure.descendants(animal) == [(mammal.rowid, 1)]
+
+    mammal.set_relation_to_synset(dog, RelationType.hypernym)
+    SynsetEditor.from_rowid(mammal.rowid).delete()
+    assert closure.ancestors(dog) == []
+    assert closure.descendants(animal) == []
+
+
+def test_rebuild_matches_maintained_closure(hierarchy):
+    animal, _, dog = hierarchy
+    dog.set_relation_to_synset(LexiconEditor("x").create_synset().add_word("puppy"), RelationType.hypernym)
+    maintained = closure.descendants(animal)
+    closure.rebuild_hypernym_closure()
+    assert closure.descendants(animal) == maintained
+
+
+def test_enable_inside_transaction(tmp_path):
+    workspace = Workspace(tmp_path / "build.db")
+    workspace.connect().executemany(
+        "INSERT INTO relation_types VALUES (?,?)", [(t.value, t.name) for t in RelationType]
+    )
+    with workspace:
+        with transaction():
+            lexicon = LexiconEditor.create_new_lexicon("x", "X", "en", "a@b.c", "MIT", "1")
+            closure.enable_hypernym_closure()
+            animal = lexicon.create_synset().add_word("animal")
+            dog = lexicon.create_synset().add_word("dog")
+            animal.set_relation_to_synset(dog, RelationType.hypernym)
+            assert closure.ancestors(dog) == [(animal.rowid, 1)]
+        assert closure.ancestors(dog) == [(animal.rowid, 1)]
+    workspace.close()
+
+
+def test_no_attach_inside_open_transaction(tmp_path):
+    workspace = Workspace(tmp_path / "build.db")
+    workspace.connect()
+    workspace.close()
+    conn = sqlite3.connect(tmp_path / "build.db")
+    conn.execute("INSERT INTO relation_types VALUES (1, 'also')")
+    with pytest.raises(wn.Error):
+        Workspace(conn)
+    conn.close()
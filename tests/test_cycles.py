@@ -0,0 +1,71 @@
+import pytest
+
+from wn_editor import cycles
+from wn_editor.cycles import CycleError
+from wn_editor.editor import RelationType
+
+
+@pytest.fixture
+def hierarchy(conn, lexicon):
+    animal = lexicon.create_synset().add_word("animal")
+    mammal = lexicon.create_synset().add_word("mammal")
+    dog = lexicon.create_synset().add_word("dog")
+    animal.set_relation_to_synset(mammal, RelationType.hypernym)
+    mammal.set_relation_to_synset(dog, RelationType.hypernym)
+    yield animal, mammal, dog
+    cycles.disable_cycle_guard(lexicon)
+
+
+def _relations(conn):
+    return conn.execute("SELECT count(*) FROM synset_relations").fetchone()[0]
+
+
+def test_reject(conn, lexicon, hierarchy):
+    animal, mammal, dog = hierarchy
+    cycles.enable_cycle_guard(lexicon)
+    with pytest.raises(CycleError):
+        dog.set_relation_to_synset(animal, RelationType.hypernym)
+    # The same cycle expressed from the other end
+    with pytest.raises(CycleError):
+        animal.set_relation_to_synset(dog, RelationType.hyponym)
+    assert _relations(conn) == 2
+    assert cycles.find_cycles(lexicon, "hypernym") == {"hypernym": []}
+
+    # Other families and non-hierarchical relations are not affected
+    dog.set_relation_to_synset(animal, RelationType.holo_member)
+    dog.set_relation_to_synset(animal, RelationType.also)
+    assert _relations(conn) == 4
+
+
+def test_deleted_relation_is_no_longer_guarded(conn, lexicon, hierarchy):
+    animal, mammal, dog = hierarchy
+    cycles.enable_cycle_guard(lexicon)
+    mammal.delete_relation_to_synset(dog, RelationType.hypernym)
+    dog.set_relation_to_synset(animal, RelationType.hypernym)
+    assert _relations(conn) == 2
+
+
+def test_report(conn, lexicon, hierarchy, caplog):
+    animal, mammal, dog = hierarchy
+    guard = cycles.enable_cycle_guard(lexicon, mode="report")
+    assert cycles.get_cycle_guard(lexicon) is guard
+    dog.set_relation_to_synset(animal, RelationType.hypernym)
+    assert guard.reported == [("hypernym", animal.rowid, dog.rowid)]
+    assert "creates a cycle" in caplog.text
+    assert _relations(conn) == 3
+    assert sorted(cycles.find_cycles(lexicon)["hypernym"][0]) == sorted([animal.rowid, mammal.rowid, dog.rowid])
+
+
+def test_find_cycles_without_guard(conn, lexicon, hierarchy):
+    animal, mammal, dog = hierarchy
+    dog.set_relation_to_synset(mammal, RelationType.holo_part)
+    mammal.set_relation_to_synset(dog, RelationType.holo_part)
+    assert cycles.get_cycle_guard(lexicon) is None
+    found = cycles.find_cycles(lexicon)
+    assert found["hypernym"] == []
+    assert [sorted(cycle) for cycle in found["holo_part"]] == [sorted([mammal.rowid, dog.rowid])]
+
+
+def test_unknown_mode(lexicon):
+    with pytest.raises(AttributeError):
+        cycles.enable_cycle_guard(lexicon, mode="ignore")
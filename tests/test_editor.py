@@ -0,0 +1,127 @@
+import sqlite3
+
+import pytest
+import wn
+
+from wn_editor.editor import FormEditor, IliStatus
+
+
+def test_bulk_create_forms(conn, lexicon):
+    entry = lexicon.create_entry().entry_id
+    forms = [
+        {"entry_rowid": entry, "form": "colour", "rank": 0},
+        {"entry_rowid": entry, "form": "color", "rank": 1, "script": "Latn", "tags": [("US", "dialect")],
+         "pronunciations": ["ˈkʌlɚ", {"pronunciation": "ˈkʌlə", "variety": "GB"}]},
+    ]
+    rowids = FormEditor.bulk_create(iter(forms), chunk_size=1)
+    assert conn.execute("SELECT rowid, form, rank FROM forms ORDER BY rowid").fetchall() == [
+        (rowids[0], "colour", 0), (rowids[1], "color", 1)
+    ]
+    assert conn.execute("SELECT form_rowid, value, variety FROM pronunciations ORDER BY rowid").fetchall() == [
+        (rowids[1], "ˈkʌlɚ", None), (rowids[1], "ˈkʌlə", "GB")
+    ]
+    assert conn.execute("SELECT form_rowid, tag, category FROM tags").fetchall() == [(rowids[1], "US", "dialect")]
+    assert not conn.in_transaction
+
+
+def test_bulk_create_unknown_entry_rolls_back(conn, lexicon):
+    entry = lexicon.create_entry().entry_id
+    with pytest.raises(AttributeError):
+        FormEditor.bulk_create([{"entry_rowid": entry, "form": "a"}, {"entry_rowid": entry + 1, "form": "b"}])
+    assert conn.execute("SELECT count(*) FROM forms").fetchone()[0] == 0
+
+
+def test_bulk_create_holds_the_write_lock(conn, lexicon):
+    entry = lexicon.create_entry().entry_id
+    other = sqlite3.connect(wn.config.database_path, timeout=0)
+
+    def forms():
+        # The rowids are already allocated, no other connection may insert forms now
+        with pytest.raises(sqlite3.OperationalError, match="locked"):
+            other.execute("INSERT INTO forms (lexicon_rowid, entry_rowid, form) VALUES (?, ?, 'b')",
+                          (lexicon.lex_rowid, entry))
+        yield {"entry_rowid": entry, "form": "a"}
+
+    FormEditor.bulk_create(forms())
+    other.close()
+    assert conn.execute("SELECT form FROM forms").fetchall() == [("a",)]
+
+
+def test_add_syntactic_behaviours(conn, lexicon):
+    lexicon.create_synset().add_word("run").add_word("jog")
+    run, jog = (r[0] for r in conn.execute("SELECT rowid FROM senses ORDER BY rowid"))
+    used = lexicon.add_syntactic_behaviours(
+        [("Somebody ----s", run), ("Somebody ----s", jog), ("Somebody ----s something", run)],
+        frame_ids={"Somebody ----s": "vi"},
+    )
+    assert conn.execute("SELECT rowid, id, frame FROM syntactic_behaviours ORDER BY rowid").fetchall() == [
+        (used["Somebody ----s"], "vi", "Somebody ----s"),
+        (used["Somebody ----s something"], None, "Somebody ----s something"),
+    ]
+    again = lexicon.add_syntactic_behaviours([("Somebody ----s", run), ("Somebody ----s", jog)])
+    assert again == {"Somebody ----s": used["Somebody ----s"]}
+    assert conn.execute("SELECT count(*) FROM syntactic_behaviours").fetchone()[0] == 2
+    assert conn.execute("SELECT count(*) FROM syntactic_behaviour_senses").fetchone()[0] == 3
+
+
+def test_add_syntactic_behaviours_holds_the_write_lock(conn, lexicon):
+    lexicon.create_synset().add_word("run")
+    sense = conn.execute("SELECT rowid FROM senses").fetchone()[0]
+    other = sqlite3.connect(wn.config.database_path, timeout=0)
+
+    def assignments():
+        with pytest.raises(sqlite3.OperationalError, match="locked"):
+            other.execute(
+                "INSERT INTO syntactic_behaviours (lexicon_rowid, frame) VALUES (?, 'b')", (lexicon.lex_rowid,)
+            )
+        yield "Somebody ----s", sense
+
+    lexicon.add_syntactic_behaviours(assignments())
+    other.close()
+    assert conn.execute("SELECT frame FROM syntactic_behaviours").fetchall() == [("Somebody ----s",)]
+
+
+def test_set_ilis(conn, lexicon):
+    conn.execute("INSERT INTO ilis VALUES (null, 'i1', 1, 'known', null)")
+    conn.commit()
+    first = lexicon.create_synset().add_word("dog").as_synset().id
+    second = lexicon.create_synset().add_word("cat").as_synset().id
+    assert lexicon.set_ilis({first: "i1", second: "i2"}) == {first: "i1", second: "i2"}
+    assert conn.execute(
+        "SELECT ss.id, i.id, i.status_rowid FROM synsets AS ss JOIN ilis AS i ON i.rowid = ss.ili_rowid "
+        "ORDER BY ss.rowid"
+    ).fetchall() == [(first, "i1", 1), (second, "i2", IliStatus.presupposed.value)]
+
+    assert lexicon.set_ilis({second: None}) == {second: None}
+    assert conn.execute("SELECT ili_rowid FROM synsets WHERE id = ?", (second,)).fetchone()[0] is None
+    assert conn.execute("SELECT count(*) FROM ilis").fetchone()[0] == 2
+
+
+def test_set_ilis_new(conn, lexicon):
+    conn.execute("INSERT INTO ilis VALUES (null, 'i1', 1, 'known', null)")
+    conn.commit()
+    synset = lexicon.create_synset().add_word("dog").as_synset().id
+    lexicon.set_ilis({synset: "i1"})
+
+    with pytest.raises(AttributeError):
+        lexicon.set_ilis({synset: "new"})
+    assert lexicon.set_ilis({synset: "new"}, {synset: "a new concept"}) == {synset: "in"}
+    assert conn.execute("SELECT ili_rowid FROM synsets").fetchone()[0] is None
+    assert conn.execute("SELECT id FROM ilis").fetchall() == [("i1",)]
+    assert conn.execute("SELECT definition FROM proposed_ilis").fetchall() == [("a new concept",)]
+
+    lexicon.set_ilis({synset: "i1"})
+    assert conn.execute("SELECT count(*) FROM proposed_ilis").fetchone()[0] == 0
+
+
+def test_set_ilis_unknown_synset(conn, lexicon):
+    with pytest.raises(AttributeError):
+        lexicon.set_ilis({"x-missing": "i1"})
+
+
+def test_delete_word_keeps_senses_in_other_synsets(conn, lexicon):
+    dog = lexicon.create_synset().add_word("dog").add_word("hound")
+    other = lexicon.create_synset().add_word("dog")
+    dog.delete_word("dog")
+    assert conn.execute("SELECT synset_rowid FROM senses ORDER BY rowid").fetchall() == [(dog.rowid,), (other.rowid,)]
+    assert [sense.word().lemma() for sense in other.as_synset().senses()] == ["dog"]
@@ -0,0 +1,74 @@
+import pytest
+import wn
+
+from wn_editor import cycles
+from wn_editor.editor import RelationType, transaction
+from wn_editor.explain import dry_run
+
+
+def _counts(conn):
+    return [conn.execute(f"SELECT count(*) FROM {table}").fetchone()[0] for table in ("synsets", "entries", "senses")]
+
+
+def test_dry_run_rolls_back(conn, lexicon):
+    before = _counts(conn)
+    with dry_run() as report:
+        synset = lexicon.create_synset().add_word("dog")
+        assert _counts(conn) == [n + 1 for n in before]
+    assert _counts(conn) == before
+    assert not conn.in_transaction
+
+    assert set(report.methods) == {"LexiconEditor.create_synset", "SynsetEditor.add_word"}
+    assert all(method.calls == 1 for method in report.methods.values())
+    for name in ("synsets.insert", "entries.insert", "senses.insert"):
+        assert report.statements[name].executions == 1
+        assert report.statements[name].rows == 1
+    assert report.executions == sum(m.executions for m in report.methods.values())
+    assert report.rows == sum(m.rows for m in report.methods.values()) >= 3
+    # Every method commits after each changing statement outside of a transaction
+    assert report.commits == report.rows
+    assert report.statements["synsets.insert"].plan == []
+    assert report.statements["synsets.rowid_by_id_lexicon_rowid"].plan
+    assert str(report).startswith(f"{report.executions} statements, {report.rows} changed rows")
+
+    # The rolled back synset is gone, its ID is free again
+    assert lexicon.create_synset().add_word("dog").rowid == synset.rowid
+
+
+def test_dry_run_counts_one_commit_per_transaction(conn, lexicon):
+    with dry_run() as report:
+        with transaction():
+            lexicon.create_synset().add_word("dog").add_word("hound")
+    assert report.commits == 1
+    assert report.methods["SynsetEditor.add_word"].calls == 2
+    assert _counts(conn) == [0, 0, 0]
+
+
+def test_dry_run_rolls_back_on_error(conn, lexicon):
+    with pytest.raises(KeyError):
+        with dry_run():
+            lexicon.create_synset().add_word("dog")
+            raise KeyError
+    assert _counts(conn) == [0, 0, 0]
+
+
+def test_dry_run_reloads_cycle_guards(conn, lexicon):
+    animal = lexicon.create_synset().add_word("animal")
+    dog = lexicon.create_synset().add_word("dog")
+    cycles.enable_cycle_guard(lexicon)
+    with dry_run():
+        animal.set_relation_to_synset(dog, RelationType.hypernym)
+    # The relation was rolled back, so the reverse one is no cycle
+    dog.set_relation_to_synset(animal, RelationType.hypernym)
+    cycles.disable_cycle_guard(lexicon)
+
+
+def test_no_nested_dry_run(conn, lexicon):
+    with dry_run():
+        with pytest.raises(wn.Error):
+            with dry_run():
+                pass
+    with transaction():
+        with pytest.raises(wn.Error):
+            with dry_run():
+                pass
@@ -0,0 +1,96 @@
+import pytest
+
+from wn_editor import history
+from wn_editor.editor import RelationType, SynsetEditor, Workspace, transaction
+
+TABLES = ("synsets", "senses", "entries", "forms", "synset_relations", "definitions", "synset_examples")
+
+
+def _counts(conn):
+    return [conn.execute(f"SELECT count(*) FROM {table}").fetchone()[0] for table in TABLES]
+
+
+@pytest.fixture
+def undo(conn):
+    history.enable_undo()
+    yield
+    history.disable_undo()
+
+
+def test_undo_redo_round_trip(conn, lexicon, undo):
+    before = _counts(conn)
+    animal = lexicon.create_synset().add_word("animal")
+    dog = lexicon.create_synset().add_word("dog")
+    animal.set_relation_to_synset(dog, RelationType.hypernym)
+    dog.add_definition("a domestic dog")
+    after = _counts(conn)
+
+    assert history.undo() == 1
+    assert conn.execute("SELECT count(*) FROM definitions").fetchone()[0] == 0
+    assert history.undo(10) == 5
+    assert _counts(conn) == before
+    assert not history.can_undo()
+
+    assert history.redo(10) == 6
+    assert _counts(conn) == after
+    assert conn.execute("SELECT definition FROM definitions").fetchone()[0] == "a domestic dog"
+    assert not history.can_redo()
+
+
+def test_undo_cascaded_delete(conn, lexicon, undo):
+    animal = lexicon.create_synset().add_word("animal")
+    dog = lexicon.create_synset().add_word("dog").add_definition("a domestic dog").add_example("the dog barked")
+    animal.set_relation_to_synset(dog, RelationType.hypernym)
+    before = _counts(conn)
+
+    SynsetEditor.from_rowid(dog.rowid).delete()
+    assert conn.execute("SELECT count(*) FROM synset_relations").fetchone()[0] == 0
+    assert conn.execute("SELECT count(*) FROM synset_examples").fetchone()[0] == 0
+
+    assert history.undo() == 1
+    assert _counts(conn) == before
+    assert history.redo() == 1
+    assert conn.execute("SELECT count(*) FROM synsets WHERE rowid = ?", (dog.rowid,)).fetchone()[0] == 0
+
+
+def test_new_change_clears_redo(conn, lexicon, undo):
+    lexicon.create_synset().add_word("dog")
+    history.undo()
+    assert history.can_redo()
+    lexicon.create_synset().add_word("cat")
+    assert not history.can_redo()
+
+
+def test_step_and_rolled_back_transaction(conn, lexicon, undo):
+    with history.step():
+        lexicon.create_synset().add_word("dog")
+        lexicon.create_synset().add_word("cat")
+    with pytest.raises(ValueError):
+        with transaction():
+            lexicon.create_synset().add_word("bird")
+            raise ValueError
+    assert history.undo(10) == 1
+    assert conn.execute("SELECT count(*) FROM synsets").fetchone()[0] == 0
+
+
+def test_max_steps(conn, lexicon):
+    history.enable_undo(max_steps=2)
+    try:
+        for word in ("dog", "cat", "bird"):
+            with history.step():
+                lexicon.create_synset().add_word(word)
+        assert history.undo(10) == 2
+        assert conn.execute("SELECT count(*) FROM synsets").fetchone()[0] == 1
+    finally:
+        history.disable_undo()
+
+
+def test_history_per_connection(conn, lexicon, undo, tmp_path):
+    workspace = Workspace(tmp_path / "other.db")
+    with workspace:
+        assert not history.undo_enabled()
+        with pytest.raises(AttributeError):
+            history.undo()
+    workspace.close()
+    lexicon.create_synset().add_word("dog")
+    assert history.undo() == 1
@@ -0,0 +1,44 @@
+from wn_editor.ids import IdScheme, canonicalize_ids
+
+
+def _ids(conn, table):
+    return [r[0] for r in conn.execute(f"SELECT id FROM {table} ORDER BY rowid")]
+
+
+def test_canonicalize_editor_created_ids(conn, lexicon):
+    dog = lexicon.create_synset().add_word("dog").add_word("hound")
+    lexicon.create_synset().add_word("dog")
+    lexicon.create_synset().add_word("ice cream").add_word("ice_cream")
+    assert _ids(conn, "synsets") == ["x-0-u", "x-1-u", "x-2-u"]
+
+    assert lexicon.canonicalize_ids() == {"synsets": 3, "entries": 5, "senses": 5}
+    assert _ids(conn, "synsets") == ["x-00000001-u", "x-00000002-u", "x-00000003-u"]
+    assert _ids(conn, "entries") == ["x-dog-u", "x-hound-u", "x-dog-u-2", "x-ice_cream-u", "x-ice_cream-u-2"]
+    assert _ids(conn, "senses") == [
+        "x-dog-u-x-00000001-u",
+        "x-hound-u-x-00000001-u",
+        "x-dog-u-2-x-00000002-u",
+        "x-ice_cream-u-x-00000003-u",
+        "x-ice_cream-u-2-x-00000003-u",
+    ]
+    assert dog.as_synset().id == "x-00000001-u"
+    assert conn.execute("SELECT modified FROM lexicons").fetchone()[0]
+
+
+def test_canonicalize_is_idempotent(conn, lexicon):
+    lexicon.create_synset().add_word("dog")
+    canonicalize_ids(lexicon)
+    assert canonicalize_ids(lexicon) == {"synsets": 0, "entries": 0, "senses": 0}
+    lexicon.create_synset().add_word("cat")
+    assert canonicalize_ids(lexicon) == {"synsets": 1, "entries": 1, "senses": 1}
+    assert _ids(conn, "synsets") == ["x-00000001-u", "x-00000002-u"]
+
+
+def test_canonicalize_uses_pos_of_entries_and_scheme(conn, lexicon):
+    synset = lexicon.create_synset().add_word("run")
+    conn.execute("UPDATE entries SET pos = 'v'")
+    conn.commit()
+    canonicalize_ids(lexicon, IdScheme(synset="{lexicon}-{pos}-{number}", sense="{lemma}-{number}"))
+    assert synset.as_synset().id == "x-v-1"
+    assert _ids(conn, "entries") == ["x-run-v"]
+    assert _ids(conn, "senses") == ["run-1"]
@@ -0,0 +1,129 @@
+import sqlite3
+import threading
+
+import pytest
+import wn
+
+from wn_editor import pipeline
+from wn_editor.importer import TableImporter, import_tables
+from wn_editor.pipeline import ImportPipeline
+
+
+def _table(path, rows):
+    path.write_text("".join("\t".join(row) + "\n" for row in rows), encoding="utf-8")
+    return path
+
+
+@pytest.fixture
+def tables(tmp_path):
+    return {
+        "synsets": _table(tmp_path / "synsets.tsv", [
+            ("id", "pos", "definition"),
+            ("x-1-n", "n", "an animal"),
+            ("x-2-n", "n", "a domestic dog"),
+            ("x-3-n", "n", "a cat"),
+        ]),
+        "senses": _table(tmp_path / "senses.tsv", [
+            ("synset", "lemma"),
+            ("x-1-n", "animal"),
+            ("x-2-n", "dog"),
+            ("x-2-n", "dog"),
+            ("x-3-n", "cat"),
+            ("x-4-n", "bird"),
+        ]),
+        "relations": _table(tmp_path / "relations.tsv", [
+            ("source", "target", "type"),
+            ("x-2-n", "x-1-n", "hypernym"),
+            ("x-3-n", "x-1-n", "hypernym"),
+            ("x-3-n", "x-9-n", "hypernym"),
+        ]),
+    }
+
+
+def _contents(conn):
+    return {
+        "synsets": conn.execute("SELECT id, pos FROM synsets ORDER BY id").fetchall(),
+        "entries": conn.execute("SELECT id, pos FROM entries ORDER BY id").fetchall(),
+        "forms": conn.execute("SELECT form, rank FROM forms ORDER BY form").fetchall(),
+        "senses": conn.execute("SELECT id FROM senses ORDER BY id").fetchall(),
+        "definitions": conn.execute("SELECT definition FROM definitions ORDER BY definition").fetchall(),
+        "relations": conn.execute(
+            "SELECT s.id, t.id FROM synset_relations AS r JOIN synsets AS s ON s.rowid = r.source_rowid "
+            "JOIN synsets AS t ON t.rowid = r.target_rowid ORDER BY s.id"
+        ).fetchall(),
+    }
+
+
+def _import_pipeline(lexicon, chunk_size, **tables):
+    return ImportPipeline(lexicon, chunk_size=chunk_size, queue_size=1, commit_every=1).run(**tables).counts
+
+
+@pytest.mark.parametrize("importer", [import_tables, _import_pipeline])
+def test_import_tables(conn, lexicon, tables, importer):
+    counts = importer(lexicon, chunk_size=2, **tables)
+    assert counts == {"synsets": 3, "entries": 3, "senses": 3, "definitions": 3, "relations": 2, "skipped": 3}
+    assert _contents(conn) == {
+        "synsets": [("x-1-n", "n"), ("x-2-n", "n"), ("x-3-n", "n")],
+        "entries": [("x-animal-n", "n"), ("x-cat-n", "n"), ("x-dog-n", "n")],
+        "forms": [("animal", 0), ("cat", 0), ("dog", 0)],
+        "senses": [("x-animal-n-x-1-n",), ("x-cat-n-x-3-n",), ("x-dog-n-x-2-n",)],
+        "definitions": [("a cat",), ("a domestic dog",), ("an animal",)],
+        "relations": [("x-2-n", "x-1-n"), ("x-3-n", "x-1-n")],
+    }
+    assert not conn.in_transaction
+
+
+def test_import_holds_the_write_lock(conn, lexicon):
+    other = sqlite3.connect(wn.config.database_path, timeout=0)
+
+    def rows():
+        # The rowids are already allocated, no other connection may insert synsets now
+        with pytest.raises(sqlite3.OperationalError, match="locked"):
+            other.execute("INSERT INTO synsets (id, lexicon_rowid) VALUES ('x-0-n', ?)", (lexicon.lex_rowid,))
+        yield {"id": "x-1-n", "pos": "n"}
+
+    TableImporter(lexicon).import_synsets(rows())
+    other.close()
+    assert conn.execute("SELECT id FROM synsets").fetchall() == [("x-1-n",)]
+
+
+def test_unknown_ili_is_counted(conn, lexicon, tmp_path, caplog):
+    conn.execute("INSERT INTO ilis VALUES (null, 'i1', 1, 'known', null)")
+    conn.commit()
+    synsets = _table(tmp_path / "synsets.tsv", [("id", "ili"), ("x-1-n", "i1"), ("x-2-n", "i404"), ("x-3-n", "")])
+    counts = import_tables(lexicon, synsets)
+    assert counts["synsets"] == 3
+    assert counts["skipped"] == 1
+    assert "Skipped 1" in caplog.text
+    assert conn.execute(
+        "SELECT ss.id, i.id FROM synsets AS ss LEFT JOIN ilis AS i ON i.rowid = ss.ili_rowid ORDER BY ss.id"
+    ).fetchall() == [("x-1-n", "i1"), ("x-2-n", None), ("x-3-n", None)]
+
+
+def test_pipeline_stage_error(conn, lexicon, tables, tmp_path):
+    tables["relations"] = _table(tmp_path / "relations.tsv", [("source", "target", "type"), ("x-2-n", "x-1-n", "isa")])
+    with pytest.raises(KeyError):
+        ImportPipeline(lexicon, chunk_size=2, commit_every=1).run(**tables)
+    assert not [thread for thread in threading.enumerate() if thread.name.startswith("wn_editor-")]
+    # The chunks committed before the error are kept, depending on how far the writer got
+    assert conn.execute("SELECT count(*) FROM synsets").fetchone()[0] in (0, 2, 3)
+    assert conn.execute("SELECT count(*) FROM synset_relations").fetchone()[0] == 0
+
+    tables["synsets"] = tmp_path / "missing.tsv"
+    with pytest.raises(FileNotFoundError):
+        ImportPipeline(lexicon).run(**tables)
+
+
+def test_pipeline_fails_on_concurrent_inserts(conn, lexicon, tables, monkeypatch):
+    other = sqlite3.connect(wn.config.database_path)
+    commit = pipeline._commit
+
+    def commit_and_insert(conn):
+        commit(conn)
+        other.execute("INSERT INTO synsets (id, lexicon_rowid) VALUES ('x-0-n', ?)", (lexicon.lex_rowid,))
+        other.commit()
+
+    monkeypatch.setattr(pipeline, "_commit", commit_and_insert)
+    with pytest.raises(wn.Error, match="Another connection"):
+        ImportPipeline(lexicon, chunk_size=1, commit_every=1).run(**tables)
+    other.close()
@@ -0,0 +1,27 @@
+from wn_editor import closure, search
+from wn_editor.editor import INDEX_DATABASE
+from wn_editor.maintenance import database_stats, optimize_database
+
+
+def test_optimize_keeps_the_wn_schema(conn, lexicon):
+    schema = conn.execute("SELECT type, name, sql FROM main.sqlite_master").fetchall()
+    report = optimize_database()
+    assert conn.execute("SELECT type, name, sql FROM main.sqlite_master").fetchall() == schema
+    # wn creates no statistics and no incremental auto-vacuum, so there is nothing to do for the wn database
+    assert "optimize main" not in report.steps
+    assert "incremental vacuum main" not in report.steps
+
+
+def test_optimize_vacuums_the_index_database(conn, lexicon):
+    for n in range(200):
+        lexicon.create_synset().add_word(f"word{n}").add_definition(f"definition number {n} " * 20)
+    search.enable_text_index()
+    closure.enable_hypernym_closure()
+    search.disable_text_index()
+    assert database_stats()[INDEX_DATABASE].freelist_count
+
+    report = optimize_database()
+    assert f"analyze {INDEX_DATABASE}" in report.steps
+    assert report.after[INDEX_DATABASE].freelist_count == 0
+    assert report.after[INDEX_DATABASE].page_count < report.before[INDEX_DATABASE].page_count
+    closure.disable_hypernym_closure()
@@ -0,0 +1,81 @@
+import pytest
+
+from wn_editor.editor import LexiconEditor, RelationType, SenseEditor
+
+
+def _sense(conn, synset, lemma):
+    return SenseEditor.from_rowid(conn.execute(
+        "SELECT s.rowid FROM senses AS s JOIN forms AS f ON f.entry_rowid = s.entry_rowid "
+        "WHERE s.synset_rowid = ? AND f.form = ?", (synset.rowid, lemma)
+    ).fetchone()[0])
+
+
+@pytest.fixture
+def other(conn):
+    return LexiconEditor.create_new_lexicon("y", "Y", "en", "a@b.c", "MIT", "1")
+
+
+def test_merge_from(conn, lexicon, other):
+    dog = lexicon.create_synset().add_word("dog").add_example("the dog barked")
+    cat = lexicon.create_synset().add_word("cat")
+    lexicon.set_ilis({dog.as_synset().id: "i1"})
+    _sense(conn, cat, "cat").set_count(3)
+
+    other_dog = other.create_synset().add_word("dog").add_word("hound")
+    other_dog.add_example("the dog barked").add_example("a hound howled")
+    other_cat = other.create_synset().add_word("cat").add_example("cats purr")
+    other_cat.set_relation_to_synset(other_dog, RelationType.also)
+    other.set_ilis({other_dog.as_synset().id: "i1"})
+    _sense(conn, other_cat, "cat").set_count(3)
+    _sense(conn, other_cat, "cat").add_example("the cat sat")
+    _sense(conn, other_dog, "hound").set_count(2)
+
+    report = lexicon.merge_from(other)
+    assert report.counts == {
+        "entries matched": 2, "entries added": 1, "forms added": 1,
+        "synsets matched by ili": 1, "synsets matched by lemmas": 1, "synsets added": 0,
+        "senses skipped": 2, "senses added": 1,
+        "definitions added": 0,
+        "synset_examples skipped": 1, "synset_examples added": 2,
+        "sense_examples added": 1,
+        "counts skipped": 1, "counts added": 1,
+        "synset_relations added": 1, "sense_relations added": 0, "sense_synset_relations added": 0,
+    }
+    x = lexicon.lex_rowid
+    assert conn.execute(
+        "SELECT synset_rowid, example FROM synset_examples WHERE lexicon_rowid = ? ORDER BY rowid", (x,)
+    ).fetchall() == [(dog.rowid, "the dog barked"), (dog.rowid, "a hound howled"), (cat.rowid, "cats purr")]
+    cat_sense = _sense(conn, cat, "cat").row_id
+    hound = _sense(conn, dog, "hound").row_id
+    assert conn.execute(
+        "SELECT sense_rowid, example FROM sense_examples WHERE lexicon_rowid = ?", (x,)
+    ).fetchall() == [(cat_sense, "the cat sat")]
+    assert conn.execute(
+        "SELECT sense_rowid, count FROM counts WHERE lexicon_rowid = ? ORDER BY rowid", (x,)
+    ).fetchall() == [(cat_sense, 3), (hound, 2)]
+    assert conn.execute(
+        "SELECT source_rowid, target_rowid FROM synset_relations WHERE lexicon_rowid = ?", (x,)
+    ).fetchall() == [(dog.rowid, cat.rowid)]
+
+    # Merging again adds nothing
+    again = lexicon.merge_from(other)
+    assert not {name: n for name, n in again.counts.items() if name.endswith("added") and n}
+
+
+def test_merge_copies_each_ili_once(conn, lexicon, other):
+    bird = other.create_synset().add_word("bird")
+    fowl = other.create_synset().add_word("fowl")
+    other.set_ilis({bird.as_synset().id: "i2", fowl.as_synset().id: "i2"})
+
+    report = lexicon.merge_from(other)
+    assert report.counts["synsets added"] == 2
+    assert report.counts["synset ilis skipped"] == 1
+    assert conn.execute(
+        "SELECT i.id FROM synsets AS ss LEFT JOIN ilis AS i ON i.rowid = ss.ili_rowid WHERE ss.lexicon_rowid = ? "
+        "ORDER BY ss.rowid", (lexicon.lex_rowid,)
+    ).fetchall() == [("i2",), (None,)]
+
+
+def test_merge_into_itself(lexicon):
+    with pytest.raises(AttributeError):
+        lexicon.merge_from(lexicon)
@@ -0,0 +1,119 @@
+import pytest
+
+from wn_editor import history
+from wn_editor.editor import RelationType, SenseEditor
+from wn_editor.reorganize import merge_synsets, move_senses, split_synset
+
+
+def _rows(conn, sql, *params):
+    return conn.execute(sql, params).fetchall()
+
+
+@pytest.fixture
+def cars(conn, lexicon):
+    """
+    Two synsets sharing the entry "car", both hyponyms of "vehicle" and related to each other
+    """
+    car_entry = lexicon.create_entry().add_form("car")
+    car = lexicon.create_synset()
+    automobile = lexicon.create_synset().add_word("automobile")
+    vehicle = lexicon.create_synset().add_word("vehicle")
+    x = lexicon.lex_rowid
+    car_in_car = SenseEditor(lexicon_rowid=x, entry_rowid=car_entry.entry_id, synset_rowid=car.rowid)
+    car_in_automobile = SenseEditor(lexicon_rowid=x, entry_rowid=car_entry.entry_id, synset_rowid=automobile.rowid)
+
+    car.add_definition("a motor vehicle")
+    vehicle.set_relation_to_synset(car, RelationType.hypernym)
+    vehicle.set_relation_to_synset(automobile, RelationType.hypernym)
+    car.set_relation_to_synset(automobile, RelationType.also)
+    car_in_car.set_relation_to_sense(car_in_automobile.as_sense(), RelationType.antonym)
+    car_in_car.set_count(2).add_example("the car stalled")
+    return car, automobile, vehicle, car_in_car, car_in_automobile
+
+
+def test_merge_synsets(conn, cars):
+    car, automobile, vehicle, car_in_car, car_in_automobile = cars
+    assert merge_synsets([(car, automobile)]) == {
+        "synsets": 1, "senses": 0, "duplicate_senses": 1, "dropped_relations": 3
+    }
+    assert _rows(conn, "SELECT rowid FROM synsets WHERE rowid = ?", car.rowid) == []
+    assert _rows(
+        conn,
+        "SELECT f.form FROM senses AS s JOIN forms AS f ON f.entry_rowid = s.entry_rowid WHERE s.synset_rowid = ? "
+        "ORDER BY f.form",
+        automobile.rowid,
+    ) == [("automobile",), ("car",)]
+    assert _rows(conn, "SELECT rowid FROM senses WHERE rowid = ?", car_in_car.row_id) == []
+    # The duplicate hypernym and the relations that became self-loops are dropped
+    assert _rows(conn, "SELECT source_rowid, target_rowid, type_rowid FROM synset_relations") == [
+        (automobile.rowid, vehicle.rowid, RelationType.hypernym.value)
+    ]
+    assert _rows(conn, "SELECT count(*) FROM sense_relations") == [(0,)]
+    # Everything of the merged sense and synset moved along
+    assert _rows(conn, "SELECT sense_rowid, count FROM counts") == [(car_in_automobile.row_id, 2)]
+    assert _rows(conn, "SELECT sense_rowid FROM sense_examples") == [(car_in_automobile.row_id,)]
+    assert _rows(conn, "SELECT synset_rowid FROM definitions") == [(automobile.rowid,)]
+
+
+def test_merge_synsets_is_one_undo_step(conn, cars):
+    car, automobile = cars[:2]
+    tables = ("synsets", "senses", "synset_relations", "sense_relations", "counts", "definitions")
+    before = [_rows(conn, f"SELECT * FROM {table} ORDER BY rowid") for table in tables]
+    history.enable_undo()
+    try:
+        merge_synsets([(car, automobile)])
+        assert history.undo() == 1
+        assert [_rows(conn, f"SELECT * FROM {table} ORDER BY rowid") for table in tables] == before
+    finally:
+        history.disable_undo()
+
+
+def test_merge_missing_synset_rolls_back(conn, cars):
+    car, automobile = cars[:2]
+    with pytest.raises(AttributeError):
+        merge_synsets([(car, automobile), (car.rowid + 100, automobile)])
+    assert _rows(conn, "SELECT count(*) FROM synsets") == [(3,)]
+
+
+def test_move_senses(conn, lexicon, cars):
+    car, automobile, vehicle, car_in_car, car_in_automobile = cars
+    assert move_senses([(car_in_car, automobile, None)]) == {
+        "senses": 1, "duplicate_senses": 1, "dropped_relations": 1
+    }
+    assert _rows(conn, "SELECT rowid FROM senses WHERE rowid = ?", car_in_car.row_id) == []
+    assert _rows(conn, "SELECT sense_rowid, count FROM counts") == [(car_in_automobile.row_id, 2)]
+    # The synsets and their relations are left alone
+    assert _rows(conn, "SELECT count(*) FROM synset_relations") == [(3,)]
+
+    auto_entry = lexicon.create_entry().add_form("auto")
+    assert move_senses([(car_in_automobile, None, auto_entry)]) == {
+        "senses": 1, "duplicate_senses": 0, "dropped_relations": 0
+    }
+    assert _rows(conn, "SELECT entry_rowid, synset_rowid FROM senses WHERE rowid = ?", car_in_automobile.row_id) == [
+        (auto_entry.entry_id, automobile.rowid)
+    ]
+
+    with pytest.raises(AttributeError):
+        move_senses([(car_in_automobile, car.rowid + 100, None)])
+
+
+def test_split_synset(conn, lexicon):
+    bat = lexicon.create_synset().add_word("bat").add_word("flittermouse").add_definition("a club or a mammal")
+    flittermouse = SenseEditor.from_rowid(_rows(conn, "SELECT max(rowid) FROM senses")[0][0])
+    flittermouse.add_example("the flittermouse flew")
+    bat.set_relation_to_synset(lexicon.create_synset().add_word("club"), RelationType.hypernym)
+
+    animal = split_synset(bat, [flittermouse])
+    assert animal.rowid != bat.rowid
+    assert _rows(conn, "SELECT synset_rowid FROM senses ORDER BY rowid") == [
+        (bat.rowid,), (animal.rowid,), (bat.rowid + 1,)
+    ]
+    assert _rows(conn, "SELECT sense_rowid FROM sense_examples") == [(flittermouse.row_id,)]
+    assert _rows(conn, "SELECT synset_rowid FROM definitions") == [(bat.rowid,)]
+    # The relations stay with the original synset
+    assert _rows(conn, "SELECT count(*) FROM synset_relations WHERE ? IN (source_rowid, target_rowid)",
+                 animal.rowid) == [(0,)]
+
+    with pytest.raises(AttributeError):
+        split_synset(bat, [flittermouse])
+    assert _rows(conn, "SELECT count(*) FROM synsets") == [(3,)]
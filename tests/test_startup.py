@@ -0,0 +1,10 @@
+import subprocess
+import sys
+from pathlib import Path
+
+BENCHMARK = Path(__file__).resolve().parent.parent / "benchmarks" / "startup.py"
+
+
+def test_import_does_not_load_heavy_wn_modules():
+    result = subprocess.run([sys.executable, str(BENCHMARK), "--repeat", "1"], capture_output=True, text=True)
+    assert result.returncode == 0, result.stdout
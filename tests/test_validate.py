@@ -0,0 +1,109 @@
+import pytest
+
+from wn_editor.editor import RelationType
+from wn_editor.validate import deduplicate_relations
+
+UNREPAIRABLE = {"entries_without_forms", "synsets_without_senses", "duplicate_synset_ids", "duplicate_sense_ids"}
+
+
+def _rowid(conn, sql, *params):
+    return conn.execute(sql, params).fetchone()[0]
+
+
+@pytest.fixture
+def broken(conn, lexicon):
+    """
+    A lexicon with one issue (or group of issues) for every check
+    """
+    animal = lexicon.create_synset().add_word("animal")
+    dog = lexicon.create_synset().add_word("dog")
+    animal.set_relation_to_synset(dog, RelationType.hypernym)
+    x = lexicon.lex_rowid
+    dog_entry, dog_sense = conn.execute(
+        "SELECT entry_rowid, rowid FROM senses WHERE synset_rowid = ?", (dog.rowid,)
+    ).fetchone()
+    animal_sense = _rowid(conn, "SELECT rowid FROM senses WHERE synset_rowid = ?", animal.rowid)
+    hypernym, antonym = RelationType.hypernym.value, RelationType.antonym.value
+
+    conn.execute("PRAGMA foreign_keys = OFF")
+    conn.execute("INSERT INTO forms (lexicon_rowid, entry_rowid, form) VALUES (?, ?, '_')", (x, dog_entry))
+    conn.execute("INSERT INTO synset_relations VALUES (null, ?, ?, 999, ?, null)", (x, dog.rowid, hypernym))
+    conn.execute("INSERT INTO sense_relations VALUES (null, ?, ?, 999, ?, null)", (x, dog_sense, antonym))
+    conn.execute("INSERT INTO sense_synset_relations VALUES (null, ?, ?, 999, ?, null)", (x, dog_sense, hypernym))
+    conn.execute("INSERT INTO senses (id, lexicon_rowid, entry_rowid, synset_rowid) VALUES ('x-orphan', ?, ?, 999)",
+                 (x, dog_entry))
+    conn.commit()
+    conn.execute("PRAGMA foreign_keys = ON")
+
+    lonely = conn.execute("INSERT INTO entries VALUES (null, 'x-lonely', ?, 'n', null)", (x,)).lastrowid
+    conn.execute("INSERT INTO forms (lexicon_rowid, entry_rowid, form, rank) VALUES (?, ?, 'lonely', 0)", (x, lonely))
+    formless = conn.execute("INSERT INTO entries VALUES (null, 'x-formless', ?, 'n', null)", (x,)).lastrowid
+    dog_sense_id = _rowid(conn, "SELECT id FROM senses WHERE rowid = ?", dog_sense)
+    conn.execute("INSERT INTO senses (id, lexicon_rowid, entry_rowid, synset_rowid) VALUES (?, ?, ?, ?)",
+                 (dog_sense_id, x, formless, dog.rowid))
+    conn.executemany("INSERT INTO synsets (id, lexicon_rowid) VALUES ('x-empty', ?)", [(x,), (x,)])
+    conn.execute("INSERT INTO synset_relations VALUES (null, ?, ?, ?, ?, null)", (x, dog.rowid, animal.rowid, hypernym))
+    conn.executemany("INSERT INTO sense_relations VALUES (null, ?, ?, ?, ?, null)",
+                     [(x, animal_sense, dog_sense, antonym)] * 2)
+    conn.executemany("INSERT INTO sense_synset_relations VALUES (null, ?, ?, ?, ?, null)",
+                     [(x, animal_sense, dog.rowid, RelationType.domain_topic.value)] * 2)
+    conn.commit()
+    return lexicon
+
+
+def test_checks(broken):
+    report = broken.validate()
+    assert not report.ok
+    assert report.summary() == {
+        "placeholder_forms": 1,
+        "dangling_synset_relations": 1,
+        "dangling_sense_relations": 1,
+        "dangling_sense_synset_relations": 1,
+        "orphan_senses": 1,
+        "entries_without_senses": 1,
+        "entries_without_forms": 1,
+        "synsets_without_senses": 2,
+        "duplicate_synset_ids": 1,
+        "duplicate_sense_ids": 1,
+        "duplicate_synset_relations": 1,
+        "duplicate_sense_relations": 1,
+        "duplicate_sense_synset_relations": 1,
+        "missing_inverse_synset_relations": 2,
+        "missing_inverse_sense_relations": 2,
+    }
+    assert report.repaired == {}
+
+
+def test_repairs(conn, broken):
+    report = broken.validate(repair=True)
+    found = {name for name, count in report.summary().items() if count}
+    assert set(report.repaired) == found - UNREPAIRABLE - {"entries_without_senses"}
+    assert all(report.repaired.values())
+
+    after = broken.validate()
+    assert {name for name, count in after.summary().items() if count} == UNREPAIRABLE | {"entries_without_senses"}
+    # Every remaining relation has its inverse
+    assert conn.execute(
+        "SELECT count(*) FROM synset_relations WHERE type_rowid = ?", (RelationType.hyponym.value,)
+    ).fetchone()[0] == 1
+
+    broken.validate(repair=True, destructive=True)
+    assert broken.validate().summary()["entries_without_senses"] == 0
+    assert conn.execute("SELECT count(*) FROM forms WHERE form = 'lonely'").fetchone()[0] == 0
+
+
+def test_clean_lexicon(conn, lexicon):
+    animal = lexicon.create_synset().add_word("animal")
+    dog = lexicon.create_synset().add_word("dog")
+    animal.set_relation_to_synset(dog, RelationType.hypernym)
+    dog.set_relation_to_synset(animal, RelationType.hyponym)
+    report = lexicon.validate(repair=True)
+    assert report.ok
+    assert report.repaired == {}
+
+
+def test_deduplicate_relations(conn, broken):
+    assert deduplicate_relations(broken) == {
+        "synset_relations": 1, "sense_relations": 1, "sense_synset_relations": 1
+    }
+    assert deduplicate_relations() == {"synset_relations": 0, "sense_relations": 0, "sense_synset_relations": 0}
@@ -1 +1,54 @@
-__version__ = "0.5.4"
\ No newline at end of file
+"""
+Editors for wordnets installed with wn, see :mod:`wn_editor.editor`.
+
+The editor classes and the most used functions can be imported from the package itself; :mod:`wn_editor.editor` is
+only imported on their first use. wn itself (which imports its downloader, LMF parser, etc.) is only loaded when the
+editors first access the database.
+"""
+
+import importlib.util
+import sys
+
+__version__ = "0.5.4"
+
+
+def _lazy_module(name: str):
+    """
+    Returns the module ``name``, which is only executed on first attribute access unless it was imported already
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    parent, _, child = name.rpartition(".")
+    if parent:
+        setattr(sys.modules[parent], child, module)
+    return module
+
+
+_EDITOR_ATTRIBUTES = {
+    "EntryEditor",
+    "FormEditor",
+    "IlIEditor",
+    "IliStatus",
+    "LexiconEditor",
+    "RelationType",
+    "SenseEditor",
+    "SynsetEditor",
+    "Workspace",
+    "get_lexicon_overview",
+    "get_row_id",
+    "transaction",
+}
+
+
+def __getattr__(name: str):
+    if name in _EDITOR_ATTRIBUTES:
+        from wn_editor import editor
+
+        return getattr(editor, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
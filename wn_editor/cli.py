@@ -0,0 +1,355 @@
+"""
+The ``wn-editor`` command line batch editor.
+
+Operations are streamed from a JSONL file (one JSON object per line) or a TSV file (with a header row) and applied
+with the editors of :mod:`wn_editor.editor`. Every operation has an ``op`` field, the other fields depend on it:
+
+======================  ==============================================================
+op                      fields
+======================  ==============================================================
+create_lexicon          id, label, language, email, license, version
+create_synset           [lexicon], [ref], [words], [definition]
+add_word                synset, word
+delete_word             synset, word
+add_relation            source, target, type
+delete_relation         source, target, type
+add_definition          synset, definition
+set_definition          synset, definition
+add_example             synset, example
+delete_example          synset, example
+set_ili                 synset, ili
+delete_ili              synset
+delete_synset           synset
+======================  ==============================================================
+
+Synsets are referenced either by a ``ref`` given to ``create_synset`` earlier in the same file or by their ID in the
+lexicon given with ``lexicon`` (or ``--lexicon``). In TSV files, ``words`` are separated by ``|``.
+
+Operations are grouped into transactions of ``--batch-size`` lines. The last committed line and all refs are stored
+in the editor index database in the same transaction, so an interrupted run continues after the last committed line
+when it is started again.
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import sys
+import time
+from collections import OrderedDict
+from contextlib import nullcontext
+from itertools import islice
+from pathlib import Path
+from typing import Any, Iterator, Optional
+
+from wn_editor.editor import (
+    INDEX_DATABASE,
+    LexiconEditor,
+    RelationType,
+    SynsetEditor,
+    Workspace,
+    _connection,
+    _counted_ids,
+    _get_ili_rowid_from_id,
+    _index_tables,
+    _statements,
+    get_row_id,
+    transaction,
+    wn,
+)
+
+_statements.register(
+    "batch.create_progress",
+    f"CREATE TABLE IF NOT EXISTS {INDEX_DATABASE}.batch_progress (source TEXT PRIMARY KEY, line INTEGER NOT NULL)",
+)
+_statements.register(
+    "batch.create_refs",
+    f"""
+    CREATE TABLE IF NOT EXISTS {INDEX_DATABASE}.batch_refs (
+        source TEXT NOT NULL,
+        ref TEXT NOT NULL,
+        synset_rowid INTEGER NOT NULL,
+        PRIMARY KEY (source, ref)
+    ) WITHOUT ROWID
+    """,
+)
+_statements.register("batch.get_progress", f"SELECT line FROM {INDEX_DATABASE}.batch_progress WHERE source = ?")
+_statements.register(
+    "batch.set_progress", f"INSERT OR REPLACE INTO {INDEX_DATABASE}.batch_progress VALUES (?,?)"
+)
+_statements.register(
+    "batch.clear_progress", f"DELETE FROM {INDEX_DATABASE}.batch_progress WHERE source = ?"
+)
+_statements.register("batch.clear_refs", f"DELETE FROM {INDEX_DATABASE}.batch_refs WHERE source = ?")
+_statements.register("batch.set_ref", f"INSERT OR REPLACE INTO {INDEX_DATABASE}.batch_refs VALUES (?,?,?)")
+_statements.register(
+    "batch.get_ref", f"SELECT synset_rowid FROM {INDEX_DATABASE}.batch_refs WHERE source = ? AND ref = ?"
+)
+
+
+def read_operations(path: Path, fmt: Optional[str] = None, start: int = 0) -> Iterator[tuple[int, dict[str, Any]]]:
+    """
+    Lazily yields (line number, operation) from a JSONL or TSV file, skipping the lines up to ``start`` unparsed
+    """
+    fmt = fmt or ("tsv" if path.suffix.lower() in (".tsv", ".tab") else "jsonl")
+    with path.open(encoding="utf-8", newline="") as f:
+        if fmt == "tsv":
+            reader = csv.DictReader(f, delimiter="\t")
+            for row in reader:
+                if reader.line_num <= start:
+                    continue
+                op = {k: v for k, v in row.items() if v not in (None, "")}
+                if "words" in op:
+                    op["words"] = op["words"].split("|")
+                yield reader.line_num, op
+        else:
+            for number, line in enumerate(islice(f, start, None), start + 1):
+                if line.strip():
+                    yield number, json.loads(line)
+
+
+class BatchEditor:
+    """
+
+    Applies operations with the editors and resolves synset references through a bounded cache of editors.
+
+    """
+
+    def __init__(self, source: str, lexicon: Optional[str] = None, cache_size: int = 100000) -> None:
+        self.source = source
+        self.lexicon = lexicon
+        self.cache_size = cache_size
+        self._synsets: OrderedDict[tuple[Optional[str], str], SynsetEditor] = OrderedDict()
+        self._lexicons: dict[str, LexiconEditor] = {}
+
+    def _lexicon(self, op: dict[str, Any]) -> LexiconEditor:
+        lex_id = op.get("lexicon", self.lexicon)
+        if lex_id is None:
+            raise AttributeError("No lexicon given, use the 'lexicon' field or --lexicon")
+        if lex_id not in self._lexicons:
+            self._lexicons[lex_id] = LexiconEditor(lex_id)
+        return self._lexicons[lex_id]
+
+    def _remember(self, key: tuple[Optional[str], str], editor: SynsetEditor) -> SynsetEditor:
+        self._synsets[key] = editor
+        self._synsets.move_to_end(key)
+        if len(self._synsets) > self.cache_size:
+            self._synsets.popitem(last=False)
+        return editor
+
+    def synset(self, op: dict[str, Any], field: str = "synset") -> SynsetEditor:
+        ref = op[field]
+        key = (op.get("lexicon", self.lexicon), ref)
+        if key in self._synsets:
+            self._synsets.move_to_end(key)
+            return self._synsets[key]
+        with _connection() as conn:
+            res = _statements.execute(conn, "batch.get_ref", (self.source, ref)).fetchall()
+        if res:
+            rowid = res[0][0]
+        else:
+            rowid = get_row_id("synsets", {"id": ref, "lexicon_rowid": self._lexicon(op).lex_rowid})
+        if rowid is None:
+            raise AttributeError(f"Unknown synset {ref}")
+        return self._remember(key, SynsetEditor.from_rowid(rowid))
+
+    def apply(self, op: dict[str, Any]) -> None:
+        name = op.get("op")
+        method = getattr(self, f"_op_{name}", None)
+        if method is None:
+            raise AttributeError(f"Unknown operation {name}")
+        method(op)
+
+    def _op_create_lexicon(self, op: dict[str, Any]) -> None:
+        self._lexicons[op["id"]] = LexiconEditor.create_new_lexicon(
+            op["id"], op["label"], op["language"], op["email"], op["license"], op["version"]
+        )
+
+    def _op_create_synset(self, op: dict[str, Any]) -> None:
+        editor = self._lexicon(op).create_synset()
+        for word in op.get("words", ()):
+            editor.add_word(word)
+        if "definition" in op:
+            editor.add_definition(op["definition"])
+        if "ref" in op:
+            with _connection() as conn:
+                _statements.execute(conn, "batch.set_ref", (self.source, op["ref"], editor.rowid))
+            self._remember((op.get("lexicon", self.lexicon), op["ref"]), editor)
+
+    def _op_add_word(self, op: dict[str, Any]) -> None:
+        self.synset(op).add_word(op["word"])
+
+    def _op_delete_word(self, op: dict[str, Any]) -> None:
+        self.synset(op).delete_word(op["word"])
+
+    def _op_add_relation(self, op: dict[str, Any]) -> None:
+        self.synset(op, "target").set_relation_to_synset(self.synset(op, "source"), RelationType[op["type"]])
+
+    def _op_delete_relation(self, op: dict[str, Any]) -> None:
+        self.synset(op, "target").delete_relation_to_synset(self.synset(op, "source"), RelationType[op["type"]])
+
+    def _op_add_definition(self, op: dict[str, Any]) -> None:
+        self.synset(op).add_definition(op["definition"])
+
+    def _op_set_definition(self, op: dict[str, Any]) -> None:
+        self.synset(op).mod_definition(op["definition"])
+
+    def _op_add_example(self, op: dict[str, Any]) -> None:
+        self.synset(op).add_example(op["example"])
+
+    def _op_delete_example(self, op: dict[str, Any]) -> None:
+        self.synset(op).delete_example(op["example"])
+
+    def _op_set_ili(self, op: dict[str, Any]) -> None:
+        self.synset(op).set_ili(_get_ili_rowid_from_id(op["ili"]))
+
+    def _op_delete_ili(self, op: dict[str, Any]) -> None:
+        self.synset(op).delete_ili()
+
+    def _op_delete_synset(self, op: dict[str, Any]) -> None:
+        self.synset(op).delete()
+        self._synsets.pop((op.get("lexicon", self.lexicon), op["synset"]), None)
+
+
+def run(
+        path: Path,
+        fmt: Optional[str] = None,
+        lexicon: Optional[str] = None,
+        batch_size: int = 10000,
+        resume: bool = True,
+        progress=sys.stderr,
+) -> int:
+    """
+
+    Applies all operations of a file in transactions of ``batch_size`` lines and returns the number of applied
+    operations. With ``resume`` the lines up to the last committed line of an earlier run are skipped.
+
+    """
+    source = str(path.resolve())
+    with _connection() as conn:
+        _index_tables(conn)
+        _statements.execute(conn, "batch.create_progress")
+        _statements.execute(conn, "batch.create_refs")
+        if not resume:
+            _statements.execute(conn, "batch.clear_progress", (source,))
+            _statements.execute(conn, "batch.clear_refs", (source,))
+        res = _statements.execute(conn, "batch.get_progress", (source,)).fetchall()
+    start = res[0][0] if res else 0
+    if start and progress:
+        print(f"Resuming after line {start}", file=progress)
+    editor = BatchEditor(source, lexicon)
+    operations = read_operations(path, fmt, start)
+    applied = 0
+    began = time.perf_counter()
+    line = start
+    while True:
+        count = 0
+        with transaction() as conn, _counted_ids(conn):
+            for line, op in operations:
+                try:
+                    editor.apply(op)
+                except Exception as e:
+                    raise wn.Error(f"Line {line}: {e}") from e
+                count += 1
+                if count >= batch_size:
+                    break
+            _statements.execute(conn, "batch.set_progress", (source, line))
+        applied += count
+        if progress:
+            elapsed = time.perf_counter() - began
+            print(
+                f"line {line}: {applied} operations, {applied / elapsed if elapsed else 0:.0f} operations/s",
+                file=progress,
+            )
+        if count < batch_size:
+            return applied
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="wn-editor", description="Batch editor for wordnets installed with wn.")
+    parser.add_argument("--data-dir", help="the wn data directory (default: wn.config.data_directory)")
+    parser.add_argument("--database", type=Path, help="edit this database file instead of the one of wn")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    apply_parser = commands.add_parser("apply", help="apply operations from a JSONL or TSV file")
+    apply_parser.add_argument("file", type=Path)
+    apply_parser.add_argument("--format", choices=("jsonl", "tsv"), help="default: guessed from the file extension")
+    apply_parser.add_argument("--lexicon", help="default lexicon for synset IDs and new synsets")
+    apply_parser.add_argument("--batch-size", type=int, default=10000, help="operations per transaction")
+    apply_parser.add_argument("--restart", action="store_true", help="ignore the progress of an earlier run")
+    apply_parser.add_argument("--optimize", action="store_true", help="optimize the database afterwards")
+
+    import_parser = commands.add_parser("import", help="create a lexicon from CSV or TSV tables")
+    import_parser.add_argument("synsets", type=Path, help="table with the columns id, [pos], [ili], [definition]")
+    import_parser.add_argument("--senses", type=Path, help="table with the columns synset, lemma, [pos]")
+    import_parser.add_argument("--definitions", type=Path, help="table with the columns synset, definition, [language]")
+    import_parser.add_argument("--relations", type=Path, help="table with the columns source, target, type")
+    for field in ("id", "label", "language", "email", "license", "version"):
+        import_parser.add_argument(f"--{field}", required=True, help=f"{field} of the new lexicon")
+    import_parser.add_argument("--chunk-size", type=int, default=50000, help="rows per bulk insert")
+    import_parser.add_argument(
+        "--threaded",
+        action="store_true",
+        help="read and resolve the tables in background threads, commit in groups and report the stage metrics",
+    )
+    import_parser.add_argument("--optimize", action="store_true", help="optimize the database afterwards")
+
+    commands.add_parser(
+        "rebuild-text-index", help="create or rebuild the full-text index over definitions and examples"
+    )
+
+    commands.add_parser(
+        "optimize",
+        help="analyze and vacuum the editor index database (the wn database only as far as wn allows) and report the "
+        "page statistics",
+    )
+
+    args = parser.parse_args(argv)
+    if args.data_dir:
+        wn.config.data_directory = args.data_dir
+    try:
+        with Workspace(args.database) if args.database else nullcontext():
+            if args.command == "import":
+                from wn_editor.importer import import_tables
+
+                lexicon = LexiconEditor.create_new_lexicon(
+                    args.id, args.label, args.language, args.email, args.license, args.version
+                )
+                if args.threaded:
+                    from wn_editor.pipeline import ImportPipeline
+
+                    report = ImportPipeline(lexicon, chunk_size=args.chunk_size).run(
+                        args.synsets, args.senses, args.definitions, args.relations
+                    )
+                    print(report, file=sys.stderr)
+                else:
+                    counts = import_tables(
+                        lexicon, args.synsets, args.senses, args.definitions, args.relations, chunk_size=args.chunk_size
+                    )
+                    print(", ".join(f"{count} {name}" for name, count in counts.items()), file=sys.stderr)
+            elif args.command == "rebuild-text-index":
+                from wn_editor import search
+
+                if search.text_index_enabled():
+                    search.rebuild_text_index()
+                else:
+                    search.enable_text_index()
+            elif args.command == "optimize":
+                from wn_editor.maintenance import optimize_database
+
+                print(optimize_database(), file=sys.stderr)
+            else:
+                run(args.file, args.format, args.lexicon, args.batch_size, resume=not args.restart)
+            if getattr(args, "optimize", False):
+                from wn_editor.maintenance import optimize_database
+
+                print(optimize_database(), file=sys.stderr)
+    except wn.Error as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
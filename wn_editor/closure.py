@@ -0,0 +1,328 @@
+"""
+Optional materialized transitive closure of the hypernym hierarchy.
+
+Once enabled with :func:`enable_hypernym_closure` the closure is stored in the editor index database and kept up to date
+by the editors whenever a hypernym, hyponym, instance_hypernym or instance_hyponym relation is added or removed or a
+synset is deleted. Ancestor and descendant queries are then a single indexed lookup.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+from typing import Iterable
+
+import wn
+from wn import Synset
+
+from wn_editor.editor import (
+    INDEX_DATABASE,
+    RelationType,
+    SynsetEditor,
+    _commit,
+    _connection,
+    _get_row_id,
+    _index_tables,
+    _statements,
+    connect,
+)
+
+TABLE = "hypernym_closure"
+
+# For these relation types the target is the parent of the source
+_UPWARD = (RelationType.hypernym.value, RelationType.instance_hypernym.value)
+# For these relation types the source is the parent of the target
+_DOWNWARD = (RelationType.hyponym.value, RelationType.instance_hyponym.value)
+
+_statements.register(
+    "closure.create",
+    f"""
+    CREATE TABLE IF NOT EXISTS {INDEX_DATABASE}.{TABLE} (
+        descendant_rowid INTEGER NOT NULL,
+        ancestor_rowid INTEGER NOT NULL,
+        depth INTEGER NOT NULL,
+        PRIMARY KEY (descendant_rowid, ancestor_rowid)
+    ) WITHOUT ROWID
+    """,
+)
+_statements.register(
+    "closure.create_index",
+    f"CREATE INDEX IF NOT EXISTS {INDEX_DATABASE}.{TABLE}_ancestor_index ON {TABLE} (ancestor_rowid)",
+)
+_statements.register("closure.drop", f"DROP TABLE IF EXISTS {INDEX_DATABASE}.{TABLE}")
+_statements.register("closure.clear", f"DELETE FROM {INDEX_DATABASE}.{TABLE}")
+_statements.register(
+    "closure.create_edges",
+    """
+    CREATE TEMP TABLE IF NOT EXISTS hypernym_edges (
+        child_rowid INTEGER NOT NULL,
+        parent_rowid INTEGER NOT NULL
+    )
+    """,
+)
+_statements.register(
+    "closure.create_edges_index",
+    "CREATE INDEX IF NOT EXISTS temp.hypernym_edges_index ON hypernym_edges (child_rowid)",
+)
+_statements.register("closure.clear_edges", "DELETE FROM temp.hypernym_edges")
+_statements.register(
+    "closure.fill_edges",
+    f"""
+    INSERT INTO temp.hypernym_edges
+    SELECT source_rowid, target_rowid FROM main.synset_relations WHERE type_rowid IN ({",".join(map(str, _UPWARD))})
+    UNION
+    SELECT target_rowid, source_rowid FROM main.synset_relations WHERE type_rowid IN ({",".join(map(str, _DOWNWARD))})
+    """,
+)
+_statements.register(
+    "closure.create_seeds", "CREATE TEMP TABLE IF NOT EXISTS hypernym_seeds (rowid INTEGER PRIMARY KEY)"
+)
+_statements.register("closure.clear_seeds", "DELETE FROM temp.hypernym_seeds")
+_statements.register("closure.add_seed", "INSERT OR IGNORE INTO temp.hypernym_seeds VALUES (?)")
+_statements.register(
+    "closure.add_descendant_seeds",
+    f"""
+    INSERT OR IGNORE INTO temp.hypernym_seeds
+    SELECT descendant_rowid FROM {INDEX_DATABASE}.{TABLE}
+    WHERE ancestor_rowid IN (SELECT rowid FROM temp.hypernym_seeds)
+    """,
+)
+_statements.register(
+    "closure.delete_seeded",
+    f"DELETE FROM {INDEX_DATABASE}.{TABLE} WHERE descendant_rowid IN (SELECT rowid FROM temp.hypernym_seeds)",
+)
+_statements.register(
+    "closure.insert_first_level",
+    f"""
+    INSERT OR IGNORE INTO {INDEX_DATABASE}.{TABLE}
+    SELECT child_rowid, parent_rowid, 1 FROM temp.hypernym_edges WHERE child_rowid != parent_rowid
+    """,
+)
+_statements.register(
+    "closure.insert_next_level",
+    f"""
+    INSERT OR IGNORE INTO {INDEX_DATABASE}.{TABLE}
+    SELECT c.descendant_rowid, e.parent_rowid, c.depth + 1
+    FROM {INDEX_DATABASE}.{TABLE} AS c JOIN temp.hypernym_edges AS e ON e.child_rowid = c.ancestor_rowid
+    WHERE c.depth = ? AND e.parent_rowid != c.descendant_rowid
+    """,
+)
+# The seeded statements read the parents straight from the indexed relations instead of a copy of all edges, so a
+# recompute only costs as much as the affected part of the hierarchy. CROSS JOIN keeps the seeds the outer loop.
+_PARENTS = (
+    ("source_rowid", "target_rowid", ",".join(map(str, _UPWARD))),
+    ("target_rowid", "source_rowid", ",".join(map(str, _DOWNWARD))),
+)
+_statements.register(
+    "closure.insert_first_level_seeded",
+    f"""
+    INSERT OR IGNORE INTO {INDEX_DATABASE}.{TABLE}
+    """
+    + " UNION ALL ".join(
+        f"""
+        SELECT s.rowid, r.{parent}, 1
+        FROM temp.hypernym_seeds AS s CROSS JOIN main.synset_relations AS r ON r.{child} = s.rowid
+        WHERE r.type_rowid IN ({types}) AND r.{parent} != s.rowid
+        """
+        for child, parent, types in _PARENTS
+    ),
+)
+_statements.register(
+    "closure.insert_next_level_seeded",
+    f"""
+    INSERT OR IGNORE INTO {INDEX_DATABASE}.{TABLE}
+    """
+    + " UNION ALL ".join(
+        f"""
+        SELECT c.descendant_rowid, r.{parent}, c.depth + 1
+        FROM temp.hypernym_seeds AS s
+        CROSS JOIN {INDEX_DATABASE}.{TABLE} AS c ON c.descendant_rowid = s.rowid
+        CROSS JOIN main.synset_relations AS r ON r.{child} = c.ancestor_rowid
+        WHERE c.depth = ?1 AND r.type_rowid IN ({types}) AND r.{parent} != c.descendant_rowid
+        """
+        for child, parent, types in _PARENTS
+    ),
+)
+_statements.register(
+    "closure.add_edge",
+    f"""
+    INSERT INTO {INDEX_DATABASE}.{TABLE} (descendant_rowid, ancestor_rowid, depth)
+    SELECT d.rowid, a.rowid, d.depth + 1 + a.depth
+    FROM (SELECT ? AS rowid, 0 AS depth
+          UNION ALL
+          SELECT descendant_rowid, depth FROM {INDEX_DATABASE}.{TABLE} WHERE ancestor_rowid = ?) AS d,
+         (SELECT ? AS rowid, 0 AS depth
+          UNION ALL
+          SELECT ancestor_rowid, depth FROM {INDEX_DATABASE}.{TABLE} WHERE descendant_rowid = ?) AS a
+    WHERE d.rowid != a.rowid
+    ON CONFLICT (descendant_rowid, ancestor_rowid) DO UPDATE SET depth = min(depth, excluded.depth)
+    """,
+)
+_statements.register(
+    "closure.ancestors",
+    f"SELECT ancestor_rowid, depth FROM {INDEX_DATABASE}.{TABLE} WHERE descendant_rowid = ? ORDER BY depth",
+)
+_statements.register(
+    "closure.descendants",
+    f"SELECT descendant_rowid, depth FROM {INDEX_DATABASE}.{TABLE} WHERE ancestor_rowid = ? ORDER BY depth",
+)
+_statements.register(
+    "closure.depth",
+    f"SELECT depth FROM {INDEX_DATABASE}.{TABLE} WHERE descendant_rowid = ? AND ancestor_rowid = ?",
+)
+
+
+def _enabled(conn: sqlite3.Connection) -> bool:
+    return TABLE in _index_tables(conn)
+
+
+def _fill(conn: sqlite3.Connection, seeds: Iterable[int] | None) -> None:
+    """
+    Computes the closure level by level, either for all synsets from a temporary copy of all hypernym edges or only
+    for the seeds and their descendants from the relations.
+    """
+    if seeds is None:
+        suffix = ""
+        _statements.execute(conn, "closure.create_edges")
+        _statements.execute(conn, "closure.create_edges_index")
+        _statements.execute(conn, "closure.clear_edges")
+        _statements.execute(conn, "closure.fill_edges")
+    else:
+        suffix = "_seeded"
+        _statements.execute(conn, "closure.create_seeds")
+        _statements.execute(conn, "closure.clear_seeds")
+        _statements.executemany(conn, "closure.add_seed", [(rowid,) for rowid in seeds])
+        _statements.execute(conn, "closure.add_descendant_seeds")
+        _statements.execute(conn, "closure.delete_seeded")
+    depth = 1
+    cur = _statements.execute(conn, "closure.insert_first_level" + suffix)
+    while cur.rowcount > 0:
+        cur = _statements.execute(conn, "closure.insert_next_level" + suffix, (depth,))
+        depth += 1
+    if seeds is None:
+        _statements.execute(conn, "closure.clear_edges")
+
+
+def _relation_added(conn: sqlite3.Connection, source_rowid: int, target_rowid: int, type_rowid: int) -> None:
+    if type_rowid in _UPWARD:
+        child, parent = source_rowid, target_rowid
+    elif type_rowid in _DOWNWARD:
+        child, parent = target_rowid, source_rowid
+    else:
+        return
+    if child != parent and _enabled(conn):
+        _statements.execute(conn, "closure.add_edge", (child, child, parent, parent))
+
+
+def _relation_removed(conn: sqlite3.Connection, source_rowid: int, target_rowid: int, type_rowid: int) -> None:
+    if type_rowid in _UPWARD:
+        _synset_changed(conn, source_rowid)
+    elif type_rowid in _DOWNWARD:
+        _synset_changed(conn, target_rowid)
+
+
+def _synset_changed(conn: sqlite3.Connection, rowid: int) -> None:
+    """
+    Recomputes the closure of a synset and all of its descendants from the relations.
+    """
+    _synsets_changed(conn, (rowid,))
+
+
+def _synsets_changed(conn: sqlite3.Connection, rowids: Iterable[int]) -> None:
+    """
+    Recomputes the closure of several synsets and all of their descendants at once
+    """
+    if _enabled(conn):
+        _fill(conn, rowids)
+
+
+def _to_rowid(synset: Synset | SynsetEditor | int) -> int:
+    if isinstance(synset, Synset):
+        return _get_row_id(synset)
+    if isinstance(synset, SynsetEditor):
+        return synset.rowid
+    return synset
+
+
+def _require_enabled(conn: sqlite3.Connection) -> None:
+    if not _enabled(conn):
+        raise wn.Error("The hypernym closure is not enabled, see enable_hypernym_closure()")
+
+
+def hypernym_closure_enabled() -> bool:
+    """
+    Returns whether the hypernym closure is enabled for the current database
+    """
+    return _enabled(connect())
+
+
+def enable_hypernym_closure() -> None:
+    """
+
+    Creates the hypernym closure table in the editor index database and fills it. From then on all editors keep it
+    up to date.
+
+    """
+    with _connection() as conn:
+        tables = _index_tables(conn)
+        _statements.execute(conn, "closure.create")
+        _statements.execute(conn, "closure.create_index")
+        tables.add(TABLE)
+        _fill(conn, None)
+        _commit(conn)
+
+
+def disable_hypernym_closure() -> None:
+    """
+    Drops the hypernym closure table
+    """
+    with _connection() as conn:
+        tables = _index_tables(conn)
+        if TABLE in tables:
+            _statements.execute(conn, "closure.drop")
+            tables.discard(TABLE)
+            _commit(conn)
+
+
+def rebuild_hypernym_closure() -> None:
+    """
+
+    Recomputes the whole hypernym closure from the relations in the database. Use this to recover after the database
+    was changed without the editors, e.g. by adding or removing lexicons with wn.
+
+    """
+    with _connection() as conn:
+        _require_enabled(conn)
+        _statements.execute(conn, "closure.clear")
+        _fill(conn, None)
+        _commit(conn)
+
+
+def ancestors(synset: Synset | SynsetEditor | int) -> list[tuple[int, int]]:
+    """
+    Returns the rowids of all (instance) hypernyms of a synset, transitively, with their distance, nearest first.
+    """
+    with _connection() as conn:
+        _require_enabled(conn)
+        return _statements.execute(conn, "closure.ancestors", (_to_rowid(synset),)).fetchall()
+
+
+def descendants(synset: Synset | SynsetEditor | int) -> list[tuple[int, int]]:
+    """
+    Returns the rowids of all (instance) hyponyms of a synset, transitively, with their distance, nearest first.
+    """
+    with _connection() as conn:
+        _require_enabled(conn)
+        return _statements.execute(conn, "closure.descendants", (_to_rowid(synset),)).fetchall()
+
+
+def depth_between(descendant: Synset | SynsetEditor | int, ancestor: Synset | SynsetEditor | int) -> int | None:
+    """
+    Returns the shortest hypernym distance from ``descendant`` up to ``ancestor``, or None if it is no ancestor.
+    """
+    with _connection() as conn:
+        _require_enabled(conn)
+        res = _statements.execute(
+            conn, "closure.depth", (_to_rowid(descendant), _to_rowid(ancestor))
+        ).fetchall()
+        if res and res[0]:
+            return res[0][0]
@@ -0,0 +1,269 @@
+"""
+Cycle detection for hypernym and holonym relations.
+
+A :class:`CycleGuard` keeps the hierarchical relations of one lexicon as an in-memory adjacency structure, loaded once
+with a single query and kept in sync by the editors. While a guard is enabled for a lexicon, every hierarchical
+relation added through the editors is checked before it is inserted and rejected (or reported) if it would close a
+cycle. :func:`find_cycles` scans a whole lexicon at once.
+"""
+
+from __future__ import annotations
+
+from typing import Optional
+
+import wn
+from wn._add import logger
+
+from wn_editor.editor import (
+    LexiconEditor,
+    RelationType,
+    _connection,
+    _statements,
+    _state,
+)
+
+# Relation families that must be acyclic: relation types pointing from child to parent and from parent to child
+FAMILIES: dict[str, tuple[tuple[RelationType, ...], tuple[RelationType, ...]]] = {
+    "hypernym": (
+        (RelationType.hypernym, RelationType.instance_hypernym),
+        (RelationType.hyponym, RelationType.instance_hyponym),
+    ),
+    "holo_member": ((RelationType.holo_member,), (RelationType.mero_member,)),
+    "holo_part": ((RelationType.holo_part,), (RelationType.mero_part,)),
+    "holo_substance": ((RelationType.holo_substance,), (RelationType.mero_substance,)),
+}
+
+# type_rowid -> (family, True if the source is the child)
+_EDGE_TYPES: dict[int, tuple[str, bool]] = {}
+for _family, (_upward, _downward) in FAMILIES.items():
+    _EDGE_TYPES.update({rt.value: (_family, True) for rt in _upward})
+    _EDGE_TYPES.update({rt.value: (_family, False) for rt in _downward})
+
+_statements.register(
+    "cycles.load",
+    f"""
+    SELECT source_rowid, target_rowid, type_rowid FROM synset_relations
+    WHERE lexicon_rowid = ? AND type_rowid IN ({",".join(map(str, _EDGE_TYPES))})
+    """,
+)
+
+
+class CycleError(wn.Error):
+    """
+    Raised when a relation would create a cycle in a hierarchy guarded by a :class:`CycleGuard`.
+    """
+
+
+def _edge(source_rowid: int, target_rowid: int, type_rowid: int) -> Optional[tuple[str, int, int]]:
+    """
+    Returns (family, child, parent) of a relation or None if it is not hierarchical
+    """
+    if type_rowid not in _EDGE_TYPES:
+        return None
+    family, upward = _EDGE_TYPES[type_rowid]
+    return (family, source_rowid, target_rowid) if upward else (family, target_rowid, source_rowid)
+
+
+class CycleGuard:
+    """
+
+    In-memory parent adjacency of all hierarchical relations of one lexicon. ``mode`` is either ``"reject"`` (raise
+    :class:`CycleError`) or ``"report"`` (log and remember the relation in ``reported``, but insert it).
+
+    """
+
+    def __init__(self, lex_rowid: int, mode: str = "reject") -> None:
+        if mode not in ("reject", "report"):
+            raise AttributeError(f"Unknown mode {mode}")
+        self.lex_rowid = lex_rowid
+        self.mode = mode
+        self.reported: list[tuple[str, int, int]] = []
+        # family -> child -> parent -> number of relations
+        self.parents: dict[str, dict[int, dict[int, int]]] = {family: {} for family in FAMILIES}
+        self.load()
+
+    def load(self) -> None:
+        """
+        (Re)load the adjacency of the lexicon with a single query
+        """
+        for graph in self.parents.values():
+            graph.clear()
+        with _connection() as conn:
+            for row in _statements.execute(conn, "cycles.load", (self.lex_rowid,)).fetchall():
+                self.add(*row)
+
+    def add(self, source_rowid: int, target_rowid: int, type_rowid: int) -> None:
+        edge = _edge(source_rowid, target_rowid, type_rowid)
+        if edge:
+            family, child, parent = edge
+            parents = self.parents[family].setdefault(child, {})
+            parents[parent] = parents.get(parent, 0) + 1
+
+    def remove(self, source_rowid: int, target_rowid: int, type_rowid: int, count: int = 1) -> None:
+        edge = _edge(source_rowid, target_rowid, type_rowid)
+        if edge:
+            family, child, parent = edge
+            parents = self.parents[family].get(child, {})
+            if parents.get(parent, 0) > count:
+                parents[parent] -= count
+            else:
+                parents.pop(parent, None)
+
+    def remove_synset(self, rowid: int) -> None:
+        for graph in self.parents.values():
+            graph.pop(rowid, None)
+            for parents in graph.values():
+                parents.pop(rowid, None)
+
+    def reaches(self, family: str, start: int, goal: int) -> bool:
+        """
+        Returns whether ``goal`` is ``start`` or one of its ancestors in the given family
+        """
+        graph = self.parents[family]
+        stack = [start]
+        seen = {start}
+        while stack:
+            node = stack.pop()
+            if node == goal:
+                return True
+            for parent in graph.get(node, ()):
+                if parent not in seen:
+                    seen.add(parent)
+                    stack.append(parent)
+        return False
+
+    def creates_cycle(self, source_rowid: int, target_rowid: int, type_rowid: int) -> bool:
+        """
+        Returns whether adding this relation would close a cycle
+        """
+        edge = _edge(source_rowid, target_rowid, type_rowid)
+        if not edge:
+            return False
+        family, child, parent = edge
+        return self.reaches(family, parent, child)
+
+    def check(self, source_rowid: int, target_rowid: int, type_rowid: int) -> None:
+        if self.creates_cycle(source_rowid, target_rowid, type_rowid):
+            edge = _edge(source_rowid, target_rowid, type_rowid)
+            message = f"Relation {RelationType(type_rowid).name} from {source_rowid} to {target_rowid} creates a cycle"
+            if self.mode == "reject":
+                raise CycleError(message)
+            logger.warning(message)
+            self.reported.append(edge)
+
+    def find_cycles(self, family: Optional[str] = None) -> dict[str, list[list[int]]]:
+        """
+        Returns the strongly connected components (i.e. cycles) with more than one synset per family
+        """
+        families = [family] if family else list(FAMILIES)
+        return {f: _strongly_connected(self.parents[f]) for f in families}
+
+
+def _strongly_connected(graph: dict[int, dict[int, int]]) -> list[list[int]]:
+    """
+    Iterative version of Tarjan's algorithm, only components forming a cycle are returned.
+    """
+    index: dict[int, int] = {}
+    low: dict[int, int] = {}
+    on_stack: set[int] = set()
+    stack: list[int] = []
+    result = []
+    counter = 0
+    for root in list(graph):
+        if root in index:
+            continue
+        work = [(root, iter(graph.get(root, ())))]
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack.add(root)
+        while work:
+            node, children = work[-1]
+            for child in children:
+                if child not in index:
+                    index[child] = low[child] = counter
+                    counter += 1
+                    stack.append(child)
+                    on_stack.add(child)
+                    work.append((child, iter(graph.get(child, ()))))
+                    break
+                elif child in on_stack:
+                    low[node] = min(low[node], index[child])
+            else:
+                work.pop()
+                if work:
+                    low[work[-1][0]] = min(low[work[-1][0]], low[node])
+                if low[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    if len(component) > 1 or node in graph.get(node, ()):
+                        result.append(component)
+    return result
+
+
+def _guards() -> dict[int, CycleGuard]:
+    """
+    The enabled guards of the current database by lexicon rowid
+    """
+    return _state("cycle_guards")
+
+
+def _lex_rowid(lexicon: LexiconEditor | str | int) -> int:
+    return (lexicon if isinstance(lexicon, LexiconEditor) else LexiconEditor(lexicon)).lex_rowid
+
+
+def enable_cycle_guard(lexicon: LexiconEditor | str | int, mode: str = "reject") -> CycleGuard:
+    """
+    Load the hierarchy of a lexicon and guard all further relations added through the editors against cycles
+    """
+    guard = CycleGuard(_lex_rowid(lexicon), mode)
+    _guards()[guard.lex_rowid] = guard
+    return guard
+
+
+def disable_cycle_guard(lexicon: LexiconEditor | str | int) -> None:
+    _guards().pop(_lex_rowid(lexicon), None)
+
+
+def get_cycle_guard(lexicon: LexiconEditor | str | int) -> Optional[CycleGuard]:
+    return _guards().get(_lex_rowid(lexicon))
+
+
+def find_cycles(lexicon: LexiconEditor | str | int, family: Optional[str] = None) -> dict[str, list[list[int]]]:
+    """
+
+    Scans a whole lexicon for cycles in the hierarchical relations and returns the synset rowids of every cycle per
+    relation family. Uses the graph of an enabled guard or loads it once.
+
+    """
+    lex_rowid = _lex_rowid(lexicon)
+    guard = _guards().get(lex_rowid) or CycleGuard(lex_rowid, "report")
+    return guard.find_cycles(family)
+
+
+def _check_relation(lex_rowid: int, source_rowid: int, target_rowid: int, type_rowid: int) -> None:
+    guard = _guards().get(lex_rowid)
+    if guard is not None:
+        guard.check(source_rowid, target_rowid, type_rowid)
+
+
+def _relation_added(lex_rowid: int, source_rowid: int, target_rowid: int, type_rowid: int) -> None:
+    guard = _guards().get(lex_rowid)
+    if guard is not None:
+        guard.add(source_rowid, target_rowid, type_rowid)
+
+
+def _relation_removed(lex_rowid: int, source_rowid: int, target_rowid: int, type_rowid: int, count: int) -> None:
+    guard = _guards().get(lex_rowid)
+    if guard is not None:
+        guard.remove(source_rowid, target_rowid, type_rowid, count)
+
+
+def _synset_deleted(rowid: int) -> None:
+    for guard in _guards().values():
+        guard.remove_synset(rowid)
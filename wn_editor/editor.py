@@ -1,35 +1,398 @@
 from __future__ import annotations
 
 import inspect
+import logging
+import sqlite3
+from contextlib import contextmanager
+from contextvars import ContextVar
 from enum import IntEnum
-from typing import overload, Optional, Any
-
-import wn
-from wn import Synset
-from wn._add import logger
-from wn._db import connect
-from wn._queries import get_modified, get_definitions
-from wn.lmf import (
-    Metadata,
-)
+from itertools import islice
+from pathlib import Path
+from typing import overload, Optional, Any, Iterable, Iterator, NamedTuple, TYPE_CHECKING
+
+from wn_editor import _lazy_module
+
+if TYPE_CHECKING:
+    from wn import Synset
+    from wn.lmf import Metadata
+
+# wn is only loaded on first use (an import statement would load it right away), so wn.* modules are imported inside
+# the functions that need them
+wn = _lazy_module("wn")
+logger = logging.getLogger("wn")
 
 
 # Utils
 def _mod_internal(f, *args, **kw):
-    args[0].set_modified()
-    return f(*args, **kw)
+    with history._step(connect()):
+        args[0].set_modified()
+        return f(*args, **kw)
 
 
 def _modifies_db(func):
     return _dec(func, _mod_internal)
 
 
+def _step_internal(f, *args, **kw):
+    with history._step(connect()):
+        return f(*args, **kw)
+
+
+def _undoable(func):
+    """
+    Makes all changes of a method a single undo step, for methods that are not already decorated with _modifies_db
+    """
+    return _dec(func, _step_internal)
+
+
+def _chunks(iterable: Iterable, size: int) -> Iterator[list]:
+    """
+    Lazily split an iterable into lists of at most ``size`` items.
+    """
+    it = iter(iterable)
+    while chunk := list(islice(it, size)):
+        yield chunk
+
+
+def _qs(values) -> str:
+    return ",".join("?" * len(values))
+
+
+class _StatementRegistry:
+    """
+
+    Central registry for all SQL statements used by the editors. Every statement is registered once under a name and
+    normalized on registration, so sqlite3 always receives the exact same text and its per-connection statement cache
+    can reuse the compiled statement. Statements are executed through one cached cursor per connection.
+
+    """
+
+    def __init__(self) -> None:
+        self._statements: dict[str, str] = {}
+        self._executions: dict[str, int] = {}
+        self._cursors: dict[int, tuple[sqlite3.Connection, sqlite3.Cursor]] = {}
+        # Set by wn_editor.explain.dry_run to record every execution
+        self.recorder = None
+
+    @staticmethod
+    def normalize(sql: str) -> str:
+        return " ".join(sql.split())
+
+    def register(self, name: str, sql: str) -> str:
+        """
+        Register a statement under a name (once) and return the name.
+        """
+        if name not in self._statements:
+            self._statements[name] = self.normalize(sql)
+        return name
+
+    def __getitem__(self, name: str) -> str:
+        return self._statements[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._statements
+
+    def __len__(self) -> int:
+        return len(self._statements)
+
+    def cursor(self, conn: sqlite3.Connection) -> sqlite3.Cursor:
+        cached = self._cursors.get(id(conn))
+        if cached is None or cached[0] is not conn:
+            cached = (conn, conn.cursor())
+            self._cursors[id(conn)] = cached
+            _index_tables(conn)
+        return cached[1]
+
+    def execute(self, conn: sqlite3.Connection, name: str, params=()) -> sqlite3.Cursor:
+        self._executions[name] = self._executions.get(name, 0) + 1
+        if self.recorder is not None:
+            return self.recorder.execute(self.cursor(conn), name, self._statements[name], params)
+        return self.cursor(conn).execute(self._statements[name], params)
+
+    def executemany(self, conn: sqlite3.Connection, name: str, seq_of_params) -> sqlite3.Cursor:
+        self._executions[name] = self._executions.get(name, 0) + 1
+        if self.recorder is not None:
+            return self.recorder.executemany(self.cursor(conn), name, self._statements[name], seq_of_params)
+        return self.cursor(conn).executemany(self._statements[name], seq_of_params)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "registered": len(self._statements),
+            "distinct": len(self._executions),
+            "executions": sum(self._executions.values()),
+            "statements": dict(self._executions),
+        }
+
+    def reset_stats(self) -> None:
+        self._executions.clear()
+
+
+_statements = _StatementRegistry()
+
+
+# Databases
+
+class Workspace:
+    """
+
+    An explicit wn database for the editors, instead of the one in ``wn.config.data_directory``. Inside a ``with``
+    block all editors (and the optional indexes, undo history and change notifications) work on the database of the
+    workspace; a new database file is created with the wn schema. The active workspace is local to the current thread
+    (or asyncio task), so several threads can edit several databases at once.
+
+    Methods returning wn objects (e.g. :meth:`SynsetEditor.as_synset`) and editors created from wn objects still use
+    the database of wn; inside a workspace, refer to objects by rowid or ID.
+
+    >>> with Workspace("/tmp/build/mywn.db"):
+    ...     LexiconEditor.create_new_lexicon("mywn", "My wordnet", "en", "a@b.c", "MIT", "1").create_synset()
+
+    """
+
+    def __init__(self, database: str | Path | sqlite3.Connection) -> None:
+        if isinstance(database, sqlite3.Connection):
+            self.path = None
+            self._conn = database
+            _index_tables(database)
+        else:
+            self.path = Path(database)
+            self._conn = None
+        self._tokens = []
+
+    def connect(self) -> sqlite3.Connection:
+        """
+        Returns the connection to the database, opening (and if necessary creating) it like wn does
+        """
+        if self._conn is None:
+            from wn._db import _check_schema_compatibility, _init_db
+
+            initialized = self.path.is_file()
+            conn = sqlite3.connect(
+                str(self.path),
+                detect_types=sqlite3.PARSE_DECLTYPES,
+                check_same_thread=not wn.config.allow_multithreading,
+            )
+            conn.execute("PRAGMA foreign_keys = ON")
+            if not initialized:
+                _init_db(conn)
+            _check_schema_compatibility(conn, self.path)
+            _index_tables(conn)
+            self._conn = conn
+        return self._conn
+
+    def close(self) -> None:
+        """
+        Commits and closes the connection (if the workspace opened it) and forgets all state kept for it
+        """
+        if self._conn is None:
+            return
+        key = id(self._conn)
+        for cache in (_connection_state, _index_tables_cache, _statements._cursors):
+            cache.pop(key, None)
+        if self.path is not None:
+            self._conn.commit()
+            self._conn.close()
+        self._conn = None
+
+    def __enter__(self) -> Workspace:
+        self._tokens.append(_workspace.set(self))
+        return self
+
+    def __exit__(self, *exc) -> None:
+        _workspace.reset(self._tokens.pop())
+
+    def __repr__(self) -> str:
+        return f"Workspace({str(self.path) if self.path else self._conn!r})"
+
+
+_workspace: ContextVar[Optional[Workspace]] = ContextVar("wn_editor_workspace", default=None)
+
+
+def connect() -> sqlite3.Connection:
+    """
+    Returns the connection to the database of the active :class:`Workspace` or, outside of workspaces, that of wn
+    """
+    workspace = _workspace.get()
+    if workspace is None:
+        from wn._db import connect as wn_connect
+
+        conn = wn_connect()
+        _index_tables(conn)
+        return conn
+    return workspace.connect()
+
+
+def get_workspace() -> Optional[Workspace]:
+    return _workspace.get()
+
+
+# In-memory state of the editors that belongs to one database (e.g. the lemma indexes), per connection
+_connection_state: dict[int, tuple[sqlite3.Connection, dict[str, dict]]] = {}
+
+
+def _state(name: str, conn: Optional[sqlite3.Connection] = None) -> dict:
+    """
+    Returns the dict stored under ``name`` for the database of the given (default: the current) connection
+    """
+    conn = conn or connect()
+    cached = _connection_state.get(id(conn))
+    if cached is None or cached[0] is not conn:
+        cached = (conn, {})
+        _connection_state[id(conn)] = cached
+    return cached[1].setdefault(name, {})
+
+
+# Optional indexes maintained by the editors (e.g. the hypernym closure) live in a separate database file next to the
+# wn database, which is attached to every connection the editors use. Adding tables to the wn database itself would
+# break wn's schema compatibility check.
+INDEX_DATABASE = "wn_editor_index"
+_index_tables_cache: dict[int, tuple[sqlite3.Connection, Optional[set[str]]]] = {}
+
+
+def _index_database_path(conn: sqlite3.Connection) -> Optional[Path]:
+    for _, name, file in conn.execute("PRAGMA database_list").fetchall():
+        if name == "main" and file:
+            path = Path(file)
+            return path.with_suffix(".editor" + path.suffix)
+
+
+def _index_tables(conn: sqlite3.Connection) -> set[str]:
+    """
+    Returns the tables of the index database, attaching (and if necessary creating) it on the first call for a
+    connection. ATTACH is not possible inside a transaction, so the editors attach it when they first use a connection.
+    """
+    cached = _index_tables_cache.get(id(conn))
+    if cached is not None and cached[0] is conn:
+        return cached[1] if cached[1] is not None else set()
+    path = _index_database_path(conn)
+    if path is None:
+        tables = None
+    elif conn.in_transaction:
+        raise wn.Error(
+            "The editor index database cannot be attached inside a transaction, commit before the first use of the "
+            "editors on this connection"
+        )
+    else:
+        conn.execute("ATTACH DATABASE ? AS " + INDEX_DATABASE, (str(path),))
+        tables = {
+            r[0]
+            for r in conn.execute(
+                f"SELECT name FROM {INDEX_DATABASE}.sqlite_master WHERE type IN ('table', 'view')"
+            ).fetchall()
+        }
+    _index_tables_cache[id(conn)] = (conn, tables)
+    return tables if tables is not None else set()
+
+
+# Transactions
+
+# id of the connection -> number of nested transaction() blocks
+_transaction_depths: dict[int, int] = {}
+
+
+def _in_transaction(conn: sqlite3.Connection) -> bool:
+    return id(conn) in _transaction_depths
+
+
+def _lock_for_write(conn: sqlite3.Connection) -> None:
+    """
+    Takes the write lock before rowids are allocated from max(rowid), so that no other connection can insert rows
+    with the same rowids before the allocated ones are inserted. A transaction that has already written holds it.
+    """
+    if not conn.in_transaction:
+        conn.execute("BEGIN IMMEDIATE")
+
+
+@contextmanager
+def _connection() -> Iterator[sqlite3.Connection]:
+    """
+    Yields the connection. Outside of :func:`transaction` the block is committed on success and rolled back on errors.
+    """
+    conn = connect()
+    with history._step(conn):
+        if _in_transaction(conn):
+            yield conn
+            if _statements.recorder is not None:
+                _statements.recorder.commit_point(conn)
+        else:
+            with conn:
+                yield conn
+            events._committed(conn)
+
+
+def _commit(conn: sqlite3.Connection) -> None:
+    if not _in_transaction(conn):
+        conn.commit()
+        events._committed(conn)
+    elif _statements.recorder is not None:
+        _statements.recorder.commit_point(conn)
+
+
+@contextmanager
+def transaction() -> Iterator[sqlite3.Connection]:
+    """
+
+    Groups all editor calls inside the block into a single transaction instead of committing after every call. The
+    transaction is committed when the outermost block is left and rolled back if it is left with an exception. After
+    large transactions the database is optimized, see :mod:`wn_editor.maintenance`.
+
+    >>> with transaction():
+    ...     LexiconEditor("odenet").create_synset().add_word("auto")
+
+    """
+    conn = connect()
+    key = id(conn)
+    committed = False
+    with history._step(conn):
+        _transaction_depths[key] = _transaction_depths.get(key, 0) + 1
+        try:
+            yield conn
+        except BaseException:
+            if not _leave_transaction(key):
+                conn.rollback()
+            raise
+        if not _leave_transaction(key):
+            conn.commit()
+            events._committed(conn)
+            committed = True
+        elif _statements.recorder is not None:
+            _statements.recorder.commit_point(conn)
+    if committed:
+        maintenance._session_ended(conn)
+
+
+def _leave_transaction(key: int) -> int:
+    depth = _transaction_depths.pop(key) - 1
+    if depth:
+        _transaction_depths[key] = depth
+    return depth
+
+
+def get_statement_stats() -> dict[str, Any]:
+    """
+
+    Returns statistics about the statements executed by the editors since the start of the run (or the last call of
+    :func:`reset_statement_stats`): the number of registered statements, the number of distinct statements executed,
+    the total number of executions and the executions per statement.
+
+    """
+    return _statements.stats()
+
+
+def reset_statement_stats() -> None:
+    """
+    Resets the statistics returned by :func:`get_statement_stats`.
+    """
+    _statements.reset_stats()
+
+
 def get_row_id(table, arg: dict[str, Any]) -> int:
     condition = " AND ".join([f"{i}=?" for i in arg])
     ar = [arg[i] for i in arg]
-    query = f"SELECT rowid FROM {table} WHERE {condition}"
-    with connect() as conn:
-        res = conn.cursor().execute(query, tuple(ar)).fetchall()
+    name = _statements.register(
+        f"{table}.rowid_by_{'_'.join(arg)}", f"SELECT rowid FROM {table} WHERE {condition}"
+    )
+    with _connection() as conn:
+        res = _statements.execute(conn, name, tuple(ar)).fetchall()
         if res is not None:
             if len(res) > 1:
                 logger.warn(
@@ -128,30 +491,364 @@ class RelationType(IntEnum):
     similar = 28
 
 
-SET_MOD_QUERY = """
+def __getattr__(name: str) -> Any:
+    # INVERSE_RELATIONS maps each relation type to its inverse, as far as both are known to RelationType. It is built
+    # on first access, as it needs wn.
+    if name == "INVERSE_RELATIONS":
+        from wn.constants import REVERSE_RELATIONS
+
+        globals()[name] = {
+            rt: RelationType[REVERSE_RELATIONS[rt.name]]
+            for rt in RelationType
+            if REVERSE_RELATIONS.get(rt.name) in RelationType.__members__
+        }
+        return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# Statements
+
+_statements.register("lexicons.insert", "INSERT INTO lexicons VALUES (null,?,?,?,?,?,?,?,?,?,?,0)")
+_statements.register("lexicons.set_modified", "UPDATE lexicons SET modified=1 WHERE rowid=?")
+_statements.register("lexicons.set_id", "UPDATE lexicons SET id = ? WHERE rowid = ?")
+_statements.register("lexicons.id_by_rowid", "SELECT id FROM lexicons WHERE rowid=?")
+_statements.register("lexicons.rowid_by_id", "SELECT rowid FROM lexicons WHERE id =?")
+_statements.register("lexicons.rowids", "SELECT rowid FROM lexicons")
+_statements.register("lexicons.metadata", "SELECT metadata FROM lexicons WHERE rowid = ?")
+
+_statements.register("ilis.insert", "INSERT INTO ilis VALUES (null,?,3,null,null)")
+_statements.register("ilis.rowid_by_id", "SELECT rowid FROM ilis WHERE id = ?")
+_statements.register("ilis.rowids", "SELECT id, rowid FROM ilis")
+_statements.register("ilis.id_by_rowid", "SELECT id from ilis WHERE rowid = ?")
+_statements.register(
+    "ilis.max_id", "SELECT coalesce(max(cast(substr(id, 2) as integer)), 0) FROM ilis WHERE id GLOB 'i[0-9]*'"
+)
+_statements.register("ilis.max_rowid", "SELECT coalesce(max(rowid), 0) FROM ilis")
+_statements.register("ilis.insert_complete", "INSERT INTO ilis VALUES (?,?,?,?,null)")
+_statements.register("ilis.set_definition", "UPDATE ilis SET definition = ? WHERE rowid = ?")
+_statements.register("ilis.set_status", "UPDATE ilis SET status_rowid = ? WHERE rowid = ?")
+_statements.register("ilis.set_metadata", "UPDATE ilis SET metadata = ? WHERE rowid = ?")
+
+_statements.register(
+    "proposed_ilis.exists", "SELECT EXISTS(SELECT 1 FROM proposed_ilis WHERE synset_rowid = ?)"
+)
+_statements.register("proposed_ilis.insert", "INSERT INTO proposed_ilis VALUES (null,?,?,?)")
+_statements.register(
+    "proposed_ilis.set_definition", "UPDATE proposed_ilis SET definition = ? WHERE synset_rowid = ?"
+)
+_statements.register(
+    "proposed_ilis.set_definition_and_metadata",
+    "UPDATE proposed_ilis SET definition = ? , metadata = ? WHERE synset_rowid = ?",
+)
+_statements.register("proposed_ilis.delete", "DELETE FROM proposed_ilis WHERE synset_rowid = ?")
+_statements.register(
+    "proposed_ilis.delete_mapped",
+    "DELETE FROM proposed_ilis WHERE synset_rowid IN (SELECT synset_rowid FROM temp.ili_mapping)",
+)
 
-UPDATE lexicons SET modified=1 WHERE rowid=?
+_statements.register("synsets.insert", "INSERT INTO synsets VALUES (null,?,?,null,null,1,null,?)")
+_statements.register("synsets.insert_complete", "INSERT INTO synsets VALUES (?,?,?,?,?,1,null,null)")
+_statements.register("synsets.max_rowid", "SELECT coalesce(max(rowid), 0) FROM synsets")
+_statements.register("synsets.delete", "DELETE FROM synsets WHERE rowid = ?")
+_statements.register("synsets.rowid_by_id", "SELECT ss.rowid FROM synsets AS ss WHERE ss.id=?")
+_statements.register(
+    "synsets.ids_by_rowid",
+    """
+    SELECT synsets.id , l.id FROM synsets join lexicons l on synsets.lexicon_rowid = l.rowid
+    WHERE synsets.rowid = ?
+    """,
+)
+_statements.register(
+    "synsets.max_generated_id",
+    """
+    SELECT max(cast(replace(synsets.id,?,'') as unsigned)) FROM synsets WHERE lexicon_rowid = ? and id like ?
+    """,
+)
+_statements.register("synsets.set_ili", "UPDATE synsets SET ili_rowid = ? WHERE rowid = ?")
+_statements.register("synsets.delete_ili", "UPDATE synsets SET ili_rowid = null WHERE rowid = ?")
+_statements.register("synsets.lexicon_by_rowid", "SELECT lexicon_rowid FROM synsets WHERE rowid = ?")
+_statements.register("synsets.pos_by_rowid", "SELECT pos FROM synsets WHERE rowid = ?")
+_statements.register("synsets.rowids_by_lexicon", "SELECT id, rowid FROM synsets WHERE lexicon_rowid = ?")
+_statements.register(
+    "ili_mapping.create",
+    "CREATE TEMP TABLE IF NOT EXISTS ili_mapping (synset_rowid INTEGER PRIMARY KEY, ili_rowid INTEGER)",
+)
+_statements.register("ili_mapping.clear", "DELETE FROM temp.ili_mapping")
+_statements.register("ili_mapping.insert", "INSERT OR REPLACE INTO temp.ili_mapping VALUES (?,?)")
+_statements.register(
+    "synsets.set_ili_mapped",
+    """
+    UPDATE synsets SET ili_rowid = (SELECT m.ili_rowid FROM temp.ili_mapping AS m WHERE m.synset_rowid = synsets.rowid)
+    WHERE rowid IN (SELECT synset_rowid FROM temp.ili_mapping)
+    """,
+)
 
-"""
-LEXICON_ID_QUERY = """
+# Relations are only inserted if the lexicon does not have the same (source, target, type) yet
+_statements.register(
+    "synset_relations.insert",
+    """
+    INSERT INTO synset_relations SELECT null, ?1, ?2, ?3, ?4, ?5
+    WHERE NOT EXISTS (
+        SELECT 1 FROM synset_relations
+        WHERE source_rowid = ?2 AND target_rowid = ?3 AND type_rowid = ?4 AND lexicon_rowid = ?1
+    )
+    """,
+)
+_statements.register(
+    "synset_relations.delete",
+    """
+    DELETE FROM synset_relations WHERE lexicon_rowid = ? AND source_rowid = ? AND target_rowid = ?
+    and type_rowid = ?
+    """,
+)
 
-SELECT id FROM lexicons WHERE rowid=?
+_statements.register("definitions.insert", "INSERT INTO definitions VALUES (null,?,?,?,?,?,?)")
+_statements.register("definitions.set_definition", "UPDATE definitions SET definition = ? WHERE rowid = ?")
+_statements.register(
+    "definitions.rowids_by_synset", "SELECT rowid FROM definitions WHERE synset_rowid = ? AND lexicon_rowid = ?"
+)
 
-"""
+_statements.register("synset_examples.insert", "INSERT INTO synset_examples VALUES ( null,?,?,?,?,?)")
+_statements.register(
+    "synset_examples.delete",
+    "DELETE FROM synset_examples WHERE lexicon_rowid = ? and synset_rowid = ? and example = ?",
+)
 
+_statements.register("senses.insert", "INSERT INTO senses VALUES(null,?,?,?,null,?,null,1,null)")
+_statements.register("senses.insert_complete", "INSERT INTO senses VALUES(?,?,?,?,null,?,null,1,null)")
+_statements.register("senses.max_rowid", "SELECT coalesce(max(rowid), 0) FROM senses")
+_statements.register("senses.set_id", "UPDATE senses SET id = ? WHERE rowid = ?")
+_statements.register(
+    "senses.exists", "SELECT EXISTS(SELECT 1 FROM senses WHERE entry_rowid = ? AND synset_rowid = ?)"
+)
+_statements.register("senses.delete", "DELETE FROM senses WHERE rowid = ?")
+_statements.register(
+    "senses.info_by_rowid", "SELECT lexicon_rowid,entry_rowid,synset_rowid,id FROM senses WHERE rowid = ?"
+)
+_statements.register(
+    "senses.max_generated_id",
+    """
+    SELECT max(cast(replace(id,?,'') as unsigned)) FROM senses WHERE entry_rowid = ? and  id like ?
+    """,
+)
 
-def get_artificial(rowid: int) -> bool:
-    query = """
-    SELECT metadata FROM lexicons WHERE rowid = ?
+_statements.register(
+    "sense_relations.insert",
     """
-    with connect() as conn:
-        res = conn.cursor().execute(query, (rowid,)).fetchall()
+    INSERT INTO sense_relations SELECT null, ?1, ?2, ?3, ?4, ?5
+    WHERE NOT EXISTS (
+        SELECT 1 FROM sense_relations
+        WHERE source_rowid = ?2 AND target_rowid = ?3 AND type_rowid = ?4 AND lexicon_rowid = ?1
+    )
+    """,
+)
+_statements.register(
+    "sense_relations.delete",
+    """
+    DELETE FROM sense_relations WHERE lexicon_rowid = ? and source_rowid = ? and target_rowid = ? and type_rowid = ?
+    """,
+)
+_statements.register(
+    "sense_synset_relations.insert",
+    """
+    INSERT INTO sense_synset_relations SELECT null, ?1, ?2, ?3, ?4, ?5
+    WHERE NOT EXISTS (
+        SELECT 1 FROM sense_synset_relations
+        WHERE source_rowid = ?2 AND target_rowid = ?3 AND type_rowid = ?4 AND lexicon_rowid = ?1
+    )
+    """,
+)
+_statements.register(
+    "sense_synset_relations.delete",
+    """
+    DELETE FROM sense_synset_relations WHERE lexicon_rowid = ? and source_rowid = ? and target_rowid = ? and
+    type_rowid = ?
+    """,
+)
+
+_statements.register("adjpositions.insert", "INSERT INTO adjpositions VALUES (?,?)")
+_statements.register(
+    "adjpositions.delete", "DELETE from adjpositions WHERE sense_rowid = ? and adjposition = ?"
+)
+
+_statements.register("counts.insert", "INSERT INTO counts VALUES (null,?,?,?,?)")
+_statements.register(
+    "counts.exists", "SELECT exists(SELECT 1 FROM counts WHERE sense_rowid=? and lexicon_rowid =?)"
+)
+_statements.register(
+    "counts.delete", "DELETE FROM counts WHERE sense_rowid = ? and lexicon_rowid = ? and count = ?"
+)
+_statements.register(
+    "counts.set_count",
+    "UPDATE counts SET count = ? WHERE count = ? and sense_rowid = ? and lexicon_rowid = ?",
+)
+_statements.register(
+    "counts.set_count_and_metadata",
+    "UPDATE counts SET count = ? , metadata = ? WHERE count = ? and sense_rowid = ? and lexicon_rowid = ?",
+)
+
+_statements.register("sense_examples.insert", "INSERT INTO sense_examples VALUES (null,?,?,?,?,?)")
+_statements.register(
+    "sense_examples.delete",
+    "DELETE FROM sense_examples WHERE example = ? and lexicon_rowid = ? and sense_rowid = ?",
+)
+
+_statements.register("syntactic_behaviours.insert", "INSERT INTO syntactic_behaviours VALUES (null,?,?,?)")
+_statements.register("syntactic_behaviours.insert_complete", "INSERT INTO syntactic_behaviours VALUES (?,?,?,?)")
+_statements.register("syntactic_behaviours.max_rowid", "SELECT coalesce(max(rowid), 0) FROM syntactic_behaviours")
+_statements.register(
+    "syntactic_behaviours.by_lexicon", "SELECT frame, rowid FROM syntactic_behaviours WHERE lexicon_rowid = ?"
+)
+_statements.register(
+    "syntactic_behaviour_senses.by_lexicon",
+    """
+    SELECT sbs.syntactic_behaviour_rowid, sbs.sense_rowid FROM syntactic_behaviour_senses AS sbs
+    JOIN syntactic_behaviours AS sb ON sb.rowid = sbs.syntactic_behaviour_rowid
+    WHERE sb.lexicon_rowid = ?
+    """,
+)
+_statements.register("syntactic_behaviours.delete", "DELETE from syntactic_behaviours WHERE rowid = ?")
+_statements.register(
+    "syntactic_behaviours.delete_by_id",
+    "DELETE from syntactic_behaviours WHERE id = ? and lexicon_rowid = ? and frame = ?",
+)
+_statements.register(
+    "syntactic_behaviour_senses.insert", "INSERT INTO syntactic_behaviour_senses VALUES(?,?)"
+)
+_statements.register(
+    "syntactic_behaviour_senses.delete",
+    "DELETE FROM syntactic_behaviour_senses WHERE sense_rowid = ? and syntactic_behaviour_rowid = ?",
+)
+
+_statements.register("entries.insert", "INSERT INTO entries VALUES (null,?,?,?,null)")
+_statements.register("entries.insert_complete", "INSERT INTO entries VALUES (?,?,?,?,null)")
+_statements.register("entries.max_rowid", "SELECT coalesce(max(rowid), 0) FROM entries")
+_statements.register("entries.set_pos", "UPDATE entries SET pos = ? WHERE rowid = ?")
+_statements.register("entries.set_id", "UPDATE entries SET id =? WHERE rowid = ?")
+_statements.register("entries.delete", "DELETE from entries WHERE rowid = ?")
+_statements.register("entries.id_by_rowid", "SELECT id from entries WHERE rowid = ?")
+_statements.register("entries.lexicon_by_rowid", "SELECT lexicon_rowid from entries WHERE rowid = ?")
+_statements.register(
+    "entries.max_generated_id",
+    "SELECT max(cast(replace(id,'w','') as unsigned)) FROM entries WHERE id like 'w%'",
+)
+
+_statements.register("forms.insert", "INSERT INTO forms VALUES (null,null,?,?,?,null,null,null)")
+_statements.register("forms.insert_complete", "INSERT INTO forms VALUES (?,?,?,?,?,?,?,?)")
+_statements.register("forms.max_rowid", "SELECT coalesce(max(rowid), 0) FROM forms")
+_statements.register("forms.set_form", "UPDATE forms SET form = ? WHERE rowid = ?")
+_statements.register("forms.set_normalized_form", "UPDATE forms SET normalized_form = ? WHERE rowid = ?")
+_statements.register("forms.set_entry_rowid", "UPDATE forms SET entry_rowid = ? WHERE rowid = ?")
+_statements.register("forms.set_id", "UPDATE forms SET id = ? WHERE rowid = ?")
+_statements.register("forms.delete", "DELETE FROM forms WHERE rowid = ?")
+_statements.register("forms.lexicon_by_rowid", "SELECT lexicon_rowid from forms where rowid = ?")
+
+_statements.register("pronunciations.insert", "INSERT INTO pronunciations VALUES (?,?,?,?,?,?)")
+_statements.register(
+    "pronunciations.delete",
+    """
+    DELETE from pronunciations WHERE form_rowid = ? and value = ? and variety = ? and notation = ? and phonemic = ?
+    and audio = ?
+    """,
+)
+
+_statements.register("tags.insert", "INSERT INTO tags VALUES (?,?,?)")
+_statements.register("tags.delete", "DELETE FROM tags WHERE form_rowid = ? and tag = ? and category = ?")
+
+
+def get_artificial(rowid: int) -> bool:
+    with _connection() as conn:
+        res = _statements.execute(conn, "lexicons.metadata", (rowid,)).fetchall()
         if res and res[0] and res[0][0] is not None and "note" in dict(res[0][0]):
             return "_.artificial" in dict(res[0][0])["note"]
         else:
             return False
 
 
+class LexiconOverview(NamedTuple):
+    rowid: int
+    id: str
+    version: str
+    label: str
+    modified: bool
+    artificial: bool
+    synsets: int
+    senses: int
+    entries: int
+    relations: int
+
+
+_statements.register(
+    "lexicons.overview",
+    """
+    SELECT rowid, id, version, label, modified,
+           coalesce(instr(json_extract(CAST(metadata AS TEXT), '$.note'), '_.artificial') > 0, 0)
+    FROM lexicons ORDER BY rowid
+    """,
+)
+_OVERVIEW_COUNTS = ("synsets", "senses", "entries", "synset_relations", "sense_relations", "sense_synset_relations")
+
+# (lexicon rowid, id, version) -> row counts (per database, see _state), and the database state they were computed at
+_overview_state: Optional[tuple[int, int, int]] = None
+
+
+def _database_state(conn: sqlite3.Connection) -> tuple[int, int, int]:
+    # data_version changes with commits of other connections, total_changes with our own
+    return id(conn), conn.execute("PRAGMA data_version").fetchone()[0], conn.total_changes
+
+
+def get_lexicon_overview() -> list[LexiconOverview]:
+    """
+
+    Returns id, version, label, modified and artificial flag and the number of synsets, senses, entries and relations
+    of every installed lexicon. The counts are cached: they are only recomputed for lexicons that are new or modified
+    and only if the database changed since the last call.
+
+    """
+    global _overview_state
+    overview_counts: dict[tuple[int, str, str], dict[str, int]] = _state("overview_counts")
+    with _connection() as conn:
+        lexicons = _statements.execute(conn, "lexicons.overview").fetchall()
+        state = _database_state(conn)
+        stale = [
+            row[0]
+            for row in lexicons
+            if row[:3] not in overview_counts or (row[4] and state != _overview_state)
+        ]
+        if stale:
+            name = _statements.register(
+                f"lexicons.overview_counts.{len(stale)}",
+                " UNION ALL ".join(
+                    f"SELECT '{table}', lexicon_rowid, count(*) FROM {table} "
+                    f"WHERE lexicon_rowid IN ({_qs(stale)}) GROUP BY lexicon_rowid"
+                    for table in _OVERVIEW_COUNTS
+                ),
+            )
+            counts = {rowid: dict.fromkeys(_OVERVIEW_COUNTS, 0) for rowid in stale}
+            for table, rowid, count in _statements.execute(conn, name, stale * len(_OVERVIEW_COUNTS)).fetchall():
+                counts[rowid][table] = count
+            overview_counts.update({row[:3]: counts[row[0]] for row in lexicons if row[0] in counts})
+        _overview_state = state
+    overview = []
+    for rowid, lex_id, version, label, modified, artificial in lexicons:
+        counts = overview_counts[(rowid, lex_id, version)]
+        overview.append(
+            LexiconOverview(
+                rowid,
+                lex_id,
+                version,
+                label,
+                bool(modified),
+                bool(artificial),
+                counts["synsets"],
+                counts["senses"],
+                counts["entries"],
+                counts["synset_relations"] + counts["sense_relations"] + counts["sense_synset_relations"],
+            )
+        )
+    return overview
+
+
 def reset_all_wordnets(delete_artificial=False):
     """
 
@@ -159,17 +856,13 @@ def reset_all_wordnets(delete_artificial=False):
     Warning: This will delete ALL modifications made and is __not__ reversible
 
     """
-    pr = wn.lexicons()
     print("Installed: ")
     get_wordnet_overview()
-    for prj in pr:
-        rowid = get_row_id("lexicons", {"id": prj.id, "version": prj.version})
-        artificial = get_artificial(rowid)
-        modified = get_modified(rowid)
-        if modified and (not artificial or delete_artificial):
-            wn.remove(f"{prj.id}:{prj.version}")
-            if not artificial:
-                wn.download(f"{prj.id}:{prj.version}")
+    for lex in get_lexicon_overview():
+        if lex.modified and (not lex.artificial or delete_artificial):
+            wn.remove(f"{lex.id}:{lex.version}")
+            if not lex.artificial:
+                wn.download(f"{lex.id}:{lex.version}")
 
 
 def get_wordnet_overview():
@@ -178,143 +871,112 @@ def get_wordnet_overview():
     Prints an overview over all wordnets
 
     """
-    for lex in wn.lexicons():
-        rowid = get_row_id("lexicons", {"id": lex.id, "version": lex.version})
-
+    for lex in get_lexicon_overview():
         print(
             f"{lex.id}:{lex.version}\t{lex.label}"
-            + ("\tModified" if get_modified(rowid) else "\t")
-            + ("\tArtificial" if get_artificial(rowid) else "\t")
+            + ("\tModified" if lex.modified else "\t")
+            + ("\tArtificial" if lex.artificial else "\t")
         )
 
 
 def _get_valid_sense_id(entry_id: int, form: str = "unkown") -> str:
-    get_all_sense_id_of_entry_query = """
-    
-    SELECT max(cast(replace(id,?,'') as unsigned)) FROM senses WHERE entry_rowid = ? and  id like ?
-    
-    """
-    with connect() as conn:
-        cur = conn.cursor()
+    with _connection() as conn:
         s = f"w_{form}_"
-        cur.execute(get_all_sense_id_of_entry_query, (s, entry_id, s + "%"))
-        res = cur.fetchall()
+        res = _statements.execute(conn, "senses.max_generated_id", (s, entry_id, s + "%")).fetchall()
         if res and res[0] and res[0][0] is not None:
             return s + str(res[0][0] + 1)
         else:
             return s + "0"
 
 
-def _get_valid_entity_id() -> str:
-    query = """
-    
-    SELECT max(cast(replace(id,'w','') as unsigned)) FROM entries WHERE id like 'w%'
+def _next_generated_number(conn: sqlite3.Connection, name: str, params=()) -> int:
+    """
+    Returns the number of the next generated ID: one more than the highest number found by the statement ``name`` or,
+    inside :func:`_counted_ids`, the counter kept in memory since the first ID of the block
+    """
+    counters = _state("id_counters", conn).get("counters")
+    key = (name, *params)
+    if counters is not None and key in counters:
+        number = counters[key]
+    else:
+        res = _statements.execute(conn, name, params).fetchall()
+        number = res[0][0] + 1 if res and res[0] and res[0][0] is not None else 0
+    if counters is not None:
+        counters[key] = number + 1
+    return number
+
+
+@contextmanager
+def _counted_ids(conn: sqlite3.Connection) -> Iterator[None]:
+    """
+
+    Counts the generated synset and entry IDs in memory inside the block, so the highest generated ID (which takes a
+    scan of the synsets of the lexicon or of all entries) is only looked up for the first new synset and entry instead
+    of for every one. The block takes the write lock, so no other connection can generate IDs in the meantime.
 
     """
-    with connect() as conn:
-        cur = conn.cursor()
-        cur.execute(query)
-        res = cur.fetchall()
-        if res and res[0]:
-            return "w" + str(res[0][0] + 1)
-        else:
-            return "w0"
+    state = _state("id_counters", conn)
+    _lock_for_write(conn)
+    state["counters"] = {}
+    try:
+        yield
+    finally:
+        state["counters"] = None
+
+
+def _get_valid_entity_id() -> str:
+    with _connection() as conn:
+        return f"w{_next_generated_number(conn, 'entries.max_generated_id')}"
 
 
 def _get_valid_synset_id(lex_rowid: int) -> str:
-    query = """
-    SELECT max(cast(replace(synsets.id,?,'') as unsigned)) FROM synsets WHERE lexicon_rowid = ? and id like ?
-    """
-    with connect() as conn:
-        cur = conn.cursor()
+    with _connection() as conn:
         s = _get_lex_name_from_lex_id(lex_rowid) + "-"
-        res = cur.execute(query, (s, lex_rowid, s + "%")).fetchall()
-        if res and res[0] and res[0][0] is not None:
-            return s + str(res[0][0] + 1)
-        else:
-            return s + "0"
+        return s + str(_next_generated_number(conn, "synsets.max_generated_id", (s, lex_rowid, s + "%")))
 
 
 def _get_lex_name_from_lex_id(lex_id) -> str:
-    query = """
-
-    SELECT id from lexicons WHERE rowid = ?
-
-    """
-    with connect() as conn:
-        cur = conn.cursor()
-        cur.execute(query, (lex_id,))
-        res = cur.fetchall()
+    with _connection() as conn:
+        res = _statements.execute(conn, "lexicons.id_by_rowid", (lex_id,)).fetchall()
         if res and res[0]:
             return str(res[0][0])
 
 
 def _get_ili_rowid_from_id(ili_id: str) -> int:
-    query = """
-    
-    SELECT rowid FROM ilis WHERE id = ?
-    
-    """
-    with connect() as conn:
-        cur = conn.cursor()
-        cur.execute(query, (ili_id,))
-        res = cur.fetchall()
+    with _connection() as conn:
+        res = _statements.execute(conn, "ilis.rowid_by_id", (ili_id,)).fetchall()
         if res and res[0]:
             return int(res[0][0])
 
 
 def _get_all_lexicon_row_ids() -> list[int]:
-    query = """
-        SELECT rowid FROM lexicons
-    """
-    with connect() as conn:
-        res = conn.cursor().execute(query, ()).fetchall()
-        return [r[0][0] for r in res if res[0]]
+    with _connection() as conn:
+        res = _statements.execute(conn, "lexicons.rowids").fetchall()
+        return [r[0] for r in res]
 
 
 def _get_lex_id_from_row(rowId) -> str | None:
-    with connect() as conn:
-        cur = conn.cursor()
-
-        cur.execute(LEXICON_ID_QUERY, (rowId,))
-        i = cur.fetchall()[0]
+    with _connection() as conn:
+        i = _statements.execute(conn, "lexicons.id_by_rowid", (rowId,)).fetchall()[0]
         if i:
             return i[0]
 
 
 def _get_row_id_from_lex(lex_id) -> int | None:
-    get_query = """
-    
-    SELECT rowid FROM lexicons WHERE id =?
-    
-    """
-    with connect() as conn:
-        cur = conn.cursor()
-        cur.execute(get_query, (lex_id,))
-        res = cur.fetchall()
+    with _connection() as conn:
+        res = _statements.execute(conn, "lexicons.rowid_by_id", (lex_id,)).fetchall()
         if res and res[0]:
             return int(res[0][0])
 
 
 def _get_valid_ili_id() -> str:
-    query = """
-    
-    SELECT max(cast(replace(id,'i','') as unsigned)) as ids from ilis
-    """
-    with connect() as conn:
-        cur = conn.cursor()
-        cur.execute(query, ())
-        res = cur.fetchall()
-        if res and res[0]:
-            return "i" + res[0][0]
+    with _connection() as conn:
+        return f"i{_statements.execute(conn, 'ilis.max_id').fetchone()[0] + 1}"
 
 
 def _get_row_id(synset: Synset) -> int:
-    get_query = """SELECT ss.rowid FROM synsets AS ss WHERE ss.id=?"""
-    with connect() as conn:
-        cur = conn.cursor()
-        cur.execute(get_query, (synset.id,))
-        res = cur.fetchall()
+    with _connection() as conn:
+        res = _statements.execute(conn, "synsets.rowid_by_id", (synset.id,)).fetchall()
         return res[0][0]
 
 
@@ -323,22 +985,25 @@ def _remove_relation(
 ) -> None:
     if isinstance(relationType, RelationType):
         relationType = relationType.value
-    query = """
-    
-        DELETE FROM synset_relations WHERE lexicon_rowid = ? AND source_rowid = ? AND target_rowid = ? 
-        and type_rowid = ?
-    
-    """
-    data = (
+    _remove_relation_rowids(
         _get_row_id_from_lex(synset_source.lexicon().id),
         _get_row_id(synset_source),
         _get_row_id(synset_target),
         relationType,
     )
-    with connect() as conn:
-        cur = conn.cursor()
-        cur.execute(query, data)
-        conn.commit()
+
+
+def _remove_relation_rowids(
+        lex_rowid: int, source_rowid: int, target_rowid: int, relationType: RelationType | int
+) -> None:
+    if isinstance(relationType, RelationType):
+        relationType = relationType.value
+    data = (lex_rowid, source_rowid, target_rowid, relationType)
+    with _connection() as conn:
+        cur = _statements.execute(conn, "synset_relations.delete", data)
+        cycles._relation_removed(*data, cur.rowcount)
+        closure._relation_removed(conn, data[1], data[2], relationType)
+        _commit(conn)
 
 
 def _set_relation_to_sense(
@@ -349,11 +1014,6 @@ def _set_relation_to_sense(
 ):
     if isinstance(relationType, RelationType):
         relationType = relationType.value
-    query = """
-    
-    INSERT INTO sense_synset_relations VALUES (null,?,?,?,?,?)
-    
-    """
     lex_rowid = get_row_id(
         "lexicons", {"id": sense.lexicon().id, "version": sense.lexicon().version}
     )
@@ -365,9 +1025,9 @@ def _set_relation_to_sense(
         relationType,
         meta,
     )
-    with connect() as conn:
-        conn.cursor().execute(query, data)
-        conn.commit()
+    with _connection() as conn:
+        _statements.execute(conn, "sense_synset_relations.insert", data)
+        _commit(conn)
 
 
 def _set_relation_to_synset(
@@ -376,23 +1036,45 @@ def _set_relation_to_synset(
         relationType: RelationType | int,
         meta: Optional[Metadata] = None,
 ) -> None:
-    if isinstance(relationType, RelationType):
-        relationType = relationType.value
-    query = """
-        INSERT INTO synset_relations
-        VALUES (null,?,?,?,?,?)
-    """
-    data = (
+    _set_relation_rowids(
         _get_row_id_from_lex(synset_source.lexicon().id),
         _get_row_id(synset_source),
         _get_row_id(synset_target),
         relationType,
         meta,
     )
-    with connect() as conn:
-        cur = conn.cursor()
-        cur.execute(query, data)
-        conn.commit()
+
+
+def _set_relation_rowids(
+        lex_rowid: int, source_rowid: int, target_rowid: int, relationType: RelationType | int,
+        meta: Optional[Metadata] = None,
+) -> None:
+    if isinstance(relationType, RelationType):
+        relationType = relationType.value
+    data = (lex_rowid, source_rowid, target_rowid, relationType, meta)
+    cycles._check_relation(*data[:4])
+    with _connection() as conn:
+        if _statements.execute(conn, "synset_relations.insert", data).rowcount:
+            cycles._relation_added(*data[:4])
+            closure._relation_added(conn, data[1], data[2], relationType)
+        _commit(conn)
+
+
+def _bulk_changed(lex_rowid: int, relations: bool = True, words: bool = True) -> None:
+    """
+    Brings the optional indexes up to date after rows of a lexicon were changed without the editors: ``words`` its
+    entries, forms, senses, definitions or examples, ``relations`` its synset relations
+    """
+    if words:
+        lemmas._lexicon_changed(lex_rowid)
+        if search.text_index_enabled():
+            search.rebuild_text_index()
+    if relations:
+        if closure.hypernym_closure_enabled():
+            closure.rebuild_hypernym_closure()
+        guard = cycles.get_cycle_guard(lex_rowid)
+        if guard:
+            guard.load()
 
 
 class _Editor:
@@ -408,13 +1090,12 @@ class _Editor:
         self.lex_rowid = lex_rowid
 
     def set_modified(self):
-        with connect() as conn:
+        with _connection() as conn:
             if isinstance(self.lex_rowid, list):
-                for rowid in self.lex_rowid:
-                    conn.cursor().execute(SET_MOD_QUERY, (rowid,))
+                _statements.executemany(conn, "lexicons.set_modified", [(rowid,) for rowid in self.lex_rowid])
             else:
-                conn.cursor().execute(SET_MOD_QUERY, (self.lex_rowid,))
-            conn.commit()
+                _statements.execute(conn, "lexicons.set_modified", (self.lex_rowid,))
+            _commit(conn)
 
     def get_lexicon_editor(self) -> Optional[LexiconEditor]:
         """
@@ -438,6 +1119,7 @@ class LexiconEditor(_Editor):
     """
 
     @classmethod
+    @_undoable
     def create_new_lexicon(
             cls,
             lex_id: str,
@@ -453,11 +1135,6 @@ class LexiconEditor(_Editor):
     ) -> LexiconEditor:
         """
         Creates a new Lexicon with the attribute 'artificial' and returns its :class:`LexiconEditor`
-        """
-        query = """
-        
-        INSERT INTO lexicons VALUES (null,?,?,?,?,?,?,?,?,?,?,0)
-        
         """
         metadata = metadata if metadata else {}
         if "note" in metadata:
@@ -466,7 +1143,7 @@ class LexiconEditor(_Editor):
                                ) + " _.artificial"
         else:
             metadata["note"] = " _.artificial"
-        with connect() as conn:
+        with _connection() as conn:
             data = (
                 lex_id,
                 label,
@@ -479,8 +1156,8 @@ class LexiconEditor(_Editor):
                 logo,
                 metadata,
             )
-            conn.cursor().execute(query, data)
-            conn.commit()
+            _statements.execute(conn, "lexicons.insert", data)
+            _commit(conn)
             return LexiconEditor(
                 get_row_id("lexicons", {"id": lex_id, "version": version})
             )
@@ -501,15 +1178,9 @@ class LexiconEditor(_Editor):
 
     @_modifies_db
     def _id(self, lex_id: str):
-        query = """
-        
-        UPDATE lexicons SET id = ? WHERE rowid = ?
-        
-        """
-        with connect() as conn:
-            cur = conn.cursor()
-            cur.execute(query, (lex_id, self.lex_rowid))
-            conn.commit()
+        with _connection() as conn:
+            _statements.execute(conn, "lexicons.set_id", (lex_id, self.lex_rowid))
+            _commit(conn)
 
     def create_synset(self) -> SynsetEditor:
         """
@@ -544,22 +1215,20 @@ class LexiconEditor(_Editor):
             else FormEditor(self.create_entry().entry_id)
         )
 
+    @_undoable
     def add_syntactic_behaviour(
             self, syn_id: str, frame: str, sense: Optional[wn.Sense] = None
     ):
         """
         Create a new Syntactic Behaviour. Can be passed a Sense to map it to
         """
-        query = """
-        INSERT INTO syntactic_behaviours VALUES (null,?,?,?)
-        """
-        with connect() as conn:
-            conn.cursor().execute(query, (syn_id, self.lex_rowid, frame)).fetchall()
+        with _connection() as conn:
+            _statements.execute(conn, "syntactic_behaviours.insert", (syn_id, self.lex_rowid, frame))
             rowid = get_row_id(
                 "syntactic_behaviours", {"lexicon_rowid": self.lex_rowid, "id": syn_id}
             )
             SenseEditor(sense).add_syntactic_behaviour(rowid)
-            conn.commit()
+            _commit(conn)
 
     def delete_syntactic_behaviour(
             self,
@@ -579,18 +1248,141 @@ class LexiconEditor(_Editor):
             raise AttributeError
         else:
             if syn_row_id is not None:
-                query = """
-                DELETE from syntactic_behaviours WHERE rowid = ?
-                """
-                with connect() as conn:
-                    conn.cursor().execute(query, (syn_row_id,))
-                    conn.commit()
+                with _connection() as conn:
+                    _statements.execute(conn, "syntactic_behaviours.delete", (syn_row_id,))
+                    _commit(conn)
             else:
-                query = """
-                DELETE from syntactic_behaviours WHERE id = ? and lexicon_rowid = ? and frame = ?
-                """
-                with connect() as conn:
-                    conn.cursor().execute(query, (syn_id, self.lex_rowid, frame))
+                with _connection() as conn:
+                    _statements.execute(conn, "syntactic_behaviours.delete_by_id", (syn_id, self.lex_rowid, frame))
+                    _commit(conn)
+
+    def add_syntactic_behaviours(
+            self,
+            assignments: Iterable[tuple[str, int | wn.Sense]],
+            frame_ids: Optional[dict[str, str]] = None,
+            chunk_size: int = 10000,
+    ) -> dict[str, int]:
+        """
+
+        Assigns many syntactic behaviours (frames) to senses at once. ``assignments`` yields (frame, sense) pairs, the
+        sense as rowid or :class:`wn.Sense`. Frames are de-duplicated by their text: missing frames are created once
+        (with the ID from ``frame_ids`` if given), existing frames and links of the lexicon are reused. Everything is
+        inserted with executemany in a single transaction. Returns the rowid of every frame used.
+
+        >>> LexiconEditor("mywn").add_syntactic_behaviours([("Somebody ----s", 12), ("Somebody ----s something", 12)])
+
+        """
+        frame_ids = frame_ids or {}
+        with transaction() as conn:
+            _lock_for_write(conn)
+            frames = dict(_statements.execute(conn, "syntactic_behaviours.by_lexicon", (self.lex_rowid,)).fetchall())
+            links = set(
+                _statements.execute(conn, "syntactic_behaviour_senses.by_lexicon", (self.lex_rowid,)).fetchall()
+            )
+            next_rowid = _statements.execute(conn, "syntactic_behaviours.max_rowid").fetchone()[0] + 1
+            used = {}
+            for chunk in _chunks(assignments, chunk_size):
+                frame_rows, link_rows = [], []
+                for frame, sense in chunk:
+                    if frame not in frames:
+                        frames[frame] = next_rowid
+                        frame_rows.append((next_rowid, frame_ids.get(frame), self.lex_rowid, frame))
+                        next_rowid += 1
+                    sense_rowid = SenseEditor(sense).row_id if isinstance(sense, wn.Sense) else sense
+                    link = (frames[frame], sense_rowid)
+                    if link not in links:
+                        links.add(link)
+                        link_rows.append(link)
+                    used[frame] = frames[frame]
+                _statements.executemany(conn, "syntactic_behaviours.insert_complete", frame_rows)
+                _statements.executemany(conn, "syntactic_behaviour_senses.insert", link_rows)
+            self.set_modified()
+        return used
+
+    def validate(self, repair: bool = False, destructive: bool = False):
+        """
+        Run the integrity checks of :func:`wn_editor.validate.validate_lexicon` over this lexicon
+        """
+        from wn_editor.validate import validate_lexicon
+
+        return validate_lexicon(self, repair, destructive)
+
+    def deduplicate_relations(self) -> dict[str, int]:
+        """
+        Delete repeated relations of this lexicon, see :func:`wn_editor.validate.deduplicate_relations`
+        """
+        from wn_editor.validate import deduplicate_relations
+
+        return deduplicate_relations(self)
+
+    def canonicalize_ids(self, scheme=None) -> dict[str, int]:
+        """
+        Replace the generated IDs of this lexicon, see :func:`wn_editor.ids.canonicalize_ids`
+        """
+        from wn_editor.ids import canonicalize_ids
+
+        return canonicalize_ids(self, scheme)
+
+    def merge_from(self, other: LexiconEditor | str | int, match_lemmas: bool = True):
+        """
+        Merge another lexicon into this one without duplicates, see :func:`wn_editor.merge.merge_lexicons`
+        """
+        from wn_editor.merge import merge_lexicons
+
+        return merge_lexicons(self, other, match_lemmas)
+
+    @_undoable
+    def set_ilis(
+            self, mapping: dict[str, Optional[str]], definitions: Optional[dict[str, str]] = None
+    ) -> dict[str, Optional[str]]:
+        """
+
+        Sets the ILIs of many synsets of this lexicon at once. ``mapping`` maps synset IDs to an ILI ID, to ``"new"``
+        or to None (removes the ILI). For ``"new"`` the synset gets no ILI but a proposed ILI with the definition from
+        ``definitions`` (``ili="in"`` in WN-LMF); ILI IDs not in the database yet are created as presupposed. Returns
+        the ILI ID of every synset, ``"in"`` for proposed ILIs.
+
+        >>> LexiconEditor("mywn").set_ilis({"mywn-1-n": "i35545", "mywn-2-n": "new"}, {"mywn-2-n": "A new concept"})
+        {'mywn-1-n': 'i35545', 'mywn-2-n': 'in'}
+
+        """
+        definitions = definitions or {}
+        result = {}
+        with _connection() as conn:
+            synsets = dict(_statements.execute(conn, "synsets.rowids_by_lexicon", (self.lex_rowid,)).fetchall())
+            unknown = [synset_id for synset_id in mapping if synset_id not in synsets]
+            if unknown:
+                raise AttributeError(f"Unknown synsets {', '.join(unknown[:10])}")
+            _lock_for_write(conn)
+            ilis = dict(_statements.execute(conn, "ilis.rowids").fetchall())
+            next_rowid = _statements.execute(conn, "ilis.max_rowid").fetchone()[0] + 1
+            new_ilis, proposed, mapped = [], [], []
+            for synset_id, ili_id in mapping.items():
+                rowid = synsets[synset_id]
+                if ili_id == "new":
+                    if synset_id not in definitions:
+                        raise AttributeError(f"No definition for the new ILI of {synset_id}")
+                    proposed.append((rowid, definitions[synset_id], None))
+                    mapped.append((rowid, None))
+                    result[synset_id] = "in"
+                    continue
+                if ili_id is not None and ili_id not in ilis:
+                    new_ilis.append((next_rowid, ili_id, IliStatus.presupposed.value, None))
+                    ilis[ili_id] = next_rowid
+                    next_rowid += 1
+                mapped.append((rowid, ilis.get(ili_id)))
+                result[synset_id] = ili_id
+            _statements.execute(conn, "ili_mapping.create")
+            _statements.execute(conn, "ili_mapping.clear")
+            _statements.executemany(conn, "ilis.insert_complete", new_ilis)
+            _statements.executemany(conn, "ili_mapping.insert", mapped)
+            _statements.execute(conn, "synsets.set_ili_mapped")
+            _statements.execute(conn, "proposed_ilis.delete_mapped")
+            _statements.executemany(conn, "proposed_ilis.insert", proposed)
+            _statements.execute(conn, "ili_mapping.clear")
+            _commit(conn)
+        self.set_modified()
+        return result
 
     def as_lexicon(self) -> wn.Lexicon:
         return wn.lexicons(lexicon=_get_lex_name_from_lex_id(self.lex_rowid))[0]
@@ -633,14 +1425,8 @@ class IlIEditor(_Editor):
     @_modifies_db
     def _create(self) -> int:
         ili_id = _get_valid_ili_id()
-        query = """
-        
-        INSERT INTO ilis VALUES (null,?,3,null,null)
-        
-        """
-        with connect() as conn:
-            cur = conn.cursor()
-            cur.execute(query, (ili_id,))
+        with _connection() as conn:
+            _statements.execute(conn, "ilis.insert", (ili_id,))
             return get_row_id("ilis", {"id": ili_id})
 
     @_modifies_db
@@ -650,14 +1436,9 @@ class IlIEditor(_Editor):
         Sets the definition of the ILI
 
         """
-        query = """
-        
-        UPDATE ilis SET definition = ? WHERE rowid = ?
-        
-        """
-        with connect() as conn:
-            conn.cursor().execute(query, (definition, self.row_id))
-            conn.commit()
+        with _connection() as conn:
+            _statements.execute(conn, "ilis.set_definition", (definition, self.row_id))
+            _commit(conn)
 
     @_modifies_db
     def set_status(self, status: IliStatus):
@@ -666,12 +1447,9 @@ class IlIEditor(_Editor):
         Sets the status of the IlI
 
         """
-        query = """
-        UPDATE ilis SET status_rowid = ? WHERE rowid = ?
-        """
-        with connect() as conn:
-            conn.cursor().execute(query, (status.value, self.row_id))
-            conn.commit()
+        with _connection() as conn:
+            _statements.execute(conn, "ilis.set_status", (status.value, self.row_id))
+            _commit(conn)
 
     @_modifies_db
     def set_meta(self, meta: Metadata):
@@ -680,12 +1458,9 @@ class IlIEditor(_Editor):
         Sets the metadata of the ILI
 
         """
-        query = """
-        UPDATE ilis SET metadata = ? WHERE rowid = ?
-        """
-        with connect() as conn:
-            conn.cursor().execute(query, (meta, self.row_id))
-            conn.commit()
+        with _connection() as conn:
+            _statements.execute(conn, "ilis.set_metadata", (meta, self.row_id))
+            _commit(conn)
 
     def as_ili(self) -> wn.ILI:
         """
@@ -693,11 +1468,8 @@ class IlIEditor(_Editor):
         returns the :class:`wn.Ili` object.
 
         """
-        query = """
-        SELECT id from ilis WHERE rowid = ?
-        """
-        with connect() as conn:
-            res = conn.cursor().execute(query, (self.row_id,)).fetchall()
+        with _connection() as conn:
+            res = _statements.execute(conn, "ilis.id_by_rowid", (self.row_id,)).fetchall()
             if res and res[0]:
                 return wn.ili(res[0][0])
 
@@ -707,20 +1479,15 @@ def _delete_relaton_to_sense(
 ):
     if isinstance(reltype, RelationType):
         reltype = reltype.value
-    query = """
-    
-    DELETE FROM sense_synset_relations WHERE lexicon_rowid = ? and source_rowid = ? and target_rowid = ? and 
-    type_rowid = ?    
-    """
     data = (
         _get_row_id_from_lex(sense.lexicon().id),
         SenseEditor(sense).row_id,
         SynsetEditor(synset).rowid,
         reltype,
     )
-    with connect() as conn:
-        conn.cursor().execute(query, data)
-        conn.commit()
+    with _connection() as conn:
+        _statements.execute(conn, "sense_synset_relations.delete", data)
+        _commit(conn)
 
 
 def _delete_sense_sense_relation(
@@ -729,20 +1496,15 @@ def _delete_sense_sense_relation(
 ):
     if isinstance(relation_type, RelationType):
         relation_type = relation_type.value
-    query = """
-    
-    DELETE FROM sense_relations WHERE lexicon_rowid = ? and source_rowid = ? and target_rowid = ? and type_rowid = ? 
-    
-    """
     data = (
         _get_row_id_from_lex(sense_source.lexicon().id),
         SenseEditor(sense_source).row_id,
         SenseEditor(sense_target).row_id,
         relation_type,
     )
-    with connect() as conn:
-        conn.execute(query, data)
-        conn.commit()
+    with _connection() as conn:
+        _statements.execute(conn, "sense_relations.delete", data)
+        _commit(conn)
 
 
 class SynsetEditor(_Editor):
@@ -755,14 +1517,13 @@ class SynsetEditor(_Editor):
 
     @classmethod
     def from_rowid(cls, rowid: int):
-        query = """
-            SELECT synsets.id , l.id FROM synsets join lexicons l on synsets.lexicon_rowid = l.rowid 
-            WHERE synsets.rowid = ?
-            """
-        with connect() as conn:
-            res = conn.cursor().execute(query, (rowid,)).fetchall()
-            if res is not None and res[0] is not None:
-                return cls(wn.synset(id=res[0][0], lexicon=res[0][1]))
+        with _connection() as conn:
+            res = _statements.execute(conn, "synsets.lexicon_by_rowid", (rowid,)).fetchall()
+        if res:
+            editor = cls.__new__(cls)
+            _Editor.__init__(editor, res[0][0])
+            editor.rowid = rowid
+            return editor
 
     @overload
     def __init__(self, synset: Synset) -> None:
@@ -778,7 +1539,7 @@ class SynsetEditor(_Editor):
 
     def __init__(self, inp: Synset | int | str) -> None:
 
-        if isinstance(inp, Synset):
+        if isinstance(inp, wn.Synset):
             lex_rowid = get_row_id(
                 "lexicons", {"id": inp.lexicon().id, "version": inp.lexicon().version}
             )
@@ -798,13 +1559,10 @@ class SynsetEditor(_Editor):
 
     @_modifies_db
     def _create(self, syn_id, meta) -> int:
-        query = """
-        INSERT INTO synsets VALUES (null,?,?,null,null,1,null,?)
-        """
         data = (syn_id, self.lex_rowid, meta)
-        with connect() as conn:
-            conn.cursor().execute(query, data)
-            conn.commit()
+        with _connection() as conn:
+            _statements.execute(conn, "synsets.insert", data)
+            _commit(conn)
             return get_row_id(
                 "synsets", {"id": syn_id, "lexicon_rowid": self.lex_rowid}
             )
@@ -815,9 +1573,28 @@ class SynsetEditor(_Editor):
 
         This is a shortcut method to create a new word/entry inside the synset. This method will create an entry and
         a sense, assign fitting ids and add a form to the sense which contains the argument as word.
-
-        """
-        entry_edit = EntryEditor(self.lex_rowid, exists=False)
+        If the lemma index of the lexicon was enabled with ``reuse_entries``, an existing entry with this lemma and the
+        part of speech of the synset is reused instead of creating a new one.
+
+        """
+        index = lemmas._indexes().get(self.lex_rowid)
+        if index is not None and index.reuse_entries:
+            with _connection() as conn:
+                pos = _statements.execute(conn, "synsets.pos_by_rowid", (self.rowid,)).fetchone()[0] or "u"
+                entries = index.find(word, pos)
+                if entries:
+                    if not _statements.execute(conn, "senses.exists", (entries[0], self.rowid)).fetchone()[0]:
+                        SenseEditor(
+                            lexicon_rowid=self.lex_rowid,
+                            entry_rowid=entries[0],
+                            synset_rowid=self.rowid,
+                        ).set_id(_get_valid_sense_id(entry_id=entries[0], form=word))
+                    return self
+            entry_edit = EntryEditor(self.lex_rowid, exists=False)
+            if pos != "u":
+                entry_edit.set_pos(pos)
+        else:
+            entry_edit = EntryEditor(self.lex_rowid, exists=False)
         SenseEditor(
             lexicon_rowid=self.lex_rowid,
             entry_rowid=entry_edit.entry_id,
@@ -833,12 +1610,14 @@ class SynsetEditor(_Editor):
         This method will try to delete a word from a synset, by searching trough all senses' words until it findes a
         wordwhich as the argument as lemma. Then the sense is deleted.
         Warning: this deletes the __Sense__ not the relation.
+        Only the sense in this synset is deleted, the senses of the word in other synsets are kept.
 
         """
-        for w in self.as_synset().words():
-            if w.lemma() == word:
-                for se in w.senses():
-                    SenseEditor(se).delete()
+        with _connection() as conn:
+            for sense_rowid, _, synset_rowid in lemmas.find_senses(self.lex_rowid, word):
+                if synset_rowid == self.rowid:
+                    _statements.execute(conn, "senses.delete", (sense_rowid,))
+            _commit(conn)
         return self
 
     def set_hypernym_of(self, synset: Synset | str) -> SynsetEditor:
@@ -897,7 +1676,7 @@ class SynsetEditor(_Editor):
 
     @_modifies_db
     def set_relation_to_synset(
-            self, synset: Synset | str, relation_type: RelationType | int
+            self, synset: Synset | SynsetEditor | str, relation_type: RelationType | int
     ) -> SynsetEditor:
         """
 
@@ -905,31 +1684,37 @@ class SynsetEditor(_Editor):
         new synset to set the relation to.
 
         """
-        if not isinstance(synset, Synset):
-            synset = SynsetEditor(self.lex_rowid).add_word(synset).as_synset()
-        _set_relation_to_synset(synset, self.as_synset(), relation_type)
+        if isinstance(synset, str):
+            synset = SynsetEditor(self.lex_rowid).add_word(synset)
+        elif isinstance(synset, wn.Synset):
+            synset = SynsetEditor(synset)
+        _set_relation_rowids(synset.lex_rowid, synset.rowid, self.rowid, relation_type)
         return self
 
     @_modifies_db
     def delete_relation_to_synset(
-            self, synset: Synset | str, reltype: RelationType | int
+            self, synset: Synset | SynsetEditor | str, reltype: RelationType | int
     ) -> SynsetEditor:
         """
 
         This method deletes a relation to a synset.
-        It can also be called with a string to delete the relation to all synsets which contain this word.
-        (Potentially unsafe)
+        It can also be called with a string to delete the relation to all synsets of this lexicon which contain this
+        word. (Potentially unsafe)
 
 
         """
         if isinstance(synset, str):
             logger.warn(
-                f"Removing relation to ALL synsets wn can find with name '{synset}'"
+                f"Removing relation to ALL synsets of the lexicon with the word '{synset}'"
             )
-            for sset in wn.synsets(synset):
-                _remove_relation(sset, self.as_synset(), reltype)
+            if isinstance(reltype, RelationType):
+                reltype = reltype.value
+            for rowid in lemmas.find_synsets(self.lex_rowid, synset):
+                _remove_relation_rowids(self.lex_rowid, rowid, self.rowid, reltype)
         else:
-            _remove_relation(synset, self.as_synset(), reltype)
+            if isinstance(synset, wn.Synset):
+                synset = SynsetEditor(synset)
+            _remove_relation_rowids(synset.lex_rowid, synset.rowid, self.rowid, reltype)
         return self
 
     @_modifies_db
@@ -939,12 +1724,11 @@ class SynsetEditor(_Editor):
         Deletes this synset from the database
 
         """
-        query = """
-        DELETE FROM synsets WHERE rowid = ?
-        """
-        with connect() as conn:
-            conn.cursor().execute(query, (self.rowid,))
-            conn.commit()
+        with _connection() as conn:
+            _statements.execute(conn, "synsets.delete", (self.rowid,))
+            cycles._synset_deleted(self.rowid)
+            closure._synset_changed(conn, self.rowid)
+            _commit(conn)
 
     @_modifies_db
     def set_ili(self, ili: int | wn.ILI) -> SynsetEditor:
@@ -953,18 +1737,12 @@ class SynsetEditor(_Editor):
         Sets the ILI of this Synset. Takes a rowid or a :class:`wn.ILI`.
 
 
-        """
-        query = """
-        
-        UPDATE synsets SET ili_rowid = ? WHERE rowid = ?
-        
         """
         if isinstance(ili, wn.ILI):
             ili = IlIEditor(ili).row_id
-        with connect() as conn:
-            cur = conn.cursor()
-            cur.execute(query, (ili, self.rowid))
-            conn.commit()
+        with _connection() as conn:
+            _statements.execute(conn, "synsets.set_ili", (ili, self.rowid))
+            _commit(conn)
         return self
 
     @_modifies_db
@@ -974,22 +1752,36 @@ class SynsetEditor(_Editor):
         Removes the ILI from the Synset
 
         """
-        query = """
-        
-        UPDATE synsets SET ili_rowid = null WHERE rowid = ?
-        
-        """
-        with connect() as conn:
-            conn.cursor().execute(query, (self.rowid,))
-            conn.commit()
+        with _connection() as conn:
+            _statements.execute(conn, "synsets.delete_ili", (self.rowid,))
+            _commit(conn)
         return self
 
-    def as_synset(self) -> wn.Synset:
-        query = """
-        SELECT synsets.id , l.id FROM synsets join lexicons l on synsets.lexicon_rowid = l.rowid WHERE synsets.rowid = ?
+    def merge_into(self, synset: Synset | SynsetEditor | int) -> SynsetEditor:
+        """
+
+        Merges this synset into another one (given as rowid, :class:`wn.Synset` or editor) and returns the editor of
+        the other one, see :func:`wn_editor.reorganize.merge_synsets`. This synset is deleted.
+
+        """
+        from wn_editor.reorganize import merge_synsets
+
+        merge_synsets([(self, synset)])
+        if isinstance(synset, SynsetEditor):
+            return synset
+        return SynsetEditor(synset) if isinstance(synset, wn.Synset) else SynsetEditor.from_rowid(synset)
+
+    def split(self, senses: Iterable[wn.Sense | SenseEditor | int]) -> SynsetEditor:
+        """
+        Moves senses of this synset into a new synset, see :func:`wn_editor.reorganize.split_synset`
         """
-        with connect() as conn:
-            res = conn.cursor().execute(query, (self.rowid,)).fetchall()
+        from wn_editor.reorganize import split_synset
+
+        return split_synset(self, senses)
+
+    def as_synset(self) -> wn.Synset:
+        with _connection() as conn:
+            res = _statements.execute(conn, "synsets.ids_by_rowid", (self.rowid,)).fetchall()
             if res is not None and res[0] is not None:
                 return wn.synset(id=res[0][0], lexicon=res[0][1])
 
@@ -997,20 +1789,17 @@ class SynsetEditor(_Editor):
     def mod_definition(self, definition: str, indx: int = 0,
                        sense: Optional[wn.Sense] = None, language: Optional[str] = None,
                        metadata: Optional[Metadata] = None) -> SenseEditor:
-        defs = get_definitions(self.rowid, [self.lex_rowid])
-        query = """
-        UPDATE definitions
-        SET definition = ?
-        WHERE rowid = ?
-        """
-        if len(list(defs)) == 0:
+        with _connection() as conn:
+            defs = _statements.execute(conn, "definitions.rowids_by_synset", (self.rowid, self.lex_rowid)).fetchall()
+        if len(defs) == 0:
             self.add_definition(
                 definition, sense, language, metadata
             )
         else:
-            with connect() as conn:
-                conn.cursor().execute(query, (definition, list(defs)[indx][-1]))
-                conn.commit()
+            with _connection() as conn:
+                _statements.execute(conn, "definitions.set_definition", (definition, defs[indx][0]))
+                search._text_changed(conn, search.TextKind.definition, defs[indx][0], definition)
+                _commit(conn)
         return self
 
     @_modifies_db
@@ -1025,9 +1814,6 @@ class SynsetEditor(_Editor):
 
         Add a definition
 
-        """
-        query = """ 
-        INSERT INTO definitions VALUES (null,?,?,?,?,?,?)
         """
         data = (
             self.lex_rowid,
@@ -1037,9 +1823,12 @@ class SynsetEditor(_Editor):
             SenseEditor(sense).row_id if sense else None,
             metadata,
         )
-        with connect() as conn:
-            conn.cursor().execute(query, data)
-            conn.commit()
+        with _connection() as conn:
+            cur = _statements.execute(conn, "definitions.insert", data)
+            search._text_added(
+                conn, search.TextKind.definition, cur.lastrowid, self.rowid, self.lex_rowid, definition
+            )
+            _commit(conn)
         return self
 
     @_modifies_db
@@ -1052,13 +1841,10 @@ class SynsetEditor(_Editor):
         """
         Add an example to this synset
         """
-        query = """
-        
-        INSERT INTO synset_examples VALUES ( null,?,?,?,?,?)
-        """
-        with connect() as conn:
-            conn.cursor().execute(
-                query,
+        with _connection() as conn:
+            cur = _statements.execute(
+                conn,
+                "synset_examples.insert",
                 (
                     self.lex_rowid,
                     self.rowid,
@@ -1067,7 +1853,8 @@ class SynsetEditor(_Editor):
                     meta,
                 ),
             )
-            conn.commit()
+            search._text_added(conn, search.TextKind.synset_example, cur.lastrowid, self.rowid, self.lex_rowid, example)
+            _commit(conn)
         return self
 
     @_modifies_db
@@ -1075,13 +1862,11 @@ class SynsetEditor(_Editor):
         """
         Delete an example from this synset
         """
-        query = """
-        
-        DELETE FROM synset_examples WHERE lexicon_rowid = ? and synset_rowid = ? and example = ?
-        """
-        with connect() as conn:
-            conn.cursor().execute(query, (self.lex_rowid, self.rowid, example))
-            conn.commit()
+        with _connection() as conn:
+            rowids = search._rowids(conn, search.TextKind.synset_example, self.lex_rowid, self.rowid, example)
+            _statements.execute(conn, "synset_examples.delete", (self.lex_rowid, self.rowid, example))
+            search._texts_deleted(conn, search.TextKind.synset_example, rowids)
+            _commit(conn)
         return self
 
     @_modifies_db
@@ -1090,40 +1875,29 @@ class SynsetEditor(_Editor):
     ) -> SynsetEditor:
         """
         Set the proposed ILI
-        """
-        exists_query = """
-        
-        SELECT EXISTS(SELECT 1 FROM proposed_ilis WHERE synset_rowid = ?)
-        
         """
         if bool(
-                connect().cursor().execute(exists_query, (self.rowid,)).fetchall()[0][0]
+                _statements.execute(connect(), "proposed_ilis.exists", (self.rowid,)).fetchall()[0][0]
         ):
             # Exists -> Modify
-            query = (
-                """
-            UPDATE proposed_ilis SET definition = ? WHERE synset_rowid = ?
-            """
+            name = (
+                "proposed_ilis.set_definition"
                 if not meta
-                else """
-            UPDATE proposed_ilis SET definition = ? , metadata = ? WHERE synset_rowid = ?
-            """
+                else "proposed_ilis.set_definition_and_metadata"
             )
-            with connect() as conn:
-                conn.cursor().execute(
-                    query,
+            with _connection() as conn:
+                _statements.execute(
+                    conn,
+                    name,
                     (definition, self.rowid)
                     if not meta
                     else (definition, meta, self.rowid),
                 )
-                conn.commit()
+                _commit(conn)
         else:
-            query = """
-            INSERT INTO proposed_ilis VALUES (null,?,?,?)
-            """
-            with connect() as conn:
-                conn.cursor().execute(query, (self.rowid, definition, meta))
-                conn.commit()
+            with _connection() as conn:
+                _statements.execute(conn, "proposed_ilis.insert", (self.rowid, definition, meta))
+                _commit(conn)
         return self
 
     @_modifies_db
@@ -1131,25 +1905,15 @@ class SynsetEditor(_Editor):
         """
         Delete the Proposed ILI
         """
-        query = """
-        DELETE FROM proposed_ilis WHERE synset_rowid = ?
-        """
-        with connect() as conn:
-            conn.cursor().execute(query, (self.rowid,))
-            conn.commit()
+        with _connection() as conn:
+            _statements.execute(conn, "proposed_ilis.delete", (self.rowid,))
+            _commit(conn)
         return self
 
 
 def _get_sense_info_from_row_id(rowid: int) -> tuple[int, int, int, str]:
-    query = """
-    
-    SELECT lexicon_rowid,entry_rowid,synset_rowid,id FROM senses WHERE rowid = ?
-    
-    """
-    with connect() as conn:
-        cur = conn.cursor()
-        cur.execute(query, (rowid,))
-        res = cur.fetchall()
+    with _connection() as conn:
+        res = _statements.execute(conn, "senses.info_by_rowid", (rowid,)).fetchall()
         if res and res[0]:
             return int(res[0][0]), int(res[0][1]), int(res[0][2]), str(res[0][3])
 
@@ -1160,12 +1924,6 @@ def _set_sense_sense_relation(
         relation_type: RelationType | int,
         meta: Optional[Metadata] = None,
 ):
-    query = """
-    
-    INSERT INTO sense_relations VALUES (null,?,?,?,?,?)
-    
-    
-    """
     if isinstance(relation_type, RelationType):
         relation_type = relation_type.value
     data = (
@@ -1175,9 +1933,9 @@ def _set_sense_sense_relation(
         relation_type,
         meta,
     )
-    with connect() as conn:
-        conn.cursor().execute(query, data)
-        conn.commit()
+    with _connection() as conn:
+        _statements.execute(conn, "sense_relations.insert", data)
+        _commit(conn)
 
 
 class SenseEditor(_Editor):
@@ -1219,13 +1977,20 @@ class SenseEditor(_Editor):
                 self.synset_id = synset_rowid
                 self.row_id = self._create()
 
+    @classmethod
+    def from_rowid(cls, rowid: int) -> SenseEditor:
+        """
+        Create the editor of an existing sense from its rowid
+        """
+        lex_rowid, entry_rowid, synset_rowid, _ = _get_sense_info_from_row_id(rowid)
+        editor = cls.__new__(cls)
+        _Editor.__init__(editor, lex_rowid)
+        editor.row_id, editor.entry_id, editor.synset_id = rowid, entry_rowid, synset_rowid
+        return editor
+
     @_modifies_db
     def _create(self) -> int:
-        query = """
-        INSERT INTO senses VALUES(null,?,?,?,null,?,null,1,null)
-        """
-        with connect() as conn:
-            cur = conn.cursor()
+        with _connection() as conn:
             new_id = _get_valid_sense_id(self.entry_id)
             data = (
                 new_id,
@@ -1233,7 +1998,7 @@ class SenseEditor(_Editor):
                 self.entry_id,
                 self.synset_id,
             )
-            cur.execute(query, data)
+            _statements.execute(conn, "senses.insert", data)
             return get_row_id("senses", {"id": new_id, "lexicon_rowid": self.lex_rowid})
 
     @_modifies_db
@@ -1241,14 +2006,28 @@ class SenseEditor(_Editor):
         """
         Sets the ID of the Sense
         """
-        query = """
-        UPDATE senses SET id = ? WHERE rowid = ?
-        """
-        with connect() as conn:
-            conn.cursor().execute(query, (new_id, self.row_id))
-            conn.commit()
+        with _connection() as conn:
+            _statements.execute(conn, "senses.set_id", (new_id, self.row_id))
+            _commit(conn)
             return self
 
+    def move(
+            self,
+            synset: Optional[Synset | SynsetEditor | int] = None,
+            entry: Optional[wn.Word | EntryEditor | int] = None,
+    ) -> SenseEditor:
+        """
+
+        Moves this sense to another synset and/or entry, keeping its relations, examples and counts, see
+        :func:`wn_editor.reorganize.move_senses`.
+
+        """
+        from wn_editor.reorganize import move_senses
+
+        move_senses([(self.row_id, synset, entry)])
+        _, self.entry_id, self.synset_id, _ = _get_sense_info_from_row_id(self.row_id) or (None, None, None, None)
+        return self
+
     @_modifies_db
     def delete(self) -> None:
         """
@@ -1256,15 +2035,9 @@ class SenseEditor(_Editor):
         Deletes the sense from the database
 
         """
-        query = """
-        
-        DELETE FROM senses WHERE rowid = ?
-        
-        """
-        with connect() as conn:
-            cur = conn.cursor()
-            cur.execute(query, (self.row_id,))
-            conn.commit()
+        with _connection() as conn:
+            _statements.execute(conn, "senses.delete", (self.row_id,))
+            _commit(conn)
 
     def as_sense(self) -> wn.Sense:
         """
@@ -1326,14 +2099,9 @@ class SenseEditor(_Editor):
         Add an adjposition to the sense.
 
         """
-        query = """
-        
-        INSERT INTO adjpositions VALUES (?,?)
-        
-        """
-        with connect() as conn:
-            conn.cursor().execute(query, (self.row_id, adjposition))
-            conn.commit()
+        with _connection() as conn:
+            _statements.execute(conn, "adjpositions.insert", (self.row_id, adjposition))
+            _commit(conn)
         return self
 
     @_modifies_db
@@ -1341,22 +2109,15 @@ class SenseEditor(_Editor):
         """
         Deletes an adjposition of the sense
         """
-        query = """
-        DELETE from adjpositions WHERE sense_rowid = ? and adjposition = ?
-        """
-        with connect() as conn:
-            conn.cursor().execute(query, adjposition)
-            conn.commit()
+        with _connection() as conn:
+            _statements.execute(conn, "adjpositions.delete", (self.row_id, adjposition))
+            _commit(conn)
         return self
 
     def _count_exists(self) -> bool:
-        query = """
-        SELECT exists(SELECT 1 FROM counts WHERE sense_rowid=? and lexicon_rowid =?)
-        """
-        with connect() as conn:
+        with _connection() as conn:
             return bool(
-                conn.cursor()
-                .execute(query, (self.row_id, self.lex_rowid))
+                _statements.execute(conn, "counts.exists", (self.row_id, self.lex_rowid))
                 .fetchall()[0][0]
             )
 
@@ -1367,12 +2128,9 @@ class SenseEditor(_Editor):
         """
         set the count of the sense
         """
-        query = """
-            INSERT INTO counts VALUES (null,?,?,?,?)
-            """
-        with connect() as conn:
-            conn.execute(query, (self.lex_rowid, self.row_id, count, meta))
-            conn.commit()
+        with _connection() as conn:
+            _statements.execute(conn, "counts.insert", (self.lex_rowid, self.row_id, count, meta))
+            _commit(conn)
         return self
 
     @_modifies_db
@@ -1380,14 +2138,9 @@ class SenseEditor(_Editor):
         """
         Delete the count of the synset
         """
-        query = """
-        
-        DELETE FROM counts WHERE sense_rowid = ? and lexicon_rowid = ? and count = ?
-        
-        """
-        with connect() as conn:
-            conn.execute(query, (self.row_id, self.lex_rowid, count))
-            conn.commit()
+        with _connection() as conn:
+            _statements.execute(conn, "counts.delete", (self.row_id, self.lex_rowid, count))
+            _commit(conn)
 
     @_modifies_db
     def update_count(
@@ -1399,21 +2152,11 @@ class SenseEditor(_Editor):
         """
         Updates an existing count
         """
-
-        query = (
-            """
-        
-        UPDATE counts SET count = ? WHERE count = ? and sense_rowid = ? and lexicon_rowid = ? 
-        
-        """
-            if not meta
-            else """
-        UPDATE counts SET count = ? , metadata = ? WHERE count = ? and sense_rowid = ? and lexicon_rowid = ?
-        """
-        )
-        with connect() as conn:
-            conn.cursor().execute(
-                query,
+        name = "counts.set_count" if not meta else "counts.set_count_and_metadata"
+        with _connection() as conn:
+            _statements.execute(
+                conn,
+                name,
                 (new_count, count, self.row_id, self.lex_rowid)
                 if not meta
                 else (new_count, meta, count, self.row_id, self.lex_rowid),
@@ -1429,14 +2172,12 @@ class SenseEditor(_Editor):
         """
         Add an example to this sense
         """
-        query = """
-        INSERT INTO sense_examples VALUES (null,?,?,?,?,?)
-        """
-        with connect() as conn:
-            conn.cursor().execute(
-                query, (self.lex_rowid, self.row_id, example, language, meta)
+        with _connection() as conn:
+            cur = _statements.execute(
+                conn, "sense_examples.insert", (self.lex_rowid, self.row_id, example, language, meta)
             )
-            conn.commit()
+            search._text_added(conn, search.TextKind.sense_example, cur.lastrowid, self.row_id, self.lex_rowid, example)
+            _commit(conn)
         return self
 
     @_modifies_db
@@ -1444,12 +2185,11 @@ class SenseEditor(_Editor):
         """
         Remove an example from this Sense
         """
-        query = """
-        DELETE FROM sense_examples WHERE example = ? and lexicon_rowid = ? and sense_rowid = ?
-        """
-        with connect() as conn:
-            conn.cursor().execute(query, (example, self.lex_rowid, self.row_id))
-            conn.commit()
+        with _connection() as conn:
+            rowids = search._rowids(conn, search.TextKind.sense_example, self.lex_rowid, self.row_id, example)
+            _statements.execute(conn, "sense_examples.delete", (example, self.lex_rowid, self.row_id))
+            search._texts_deleted(conn, search.TextKind.sense_example, rowids)
+            _commit(conn)
         return self
 
     @_modifies_db
@@ -1457,25 +2197,18 @@ class SenseEditor(_Editor):
         """
         Add Syntactic Behaviour
         """
-        query = """
-
-        INSERT INTO syntactic_behaviour_senses VALUES(?,?)
-
-        """
-        with connect() as conn:
-            conn.cursor().execute(query, (syn_id, self.row_id))
+        with _connection() as conn:
+            _statements.execute(conn, "syntactic_behaviour_senses.insert", (syn_id, self.row_id))
+            _commit(conn)
 
     @_modifies_db
     def delete_syntactic_behaviour(self, syn_id: int):
         """
         Delete a Syntactic Behaviour
         """
-        query = """
-        DELETE FROM syntactic_behaviour_senses WHERE sense_rowid = ? and syntactic_behaviour_rowid = ?
-        """
-        with connect() as conn:
-            conn.cursor().execute(query, (self.row_id, syn_id))
-            conn.commit()
+        with _connection() as conn:
+            _statements.execute(conn, "syntactic_behaviour_senses.delete", (self.row_id, syn_id))
+            _commit(conn)
 
 
 class EntryEditor(_Editor):
@@ -1486,10 +2219,6 @@ class EntryEditor(_Editor):
 
     """
 
-    _get_lex_id_from_entry_query = """
-        SELECT lexicon_rowid from entries WHERE rowid = ?
-    """
-
     def __init__(self, m_id: int, exists: bool = True):
         if exists:
             # exists
@@ -1501,13 +2230,9 @@ class EntryEditor(_Editor):
 
     @_modifies_db
     def _create(self) -> int:
-        query = """
-        INSERT INTO entries VALUES (null,?,?,?,null) 
-        """
         en_id = _get_valid_entity_id()
-        with connect() as conn:
-            cur = conn.cursor()
-            cur.execute(query, (en_id, self.lex_rowid, "u"))
+        with _connection() as conn:
+            _statements.execute(conn, "entries.insert", (en_id, self.lex_rowid, "u"))
             return get_row_id("entries", {"id": en_id, "lexicon_rowid": self.lex_rowid})
 
     @_modifies_db
@@ -1517,15 +2242,10 @@ class EntryEditor(_Editor):
         sets the position of the entry
 
         """
-        query = """
-        
-        UPDATE entries SET pos = ? WHERE rowid = ?
-        
-        """
-        with connect() as conn:
-            cur = conn.cursor()
-            cur.execute(query, (pos, self.entry_id))
-            conn.commit()
+        with _connection() as conn:
+            _statements.execute(conn, "entries.set_pos", (pos, self.entry_id))
+            lemmas._entries_changed(conn, [self.entry_id])
+            _commit(conn)
         return self
 
     def add_form(self, form, normalized_form=None):
@@ -1534,39 +2254,26 @@ class EntryEditor(_Editor):
         shortcut function to add a form to this entry
 
         """
-        editor = FormEditor(self.entry_id)
-        editor.set_form(form)
-        if normalized_form:
-            editor.set_normalized_form(normalized_form)
+        FormEditor.bulk_create(
+            [{"entry_rowid": self.entry_id, "form": form, "normalized_form": normalized_form}]
+        )
         return self
 
     @_modifies_db
     def _set_id(self, new_id: str):
-        query = """
-        
-        UPDATE entries SET id =? WHERE rowid = ?
-        
-        """
-        with connect() as conn:
-            conn.cursor().execute(query, (new_id, self.entry_id))
-            conn.commit()
+        with _connection() as conn:
+            _statements.execute(conn, "entries.set_id", (new_id, self.entry_id))
+            _commit(conn)
         return self
 
     def _get_id(self) -> str:
-        query = """
-        
-        SELECT id from entries WHERE rowid = ?
-        
-        """
-        res = connect().cursor().execute(query, (self.entry_id,)).fetchall()
+        res = _statements.execute(connect(), "entries.id_by_rowid", (self.entry_id,)).fetchall()
         if res and res[0]:
             return str(res[0][0])
 
     def _get_lex_id_from_entry(self, entry_id) -> int:
-        with connect() as conn:
-            cur = conn.cursor()
-            cur.execute(self._get_lex_id_from_entry_query, (entry_id,))
-            res = cur.fetchall()
+        with _connection() as conn:
+            res = _statements.execute(conn, "entries.lexicon_by_rowid", (entry_id,)).fetchall()
             if res and res[0]:
                 return int(res[0][0])
 
@@ -1577,15 +2284,10 @@ class EntryEditor(_Editor):
         Deletes this entry from the database
 
         """
-        query = """
-        
-        DELETE from entries WHERE rowid = ?
-        
-        """
-        with connect() as conn:
-            cur = conn.cursor()
-            cur.execute(query, (self.entry_id,))
-            conn.commit()
+        with _connection() as conn:
+            _statements.execute(conn, "entries.delete", (self.entry_id,))
+            lemmas._entry_deleted(self.entry_id)
+            _commit(conn)
 
 
 class FormEditor(_Editor):
@@ -1595,21 +2297,6 @@ class FormEditor(_Editor):
 
     """
 
-    _query = """
-
-    UPDATE forms SET %s = ? WHERE rowid = ? 
-
-    """
-    _get_lex_id_from_entry_query = """
-    
-        SELECT lexicon_rowid from entries WHERE rowid = ?
-    """
-    _get_lex_id_from_rowid_query = """
-    
-        SELECT lexicon_rowid from forms where rowid = ?
-    
-    """
-
     @overload
     def __init__(self, form: wn.Form) -> None:
         ...
@@ -1628,33 +2315,23 @@ class FormEditor(_Editor):
             self.row_id = self._create()
 
     def _get_lex_id_from_rowid(self, row_id) -> int:
-        with connect() as conn:
-            cur = conn.cursor()
-            cur.execute(self._get_lex_id_from_rowid_query, (row_id,))
-            res = cur.fetchall()
+        with _connection() as conn:
+            res = _statements.execute(conn, "forms.lexicon_by_rowid", (row_id,)).fetchall()
             if res and res[0]:
                 return res[0][0]
 
     def _get_lex_id_from_entry(self, entry_id) -> int:
-        with connect() as conn:
-            cur = conn.cursor()
-            cur.execute(self._get_lex_id_from_entry_query, (entry_id,))
-            res = cur.fetchall()
+        with _connection() as conn:
+            res = _statements.execute(conn, "entries.lexicon_by_rowid", (entry_id,)).fetchall()
             if res and res[0]:
                 return int(res[0][0])
 
     @_modifies_db
     def _create(self) -> int:
-        query = """
-        
-        INSERT INTO forms VALUES (null,null,?,?,?,null,null,null) 
-        
-        """
-        with connect() as conn:
-            cur = conn.cursor()
+        with _connection() as conn:
             data = (self.lex_rowid, self.entry_id, "_")
-            cur.execute(query, data)
-            conn.commit()
+            _statements.execute(conn, "forms.insert", data)
+            _commit(conn)
             return get_row_id("forms", {"entry_rowid": self.entry_id, "form": "_"})
 
     @_modifies_db
@@ -1664,9 +2341,9 @@ class FormEditor(_Editor):
         Sets the form filed of this form
 
         """
-        with connect() as conn:
-            cur = conn.cursor()
-            cur.execute(self._query % "form", (form, self.row_id))
+        with _connection() as conn:
+            _statements.execute(conn, "forms.set_form", (form, self.row_id))
+            lemmas._entries_changed(conn, filter(None, [lemmas._entry_of_form(conn, self.row_id)]))
         return self
 
     @_modifies_db
@@ -1676,23 +2353,22 @@ class FormEditor(_Editor):
         Sets the normalized form
 
         """
-        with connect() as conn:
-            cur = conn.cursor()
-            cur.execute(self._query % "normalized_form", (norm_form, self.row_id))
+        with _connection() as conn:
+            _statements.execute(conn, "forms.set_normalized_form", (norm_form, self.row_id))
         return self
 
     @_modifies_db
     def _set_entry_rowid(self, rowid: int) -> FormEditor:
-        with connect() as conn:
-            cur = conn.cursor()
-            cur.execute(self._query % "entry_rowid", (rowid, self.row_id))
+        with _connection() as conn:
+            old_entry = lemmas._entry_of_form(conn, self.row_id)
+            _statements.execute(conn, "forms.set_entry_rowid", (rowid, self.row_id))
+            lemmas._entries_changed(conn, filter(None, [old_entry, rowid]))
         return self
 
     @_modifies_db
     def _set_id(self, form_id: str) -> FormEditor:
-        with connect() as conn:
-            cur = conn.cursor()
-            cur.execute(self._query % "id", (form_id, self.row_id))
+        with _connection() as conn:
+            _statements.execute(conn, "forms.set_id", (form_id, self.row_id))
         return self
 
     @_modifies_db
@@ -1702,15 +2378,11 @@ class FormEditor(_Editor):
         Deletes the form from the database
 
         """
-        query = """
-        
-        DELETE FROM forms WHERE rowid = ?
-        
-        """
-        with connect() as conn:
-            cur = conn.cursor()
-            cur.execute(query, (self.row_id,))
-            conn.commit()
+        with _connection() as conn:
+            entry = lemmas._entry_of_form(conn, self.row_id)
+            _statements.execute(conn, "forms.delete", (self.row_id,))
+            lemmas._entries_changed(conn, filter(None, [entry]))
+            _commit(conn)
 
     @_modifies_db
     def add_pronunciation(
@@ -1726,15 +2398,10 @@ class FormEditor(_Editor):
         Adds a pronunciation to the form
 
         """
-        query = """
-        
-        INSERT INTO pronunciations VALUES (?,?,?,?,?,?)
-        
-        """
-        with connect() as conn:
+        with _connection() as conn:
             data = (self.row_id, pronunciation, variety, notation, phonemic, audio)
-            conn.cursor().execute(query, data)
-            conn.commit()
+            _statements.execute(conn, "pronunciations.insert", data)
+            _commit(conn)
 
     @_modifies_db
     def delete_pronunciation(
@@ -1752,28 +2419,19 @@ class FormEditor(_Editor):
 
         """
         logger.warn("Deletion of pronunciations is potentially unsafe (no primary key)")
-        query = """
-        
-        DELETE from pronunciations WHERE form_rowid = ? and value = ? and variety = ? and notation = ? and phonemic = ? 
-        and audio = ?
-        
-        """
-        with connect() as conn:
-            data = (pronunciation, variety, notation, phonemic, audio)
-            conn.cursor().execute(query, data)
-            conn.commit()
+        with _connection() as conn:
+            data = (self.row_id, pronunciation, variety, notation, phonemic, audio)
+            _statements.execute(conn, "pronunciations.delete", data)
+            _commit(conn)
 
     @_modifies_db
     def add_tag(self, tag: str, category: str) -> FormEditor:
         """
         Add a tag to this form
         """
-        query = """
-        INSERT INTO tags VALUES (?,?,?)
-        """
-        with connect() as conn:
-            conn.cursor().execute(query, (self.row_id, tag, category))
-            conn.commit()
+        with _connection() as conn:
+            _statements.execute(conn, "tags.insert", (self.row_id, tag, category))
+            _commit(conn)
         return self
 
     @_modifies_db
@@ -1781,10 +2439,79 @@ class FormEditor(_Editor):
         """
         Delete tag from this Form
         """
-        query = """
-        DELETE FROM tags WHERE form_rowid = ? and tag = ? and category = ?
-        """
-        with connect() as conn:
-            conn.cursor().execute(query, (self.row_id, tag, category))
-            conn.commit()
+        with _connection() as conn:
+            _statements.execute(conn, "tags.delete", (self.row_id, tag, category))
+            _commit(conn)
         return self
+
+    @classmethod
+    @_undoable
+    def bulk_create(cls, forms: Iterable[dict[str, Any]], chunk_size: int = 10000) -> list[int]:
+        """
+
+        Inserts many complete forms at once and returns their rowids.
+        Each form is a dict with the keys ``entry_rowid`` and ``form`` and optionally ``normalized_form``, ``id``,
+        ``script``, ``rank``, ``pronunciations`` (strings or dicts with the arguments of
+        :meth:`add_pronunciation`) and ``tags`` ((tag, category) pairs). The input is consumed lazily in chunks,
+        so arbitrarily large iterables can be passed.
+
+        """
+        row_ids = []
+        lex_rowids = set()
+        with _connection() as conn:
+            _lock_for_write(conn)
+            next_rowid = _statements.execute(conn, "forms.max_rowid").fetchone()[0] + 1
+            for chunk in _chunks(forms, chunk_size):
+                entry_lex = {}
+                entries = list({f["entry_rowid"] for f in chunk})
+                for part in _chunks(entries, 500):
+                    name = _statements.register(
+                        f"entries.lexicon_by_rowids.{len(part)}",
+                        f"SELECT rowid, lexicon_rowid FROM entries WHERE rowid IN ({_qs(part)})",
+                    )
+                    entry_lex.update(_statements.execute(conn, name, part).fetchall())
+                form_rows, pron_rows, tag_rows = [], [], []
+                for f in chunk:
+                    if f["entry_rowid"] not in entry_lex:
+                        raise AttributeError(f"Entry with rowid {f['entry_rowid']} does not exist")
+                    lex_rowid = entry_lex[f["entry_rowid"]]
+                    lex_rowids.add(lex_rowid)
+                    form_rows.append((
+                        next_rowid,
+                        f.get("id"),
+                        lex_rowid,
+                        f["entry_rowid"],
+                        f["form"],
+                        f.get("normalized_form"),
+                        f.get("script"),
+                        f.get("rank"),
+                    ))
+                    for p in f.get("pronunciations", ()):
+                        if isinstance(p, str):
+                            p = {"pronunciation": p}
+                        pron_rows.append((
+                            next_rowid,
+                            p["pronunciation"],
+                            p.get("variety"),
+                            p.get("notation"),
+                            p.get("phonemic", True),
+                            p.get("audio"),
+                        ))
+                    tag_rows.extend((next_rowid, tag, category) for tag, category in f.get("tags", ()))
+                    row_ids.append(next_rowid)
+                    next_rowid += 1
+                _statements.executemany(conn, "forms.insert_complete", form_rows)
+                _statements.executemany(conn, "pronunciations.insert", pron_rows)
+                _statements.executemany(conn, "tags.insert", tag_rows)
+                lemmas._entries_changed(conn, entries)
+            _commit(conn)
+        if lex_rowids:
+            _Editor(list(lex_rowids)).set_modified()
+        return row_ids
+
+
+# Optional subsystems kept up to date by the editors above, each loaded on first use
+closure, cycles, events, history, lemmas, maintenance, search = (
+    _lazy_module(f"wn_editor.{name}")
+    for name in ("closure", "cycles", "events", "history", "lemmas", "maintenance", "search")
+)
@@ -0,0 +1,249 @@
+"""
+Change notifications for caches of wn data.
+
+While at least one callback is registered for a database with :func:`subscribe`, temporary triggers on its tables
+record every inserted, updated and deleted row in a temporary log table. Whenever the editors commit, the log is read
+and cleared and the callbacks receive the committed changes as a list of :class:`Event`, each with the IDs of the
+affected synsets, senses, entries, etc., so caches can evict exactly these. Changes that are rolled back disappear
+from the log together with the transaction and are never published. Changes committed without the editors are
+published with the next commit of the editors or by :func:`publish`.
+
+The triggers, the log and the callbacks belong to the connection they were registered for (that of the active
+:class:`~wn_editor.editor.Workspace` or of wn), so every workspace publishes its own changes. The triggers and the log
+are temporary: they are neither stored in nor visible to the schema of the database.
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+from enum import IntEnum
+from typing import Callable, Iterable, NamedTuple, Optional
+
+from wn._add import logger
+
+from wn_editor.editor import _state, _statements, connect
+
+TABLE = "change_log"
+
+
+class Action(IntEnum):
+    created = 1
+    changed = 2
+    deleted = 3
+
+
+def _synset(column: str) -> str:
+    return f"(SELECT id FROM synsets WHERE rowid = {{row}}.{column})"
+
+
+def _sense(column: str) -> str:
+    return f"(SELECT id FROM senses WHERE rowid = {{row}}.{column})"
+
+
+_ENTRY_OF_FORM = (
+    "(SELECT e.id FROM forms AS f JOIN entries AS e ON e.rowid = f.entry_rowid WHERE f.rowid = {row}.form_rowid)"
+)
+
+# table -> (event kind, expressions of the IDs of the affected objects)
+_KINDS = {
+    "lexicons": ("lexicon", ["{row}.id"]),
+    "ilis": ("ili", ["{row}.id"]),
+    "proposed_ilis": ("proposed_ili", [_synset("synset_rowid")]),
+    "synsets": ("synset", ["{row}.id"]),
+    "entries": ("entry", ["{row}.id"]),
+    "forms": ("form", ["(SELECT id FROM entries WHERE rowid = {row}.entry_rowid)"]),
+    "pronunciations": ("pronunciation", [_ENTRY_OF_FORM]),
+    "tags": ("tag", [_ENTRY_OF_FORM]),
+    "senses": ("sense", ["{row}.id"]),
+    "synset_relations": ("synset_relation", [_synset("source_rowid"), _synset("target_rowid")]),
+    "sense_relations": ("sense_relation", [_sense("source_rowid"), _sense("target_rowid")]),
+    "sense_synset_relations": ("sense_synset_relation", [_sense("source_rowid"), _synset("target_rowid")]),
+    "definitions": ("definition", [_synset("synset_rowid")]),
+    "synset_examples": ("synset_example", [_synset("synset_rowid")]),
+    "sense_examples": ("sense_example", [_sense("sense_rowid")]),
+    "adjpositions": ("adjposition", [_sense("sense_rowid")]),
+    "counts": ("count", [_sense("sense_rowid")]),
+    "syntactic_behaviours": ("syntactic_behaviour", ["{row}.id"]),
+    "syntactic_behaviour_senses": ("syntactic_behaviour_sense", [_sense("sense_rowid")]),
+}
+
+_statements.register(
+    "events.create",
+    f"""
+    CREATE TEMP TABLE IF NOT EXISTS {TABLE} (
+        seq INTEGER PRIMARY KEY,
+        tbl TEXT NOT NULL,
+        action INTEGER NOT NULL,
+        row INTEGER NOT NULL,
+        lexicon_rowid INTEGER,
+        ids TEXT NOT NULL
+    )
+    """,
+)
+_statements.register("events.drop", f"DROP TABLE IF EXISTS temp.{TABLE}")
+_statements.register("events.fetch", f"SELECT tbl, action, row, lexicon_rowid, ids FROM temp.{TABLE} ORDER BY seq")
+_statements.register("events.clear", f"DELETE FROM temp.{TABLE}")
+_statements.register(
+    "events.tables", "SELECT name FROM main.sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"
+)
+
+
+class Event(NamedTuple):
+    """
+
+    One committed change: the kind of object (the singular of its table, e.g. ``synset``, ``synset_relation`` or
+    ``definition``), the action, the rowid of the changed row, the rowid of its lexicon (if it has one) and the IDs of
+    the objects a cache may hold for it, e.g. the source and target synset of a relation or the synset of a
+    definition. IDs of objects deleted in the same statement (e.g. the synset of a cascade-deleted definition) are
+    missing.
+
+    """
+
+    kind: str
+    action: Action
+    rowid: int
+    lexicon_rowid: Optional[int]
+    ids: tuple[str, ...]
+
+
+def _triggers(table: str, columns: list[str]) -> dict[Action, str]:
+    """
+    Returns the statements creating the insert, update and delete triggers of a table
+    """
+    _, ids = _KINDS.get(table, (table, []))
+    if table == "lexicons":
+        lexicon = "{row}.rowid"
+    else:
+        lexicon = "{row}.lexicon_rowid" if "lexicon_rowid" in columns else "NULL"
+    rows = {Action.created: ["new"], Action.changed: ["old", "new"], Action.deleted: ["old"]}
+    ops = {Action.created: "INSERT", Action.changed: "UPDATE", Action.deleted: "DELETE"}
+    # Updates that change nothing (e.g. setting the modified flag of a lexicon again) are not logged
+    conditions = {
+        Action.changed: "WHEN " + " OR ".join(f'old."{c}" IS NOT new."{c}"' for c in columns),
+    }
+    triggers = {}
+    for action, op in ops.items():
+        row = rows[action][-1]
+        id_list = ", ".join(expr.format(row=r) for r in rows[action] for expr in ids)
+        triggers[action] = f"""
+        CREATE TEMP TRIGGER IF NOT EXISTS events_{table}_{action.name} AFTER {op} ON main.{table}
+        {conditions.get(action, "")}
+        BEGIN
+            INSERT INTO {TABLE} (tbl, action, row, lexicon_rowid, ids)
+            VALUES ('{table}', {action.value}, {row}.rowid, {lexicon.format(row=row)}, json_array({id_list}));
+        END
+        """
+    return triggers
+
+
+class _ChangeLog:
+    """
+
+    The triggers and log table of one connection.
+
+    """
+
+    def __init__(self, conn: sqlite3.Connection) -> None:
+        self.conn = conn
+        self.tables = [r[0] for r in _statements.execute(conn, "events.tables").fetchall()]
+        _statements.execute(conn, "events.create")
+        for table in self.tables:
+            columns = [r[1] for r in conn.execute(f"PRAGMA main.table_info({table})").fetchall()]
+            for action, sql in _triggers(table, columns).items():
+                _statements.execute(conn, _statements.register(f"events.trigger.{table}.{action.name}", sql))
+        conn.commit()
+
+    def drop(self) -> None:
+        for table in self.tables:
+            for action in Action:
+                self.conn.execute(f"DROP TRIGGER IF EXISTS temp.events_{table}_{action.name}")
+        _statements.execute(self.conn, "events.drop")
+
+    def take(self) -> list[Event]:
+        """
+        Returns and clears the logged changes
+        """
+        rows = _statements.execute(self.conn, "events.fetch").fetchall()
+        if not rows:
+            return []
+        _statements.execute(self.conn, "events.clear")
+        self.conn.commit()
+        events = []
+        for table, action, rowid, lex_rowid, ids in rows:
+            kind, _ = _KINDS.get(table, (table, []))
+            ids = tuple(dict.fromkeys(i for i in json.loads(ids) if i is not None))
+            events.append(Event(kind, Action(action), rowid, lex_rowid, ids))
+        return events
+
+
+_Subscribers = dict[Callable[[list[Event]], None], Optional[frozenset[str]]]
+
+
+def _events(conn: Optional[sqlite3.Connection] = None) -> dict:
+    """
+    Returns the change log (under ``log``) and the subscribers (under ``subscribers``) of a connection
+    """
+    return _state("events", conn)
+
+
+def subscribe(
+        callback: Callable[[list[Event]], None], kinds: Optional[Iterable[str]] = None
+) -> Callable[[list[Event]], None]:
+    """
+
+    Registers a callback which receives the events of every commit to the current database (only those of the given
+    ``kinds``) and returns it. To forward events to another thread or process, subscribe e.g. the ``put`` method of a
+    queue.
+
+    >>> def evict(events):
+    ...     for event in events:
+    ...         for id_ in event.ids:
+    ...             cache.pop(id_, None)
+    >>> subscribe(evict, kinds={"synset", "synset_relation", "definition"})
+
+    """
+    state = _events()
+    if "log" not in state:
+        state["log"] = _ChangeLog(connect())
+        state["subscribers"] = {}
+    subscribers: _Subscribers = state["subscribers"]
+    subscribers[callback] = frozenset(kinds) if kinds is not None else None
+    return callback
+
+
+def unsubscribe(callback: Callable[[list[Event]], None]) -> None:
+    """
+    Removes a callback of the current database. When none is left, the triggers and the log are dropped.
+    """
+    state = _events()
+    if "log" not in state:
+        return
+    state["subscribers"].pop(callback, None)
+    if not state["subscribers"]:
+        state.pop("log").drop()
+        del state["subscribers"]
+
+
+def _committed(conn: sqlite3.Connection) -> None:
+    state = _events(conn)
+    if "log" not in state or conn.in_transaction:
+        return
+    events = state["log"].take()
+    if not events:
+        return
+    subscribers: _Subscribers = state["subscribers"]
+    for callback, kinds in list(subscribers.items()):
+        selected = events if kinds is None else [e for e in events if e.kind in kinds]
+        if selected:
+            try:
+                callback(selected)
+            except Exception:
+                logger.exception(f"Change notification callback {callback!r} failed")
+
+
+def publish() -> None:
+    """
+    Publishes changes committed without the editors
+    """
+    _committed(connect())
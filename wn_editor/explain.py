@@ -0,0 +1,210 @@
+"""
+Dry runs of edit scripts.
+
+Inside a :func:`dry_run` block the editors work as usual, but every statement they execute (including the lookups of
+rowids and free IDs) is recorded and everything is rolled back when the block is left. The returned
+:class:`DryRunReport` holds, per statement, the number of executions, the rows it changed, its run time and its
+EXPLAIN QUERY PLAN, and per editor method the number of calls, statements, changed rows and the commits the method
+would have caused outside of a dry run.
+
+The editors' in-memory indexes are reloaded after the rollback. Indexes cannot be enabled inside a dry run, as
+creating the index database commits.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import sys
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+import wn
+
+from wn_editor import cycles, lemmas
+from wn_editor.editor import _Editor, _dec, _in_transaction, _statements, _transaction_depths, connect
+
+# The code of the wrapper function of the editor decorators, which knows the decorated method
+_WRAPPER = _dec(lambda: None, None).__code__
+
+
+class StatementCost:
+    def __init__(self, name: str, sql: str) -> None:
+        self.name = name
+        self.sql = sql
+        self.executions = 0
+        self.rows = 0
+        self.seconds = 0.0
+        self.params = None
+        self.plan: list[str] = []
+
+
+class MethodCost:
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.calls = 0
+        self.executions = 0
+        self.rows = 0
+        self.commits = 0
+        self.seconds = 0.0
+
+
+class DryRunReport:
+    """
+
+    The result of :func:`dry_run`. ``statements`` and ``methods`` map statement names and editor methods (e.g.
+    ``SynsetEditor.add_word``) to their costs; ``rows`` are the rows changed by INSERT, UPDATE and DELETE statements.
+    Statements executed outside of the editors are attributed to ``<script>``.
+
+    """
+
+    def __init__(self) -> None:
+        self.statements: dict[str, StatementCost] = {}
+        self.methods: dict[str, MethodCost] = {}
+
+    @property
+    def executions(self) -> int:
+        return sum(s.executions for s in self.statements.values())
+
+    @property
+    def rows(self) -> int:
+        return sum(s.rows for s in self.statements.values())
+
+    @property
+    def commits(self) -> int:
+        return sum(m.commits for m in self.methods.values())
+
+    def full_scans(self) -> list[StatementCost]:
+        """
+        Returns the statements whose query plan scans a whole table
+        """
+        return [
+            s
+            for s in self.statements.values()
+            if any(step.startswith("SCAN") and "INDEX" not in step for step in s.plan)
+        ]
+
+    def __str__(self) -> str:
+        lines = [f"{self.executions} statements, {self.rows} changed rows, {self.commits} commits"]
+        lines.append(f"{'method':<45}{'calls':>8}{'statements':>12}{'rows':>10}{'commits':>9}{'ms':>10}")
+        for m in sorted(self.methods.values(), key=lambda m: -m.seconds):
+            lines.append(
+                f"{m.name:<45}{m.calls:>8}{m.executions:>12}{m.rows:>10}{m.commits:>9}{m.seconds * 1000:>10.1f}"
+            )
+        for s in self.full_scans():
+            lines.append(f"full scan in {s.name} ({s.executions}x): {'; '.join(s.plan)}")
+        return "\n".join(lines)
+
+
+class _Recorder:
+    def __init__(self, conn: sqlite3.Connection, report: DryRunReport) -> None:
+        self.conn = conn
+        self.report = report
+        self.last_frame = None
+        self.changes = conn.total_changes
+
+    def _method(self) -> MethodCost:
+        """
+        Returns the cost of the outermost editor method (or public wn_editor function) on the call stack
+        """
+        frame, found, name = sys._getframe(1), None, "<script>"
+        while frame is not None:
+            code, module = frame.f_code, frame.f_globals.get("__name__", "")
+            if code is _WRAPPER:
+                found, name = frame, frame.f_locals["func"].__qualname__
+            elif module.startswith("wn_editor") and module != __name__:
+                owner = frame.f_locals.get("self")
+                if isinstance(owner, _Editor):
+                    found, name = frame, f"{type(owner).__name__}.{code.co_name}"
+                elif not code.co_name.startswith(("_", "<")):
+                    found, name = frame, f"{module.rsplit('.', 1)[-1]}.{code.co_name}"
+            frame = frame.f_back
+        if name not in self.report.methods:
+            self.report.methods[name] = MethodCost(name)
+        method = self.report.methods[name]
+        if found is not self.last_frame:
+            # Keeping the frame alive makes sure a new call never has the same frame
+            self.last_frame = found
+            method.calls += found is not None
+        return method
+
+    def _record(self, name: str, sql: str, params, rows: int, executions: int, seconds: float) -> None:
+        statement = self.report.statements.get(name)
+        if statement is None:
+            statement = self.report.statements[name] = StatementCost(name, sql)
+            statement.params = params
+        statement.executions += executions
+        statement.rows += max(rows, 0)
+        statement.seconds += seconds
+        method = self._method()
+        method.executions += executions
+        method.rows += max(rows, 0)
+        method.seconds += seconds
+
+    def execute(self, cursor: sqlite3.Cursor, name: str, sql: str, params) -> sqlite3.Cursor:
+        began = time.perf_counter()
+        cursor.execute(sql, params)
+        self._record(name, sql, params, cursor.rowcount, 1, time.perf_counter() - began)
+        return cursor
+
+    def executemany(self, cursor: sqlite3.Cursor, name: str, sql: str, seq_of_params) -> sqlite3.Cursor:
+        seq_of_params = list(seq_of_params)
+        began = time.perf_counter()
+        cursor.executemany(sql, seq_of_params)
+        params = seq_of_params[0] if seq_of_params else None
+        self._record(name, sql, params, cursor.rowcount, len(seq_of_params), time.perf_counter() - began)
+        return cursor
+
+    def commit_point(self, conn: sqlite3.Connection) -> None:
+        """
+        Called where the editors would commit outside of a transaction
+        """
+        if conn is self.conn and _transaction_depths.get(id(conn)) == 1 and conn.total_changes > self.changes:
+            self.changes = conn.total_changes
+            self._method().commits += 1
+
+    def explain(self) -> None:
+        for statement in self.report.statements.values():
+            if statement.params is None:
+                continue
+            try:
+                rows = self.conn.execute("EXPLAIN QUERY PLAN " + statement.sql, statement.params).fetchall()
+            except sqlite3.Error as e:
+                statement.plan = [f"not explained: {e}"]
+            else:
+                statement.plan = [row[-1] for row in rows]
+
+
+@contextmanager
+def dry_run() -> Iterator[DryRunReport]:
+    """
+
+    Runs the block, records the cost of all statements executed by the editors and rolls everything back.
+
+    >>> with dry_run() as report:
+    ...     LexiconEditor("odenet").create_synset().add_word("auto")
+    >>> print(report)
+    19 statements, 7 changed rows, 3 commits
+    ...
+
+    """
+    conn = connect()
+    if _in_transaction(conn) or _statements.recorder is not None:
+        raise wn.Error("A dry run cannot be started inside a transaction or another dry run")
+    if conn.in_transaction:
+        conn.commit()
+    report = DryRunReport()
+    recorder = _Recorder(conn, report)
+    _statements.recorder = recorder
+    _transaction_depths[id(conn)] = 1
+    try:
+        yield report
+    finally:
+        _statements.recorder = None
+        _transaction_depths.pop(id(conn), None)
+        conn.rollback()
+        for index in lemmas._indexes().values():
+            index.load()
+        for guard in cycles._guards().values():
+            guard.load()
+        recorder.explain()
@@ -0,0 +1,290 @@
+"""
+Undo and redo for changes made through the editors.
+
+Once enabled with :func:`enable_undo`, temporary triggers on every table of the database write the inverse of each
+inserted, updated or deleted row as a small SQL statement into a temporary log table. Every top-level editor call
+(and every :func:`wn_editor.editor.transaction` or :func:`step` block) forms one undo step. :func:`undo` replays the
+inverse statements of the last step in reverse order inside a savepoint; the statements the triggers log while doing so
+form the matching redo step. Only the last ``max_steps`` steps are kept, so memory use is bounded.
+
+The triggers and the log are temporary: they only exist for the current connection and are neither stored in nor
+visible to the schema of the database.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from wn_editor import lemmas, search
+from wn_editor.editor import _commit, _state, _statements, connect
+
+TABLE = "undo_log"
+
+_statements.register(
+    "history.create",
+    f"CREATE TEMP TABLE IF NOT EXISTS {TABLE} (seq INTEGER PRIMARY KEY, tbl TEXT NOT NULL, sql TEXT NOT NULL)",
+)
+_statements.register("history.drop", f"DROP TABLE IF EXISTS temp.{TABLE}")
+_statements.register("history.max_seq", f"SELECT coalesce(max(seq), 0) FROM temp.{TABLE}")
+_statements.register(
+    "history.fetch", f"SELECT tbl, sql FROM temp.{TABLE} WHERE seq BETWEEN ? AND ? ORDER BY seq DESC"
+)
+_statements.register("history.delete", f"DELETE FROM temp.{TABLE} WHERE seq BETWEEN ? AND ?")
+_statements.register(
+    "history.tables", "SELECT name FROM main.sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"
+)
+
+# Tables whose changes invalidate the hypernym closure and the cycle guards
+_RELATION_TABLES = {"synsets", "synset_relations"}
+# Tables whose changes invalidate the lemma indexes
+_LEMMA_TABLES = {"entries", "forms"}
+# Tables whose changes invalidate the full-text index
+_TEXT_TABLES = {"definitions", "synset_examples", "sense_examples"}
+
+
+def _triggers(table: str, columns: list[str]) -> dict[str, str]:
+    """
+    Returns the statements creating the insert, update and delete triggers of a table
+    """
+    log = f"INSERT INTO {TABLE} (tbl, sql) VALUES ('{table}', %s)"
+    names = ",".join(f'"{c}"' for c in columns)
+    old_values = "||','||".join(f'quote(old."{c}")' for c in columns)
+    assignments = "||','||".join(f"'\"{c}\"='||quote(old.\"{c}\")" for c in columns)
+    inverse = {
+        "insert": f"'DELETE FROM main.{table} WHERE rowid='||new.rowid",
+        "update": f"'UPDATE main.{table} SET '||{assignments}||' WHERE rowid='||old.rowid",
+        "delete": f"'INSERT INTO main.{table} (rowid,{names}) VALUES ('||old.rowid||','||{old_values}||')'",
+    }
+    return {
+        op: f"""
+        CREATE TEMP TRIGGER IF NOT EXISTS undo_{table}_{op} AFTER {op.upper()} ON main.{table}
+        BEGIN {log % sql}; END
+        """
+        for op, sql in inverse.items()
+    }
+
+
+class UndoHistory:
+    """
+
+    The undo and redo stacks of one connection. Every step is the (first, last) range of its statements in the log.
+
+    """
+
+    def __init__(self, conn: sqlite3.Connection, max_steps: int = 100) -> None:
+        if max_steps < 1:
+            raise AttributeError("max_steps must be at least 1")
+        self.conn = conn
+        self.max_steps = max_steps
+        self.undo_stack: list[tuple[int, int]] = []
+        self.redo_stack: list[tuple[int, int]] = []
+        self.tables = [r[0] for r in _statements.execute(conn, "history.tables").fetchall()]
+        self.depth = 0
+        _statements.execute(conn, "history.create")
+        for table in self.tables:
+            columns = [r[1] for r in conn.execute(f"PRAGMA main.table_info({table})").fetchall()]
+            for op, sql in _triggers(table, columns).items():
+                _statements.execute(conn, _statements.register(f"history.trigger.{table}.{op}", sql))
+        self.last_seq = self._max_seq()
+
+    def drop(self) -> None:
+        for table in self.tables:
+            for op in ("insert", "update", "delete"):
+                self.conn.execute(f"DROP TRIGGER IF EXISTS temp.undo_{table}_{op}")
+        _statements.execute(self.conn, "history.drop")
+
+    def _max_seq(self) -> int:
+        return _statements.execute(self.conn, "history.max_seq").fetchone()[0]
+
+    def _forget(self, steps: list[tuple[int, int]]) -> None:
+        _statements.executemany(self.conn, "history.delete", steps)
+        steps.clear()
+
+    def _push(self, first: int, last: int) -> None:
+        self.undo_stack.append((first, last))
+        if len(self.undo_stack) > self.max_steps:
+            _statements.execute(self.conn, "history.delete", self.undo_stack.pop(0))
+        self.last_seq = last
+
+    def sync(self) -> None:
+        """
+        Drops steps whose changes were rolled back and turns changes made without the editors into a step of their own
+        """
+        max_seq = self._max_seq()
+        if max_seq < self.last_seq:
+            self.undo_stack = [s for s in self.undo_stack if s[1] <= max_seq]
+            self.redo_stack = [s for s in self.redo_stack if s[1] <= max_seq]
+            self.last_seq = max_seq
+        elif max_seq > self.last_seq:
+            self._forget(self.redo_stack)
+            self._push(self.last_seq + 1, max_seq)
+
+    def begin(self) -> None:
+        if not self.depth:
+            self.sync()
+        self.depth += 1
+
+    def end(self) -> None:
+        self.depth -= 1
+        if not self.depth:
+            max_seq = self._max_seq()
+            if max_seq > self.last_seq:
+                self._forget(self.redo_stack)
+                self._push(self.last_seq + 1, max_seq)
+
+    def _replay(self, first: int, last: int) -> tuple[tuple[int, int], set[str]]:
+        """
+        Executes the statements of a step in reverse order and returns the range of the inverse step
+        """
+        conn = self.conn
+        conn.execute("SAVEPOINT wn_editor_undo")
+        try:
+            rows = _statements.execute(conn, "history.fetch", (first, last)).fetchall()
+            _statements.execute(conn, "history.delete", (first, last))
+            start = self._max_seq()
+            cur = conn.cursor()
+            for _, sql in rows:
+                cur.execute(sql)
+            end = self._max_seq()
+            conn.execute("RELEASE wn_editor_undo")
+        except BaseException:
+            conn.execute("ROLLBACK TO wn_editor_undo")
+            conn.execute("RELEASE wn_editor_undo")
+            raise
+        self.last_seq = end
+        return (start + 1, end), {table for table, _ in rows}
+
+    def _apply(self, source: list[tuple[int, int]], target: list[tuple[int, int]], steps: int) -> int:
+        self.sync()
+        done = 0
+        tables = set()
+        self.depth += 1
+        try:
+            while source and done < steps:
+                inverse, touched = self._replay(*source.pop())
+                tables |= touched
+                if target is self.undo_stack:
+                    self._push(*inverse)
+                else:
+                    target.append(inverse)
+                done += 1
+        finally:
+            self.depth -= 1
+        _commit(self.conn)
+        if tables & _RELATION_TABLES:
+            _relations_changed()
+        if tables & _LEMMA_TABLES:
+            for index in lemmas._indexes().values():
+                index.load()
+        if tables & _TEXT_TABLES and search.text_index_enabled():
+            search.rebuild_text_index()
+        return done
+
+
+def _relations_changed() -> None:
+    from wn_editor import closure, cycles
+
+    if closure.hypernym_closure_enabled():
+        closure.rebuild_hypernym_closure()
+    for guard in cycles._guards().values():
+        guard.load()
+
+
+def _history(conn: Optional[sqlite3.Connection] = None) -> Optional[UndoHistory]:
+    """
+    Returns the undo history of the given (default: the current) connection, if undo is enabled for it
+    """
+    return _state("history", conn).get("history")
+
+
+@contextmanager
+def _step(conn: sqlite3.Connection) -> Iterator[None]:
+    history = _history(conn)
+    if history is None:
+        yield
+        return
+    history.begin()
+    try:
+        yield
+    finally:
+        history.end()
+
+
+@contextmanager
+def step() -> Iterator[None]:
+    """
+
+    Groups all editor calls inside the block into a single undo step.
+
+    >>> with step():
+    ...     synset = LexiconEditor("odenet").create_synset().add_word("auto")
+    ...     synset.set_hypernym_of(other)
+    >>> undo()
+    1
+
+    """
+    with _step(connect()):
+        yield
+
+
+def enable_undo(max_steps: int = 100) -> None:
+    """
+    Starts recording undo steps for the current connection, keeping at most the last ``max_steps`` of them
+    """
+    disable_undo()
+    conn = connect()
+    _state("history", conn)["history"] = UndoHistory(conn, max_steps)
+
+
+def disable_undo() -> None:
+    """
+    Stops recording and discards the undo and redo history of the current connection
+    """
+    history = _state("history").pop("history", None)
+    if history is not None:
+        history.drop()
+
+
+def undo_enabled() -> bool:
+    return _history() is not None
+
+
+def _require_history() -> UndoHistory:
+    history = _history()
+    if history is None:
+        raise AttributeError("Undo is not enabled, see enable_undo()")
+    return history
+
+
+def undo(steps: int = 1) -> int:
+    """
+    Reverts the last ``steps`` undo steps and returns the number of reverted steps
+    """
+    history = _require_history()
+    return history._apply(history.undo_stack, history.redo_stack, steps)
+
+
+def redo(steps: int = 1) -> int:
+    """
+    Re-applies the last ``steps`` undone steps and returns the number of re-applied steps
+    """
+    history = _require_history()
+    return history._apply(history.redo_stack, history.undo_stack, steps)
+
+
+def can_undo() -> bool:
+    history = _history()
+    if history is None:
+        return False
+    history.sync()
+    return bool(history.undo_stack)
+
+
+def can_redo() -> bool:
+    history = _history()
+    if history is None:
+        return False
+    history.sync()
+    return bool(history.redo_stack)
@@ -0,0 +1,169 @@
+"""
+Canonical IDs for the placeholder IDs generated by the editors.
+
+The editors give new objects placeholder IDs: synsets ``<lexicon>-<n>-u`` (:class:`~wn_editor.editor.SynsetEditor`),
+entries ``w<n>`` (counted over all lexicons) and senses ``w_<lemma>_<n>`` or ``w_unkown_<n>``
+(:class:`~wn_editor.editor.SenseEditor`). :func:`canonicalize_ids` rewrites all of them in a lexicon according to an
+:class:`IdScheme`. The new IDs are computed in memory from one query per table and written with one UPDATE per table
+from a temporary mapping table, in a single transaction.
+
+The editors refer to objects by rowid, so editors created before keep working. Subscribers of
+:mod:`wn_editor.events` receive a ``changed`` event per renamed row with the old and the new ID.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import NamedTuple, Optional
+
+from wn_editor.editor import LexiconEditor, _chunks, _get_lex_name_from_lex_id, _statements, transaction
+
+TABLE = "id_mapping"
+
+_statements.register(
+    "ids.synsets",
+    """
+    SELECT ss.rowid, ss.id, coalesce(ss.pos, (
+        SELECT e.pos FROM senses AS s JOIN entries AS e ON e.rowid = s.entry_rowid
+        WHERE s.synset_rowid = ss.rowid AND e.pos IS NOT NULL AND e.pos != 'u'
+        GROUP BY e.pos ORDER BY count(*) DESC, e.pos LIMIT 1
+    ), 'u')
+    FROM synsets AS ss WHERE ss.lexicon_rowid = ? ORDER BY ss.rowid
+    """,
+)
+_statements.register(
+    "ids.entries",
+    """
+    SELECT e.rowid, e.id, coalesce(e.pos, 'u'), (
+        SELECT f.form FROM forms AS f
+        WHERE f.entry_rowid = e.rowid AND coalesce(f.rank, 0) = 0 AND f.form != '_'
+        ORDER BY f.rowid LIMIT 1
+    )
+    FROM entries AS e WHERE e.lexicon_rowid = ? ORDER BY e.rowid
+    """,
+)
+_statements.register(
+    "ids.senses",
+    """
+    SELECT s.rowid, s.id, s.entry_rowid, s.synset_rowid, e.id, ss.id FROM senses AS s
+    JOIN entries AS e ON e.rowid = s.entry_rowid
+    JOIN synsets AS ss ON ss.rowid = s.synset_rowid
+    WHERE s.lexicon_rowid = ? ORDER BY s.rowid
+    """,
+)
+_statements.register(
+    "ids.create", f"CREATE TEMP TABLE IF NOT EXISTS {TABLE} (item_rowid INTEGER PRIMARY KEY, new_id TEXT NOT NULL)"
+)
+_statements.register("ids.clear", f"DELETE FROM temp.{TABLE}")
+_statements.register("ids.insert", f"INSERT INTO temp.{TABLE} VALUES (?,?)")
+for _table in ("synsets", "entries", "senses"):
+    _statements.register(
+        f"ids.update.{_table}",
+        f"""
+        UPDATE {_table} SET id = (SELECT m.new_id FROM temp.{TABLE} AS m WHERE m.item_rowid = {_table}.rowid)
+        WHERE rowid IN (SELECT item_rowid FROM temp.{TABLE})
+        """,
+    )
+_statements.register("ids.set_modified", "UPDATE lexicons SET modified = 1 WHERE rowid = ?")
+
+
+class IdScheme(NamedTuple):
+    """
+
+    Format strings of the canonical IDs. All can use ``lexicon`` (the lexicon ID) and ``number``, which counts the
+    rows of a table in the lexicon from 1 in the order they were created. ``synset`` can also use ``pos`` (for synsets
+    without one the most common part of speech of their entries, or ``u``), ``entry`` ``lemma`` (with spaces replaced
+    by ``_``) and ``pos``, and ``sense`` ``lemma`` and ``entry`` and ``synset``, the (new) IDs of its entry and synset.
+    The default entry and sense IDs are those given by :func:`wn_editor.importer.import_tables`; synsets are numbered
+    with eight digits, so their new IDs never look like placeholders.
+
+    >>> IdScheme(synset="{lexicon}-{pos}-{number}")
+
+    """
+
+    synset: str = "{lexicon}-{number:08d}-{pos}"
+    entry: str = "{lexicon}-{lemma}-{pos}"
+    sense: str = "{entry}-{synset}"
+
+
+def _patterns(lex_id: str) -> dict[str, re.Pattern]:
+    return {
+        # The editors number without leading zeros
+        "synsets": re.compile(rf"{re.escape(lex_id)}-(0|[1-9]\d*)-u"),
+        "entries": re.compile(r"w\d+"),
+        "senses": re.compile(r"w_.*_\d+"),
+    }
+
+
+def _free(new_id: str, taken: set[str]) -> str:
+    """
+    Returns the ID, with a numeric suffix if it is already taken, and marks it as taken
+    """
+    candidate, suffix = new_id, 1
+    while candidate in taken:
+        suffix += 1
+        candidate = f"{new_id}-{suffix}"
+    taken.add(candidate)
+    return candidate
+
+
+def canonicalize_ids(
+        lexicon: LexiconEditor | str | int, scheme: Optional[IdScheme] = None, chunk_size: int = 10000
+) -> dict[str, int]:
+    """
+
+    Replaces all generated synset, entry and sense IDs of a lexicon with IDs of the ``scheme`` and returns the number
+    of renamed rows per table. Entries without a lemma keep their ID. A new ID that is already used by a synset, entry
+    or sense of the lexicon gets a suffix ``-2``, ``-3``, etc.
+
+    >>> canonicalize_ids("mywn")
+    {'synsets': 1200, 'entries': 1870, 'senses': 2315}
+
+    """
+    lexicon = lexicon if isinstance(lexicon, LexiconEditor) else LexiconEditor(lexicon)
+    scheme = scheme or IdScheme()
+    lex_id = _get_lex_name_from_lex_id(lexicon.lex_rowid)
+    patterns = _patterns(lex_id)
+    with transaction() as conn:
+        rows = {
+            table: _statements.execute(conn, f"ids.{table}", (lexicon.lex_rowid,)).fetchall()
+            for table in ("synsets", "entries", "senses")
+        }
+        # (number, row) of the generated IDs, numbered among all rows of the table
+        generated = {
+            table: [(number, row) for number, row in enumerate(table_rows, 1) if patterns[table].fullmatch(row[1])]
+            for table, table_rows in rows.items()
+        }
+        renamed = {table: {row[0] for _, row in table_rows} for table, table_rows in generated.items()}
+        taken = {row[1] for table, table_rows in rows.items() for row in table_rows if row[0] not in renamed[table]}
+
+        new_ids: dict[str, dict[int, str]] = {"synsets": {}, "entries": {}, "senses": {}}
+        for number, (rowid, _, pos) in generated["synsets"]:
+            new_ids["synsets"][rowid] = _free(scheme.synset.format(lexicon=lex_id, number=number, pos=pos), taken)
+        lemmas = {rowid: lemma.replace(" ", "_") for rowid, _, _, lemma in rows["entries"] if lemma is not None}
+        for number, (rowid, _, pos, _) in (item for item in generated["entries"] if item[1][0] in lemmas):
+            new_ids["entries"][rowid] = _free(
+                scheme.entry.format(lexicon=lex_id, number=number, lemma=lemmas[rowid], pos=pos), taken
+            )
+        for number, (rowid, _, entry_rowid, synset_rowid, entry_id, synset_id) in generated["senses"]:
+            new_ids["senses"][rowid] = _free(
+                scheme.sense.format(
+                    lexicon=lex_id,
+                    number=number,
+                    lemma=lemmas.get(entry_rowid, ""),
+                    entry=new_ids["entries"].get(entry_rowid, entry_id),
+                    synset=new_ids["synsets"].get(synset_rowid, synset_id),
+                ),
+                taken,
+            )
+
+        _statements.execute(conn, "ids.create")
+        for table, mapping in new_ids.items():
+            if mapping:
+                _statements.execute(conn, "ids.clear")
+                for chunk in _chunks(mapping.items(), chunk_size):
+                    _statements.executemany(conn, "ids.insert", chunk)
+                _statements.execute(conn, f"ids.update.{table}")
+        if any(new_ids.values()):
+            _statements.execute(conn, "ids.set_modified", (lexicon.lex_rowid,))
+    return {table: len(mapping) for table, mapping in new_ids.items()}
@@ -0,0 +1,259 @@
+"""
+Streaming importer that fills a lexicon from CSV or TSV tables.
+
+The tables are read in chunks; all rows of a chunk are built in memory and inserted with ``executemany``. Synset IDs
+are mapped to rowids in memory, so senses, definitions and relations are resolved without lookups. Relations are
+imported last, in a second pass, so they may refer to synsets defined anywhere in the synset table.
+
+The tables need a header row with the following columns (optional ones in brackets):
+
+=============  ============================================
+table          columns
+=============  ============================================
+synsets        id, [pos], [ili], [definition]
+senses         synset, lemma, [pos]
+definitions    synset, definition, [language]
+relations      source, target, type
+=============  ============================================
+
+``type`` is the name of a :class:`wn_editor.editor.RelationType`.
+"""
+
+from __future__ import annotations
+
+import csv
+from pathlib import Path
+from typing import Any, Iterator, Optional
+
+from wn._add import logger
+
+from wn_editor import lemmas
+from wn_editor.editor import (
+    LexiconEditor,
+    RelationType,
+    _chunks,
+    _connection,
+    _get_lex_name_from_lex_id,
+    _lock_for_write,
+    _bulk_changed,
+    _statements,
+    transaction,
+)
+from wn_editor.ids import _free
+
+# (statement, counter, rows): the rows to insert with one executemany and the count they are added to
+Batch = tuple[str, Optional[str], list[tuple]]
+
+_statements.register("importer.entry_ids", "SELECT id FROM entries WHERE lexicon_rowid = ?")
+_statements.register("importer.sense_ids", "SELECT id FROM senses WHERE lexicon_rowid = ?")
+
+
+def read_table(path: Path | str, delimiter: Optional[str] = None) -> Iterator[dict[str, str]]:
+    """
+    Lazily yields the rows of a CSV or TSV file with a header row. The delimiter is guessed from the file extension.
+    """
+    path = Path(path)
+    if delimiter is None:
+        delimiter = "\t" if path.suffix.lower() in (".tsv", ".tab") else ","
+    with path.open(encoding="utf-8", newline="") as f:
+        for row in csv.DictReader(f, delimiter=delimiter):
+            yield {k: v for k, v in row.items() if v not in (None, "")}
+
+
+class TableImporter:
+    """
+
+    Imports tables into an existing (usually freshly created) lexicon. ``synset_rowids`` maps the synset IDs seen so
+    far to (rowid, pos), ``entry_rowids`` maps (lemma, pos) to the rowid of its entry. If the lemma index of the
+    lexicon was enabled with ``reuse_entries``, the existing entries are reused as well. Generated entry and sense IDs
+    that are already taken (e.g. by the lemmas "ice cream" and "ice_cream") get a suffix ``-2``, ``-3``, etc. Rows
+    repeating the lemma and synset of an earlier sense are skipped, ILIs that are not in the database are left out.
+
+    The ``import_*`` methods turn every chunk of rows into database rows with the matching ``resolve_*`` method, which
+    needs no database access after :meth:`prepare`, and insert them with :meth:`write`. :mod:`wn_editor.pipeline` runs
+    these steps in separate threads.
+
+    """
+
+    def __init__(self, lexicon: LexiconEditor | str | int, chunk_size: int = 50000) -> None:
+        self.lexicon = lexicon if isinstance(lexicon, LexiconEditor) else LexiconEditor(lexicon)
+        self.lex_id = _get_lex_name_from_lex_id(self.lexicon.lex_rowid)
+        self.chunk_size = chunk_size
+        self.synset_rowids: dict[str, tuple[int, Optional[str]]] = {}
+        self.entry_rowids: dict[tuple[str, str], int] = {}
+        self.entry_ids: dict[int, str] = {}
+        self.senses: set[tuple[int, int]] = set()
+        self.counts = dict.fromkeys(("synsets", "entries", "senses", "definitions", "relations", "skipped"), 0)
+        self.next_rowids: dict[str, int] = {}
+        self._ilis: Optional[dict[str, int]] = None
+        self._taken: Optional[dict[str, set[str]]] = None
+        index = lemmas.get_lemma_index(self.lexicon)
+        if index is not None and index.reuse_entries:
+            for lemma, entries in index.entries.items():
+                for rowid, pos in entries.items():
+                    self.entry_rowids.setdefault((lemma, pos), rowid)
+
+    def prepare(self, conn) -> None:
+        """
+        Takes the write lock and reads the next free rowids (and the ILI rowids and taken IDs) before rows are resolved
+        with the ``resolve_*`` methods. The rowids stay free as long as the transaction holds the lock.
+        """
+        _lock_for_write(conn)
+        self.next_rowids = {table: rowid + 1 for table, rowid in self.max_rowids(conn).items()}
+        if self._ilis is None:
+            self._ilis = dict(_statements.execute(conn, "ilis.rowids").fetchall())
+        if self._taken is None:
+            self._taken = {
+                table: {r[0] for r in _statements.execute(conn, f"importer.{table}_ids", (self.lexicon.lex_rowid,))}
+                for table in ("entry", "sense")
+            }
+
+    def max_rowids(self, conn) -> dict[str, int]:
+        return {
+            table: _statements.execute(conn, f"{table}.max_rowid").fetchone()[0] for table in ("synsets", "entries")
+        }
+
+    def log_skipped(self) -> None:
+        if self.counts["skipped"]:
+            logger.warning(
+                f"Skipped {self.counts['skipped']} unknown ILIs and rows referring to unknown synsets or repeating a "
+                "sense"
+            )
+
+    def _synset(self, row: dict[str, str]) -> Optional[tuple[int, Optional[str]]]:
+        synset = self.synset_rowids.get(row.get("synset"))
+        if synset is None:
+            self.counts["skipped"] += 1
+        return synset
+
+    def resolve_synsets(self, chunk: list[dict[str, str]]) -> list[Batch]:
+        lex_rowid, next_rowid = self.lexicon.lex_rowid, self.next_rowids["synsets"]
+        synset_rows, definition_rows = [], []
+        for row in chunk:
+            pos = row.get("pos")
+            ili = self._ilis.get(row["ili"]) if "ili" in row else None
+            if ili is None and "ili" in row:
+                # The synset is imported without the ILI
+                self.counts["skipped"] += 1
+            synset_rows.append((next_rowid, row["id"], lex_rowid, ili, pos))
+            if "definition" in row:
+                definition_rows.append((lex_rowid, next_rowid, row["definition"], None, None, None))
+            self.synset_rowids[row["id"]] = (next_rowid, pos)
+            next_rowid += 1
+        self.next_rowids["synsets"] = next_rowid
+        return [
+            ("synsets.insert_complete", "synsets", synset_rows),
+            ("definitions.insert", "definitions", definition_rows),
+        ]
+
+    def resolve_senses(self, chunk: list[dict[str, str]]) -> list[Batch]:
+        lex_rowid, next_rowid = self.lexicon.lex_rowid, self.next_rowids["entries"]
+        entry_rows, form_rows, sense_rows = [], [], []
+        for row in chunk:
+            synset = self._synset(row)
+            if synset is None:
+                continue
+            synset_rowid, synset_pos = synset
+            lemma, pos = row["lemma"], row.get("pos", synset_pos) or "u"
+            entry_id = f"{self.lex_id}-{lemma.replace(' ', '_')}-{pos}"
+            entry_rowid = self.entry_rowids.get((lemma, pos))
+            if entry_rowid is None:
+                entry_rowid = self.entry_rowids[(lemma, pos)] = next_rowid
+                next_rowid += 1
+                self.entry_ids[entry_rowid] = entry_id = _free(entry_id, self._taken["entry"])
+                entry_rows.append((entry_rowid, entry_id, lex_rowid, pos))
+                form_rows.append((None, None, lex_rowid, entry_rowid, lemma, None, None, 0))
+            elif (entry_rowid, synset_rowid) in self.senses:
+                self.counts["skipped"] += 1
+                continue
+            else:
+                entry_id = self.entry_ids.get(entry_rowid, entry_id)
+            self.senses.add((entry_rowid, synset_rowid))
+            sense_id = _free(f"{entry_id}-{row['synset']}", self._taken["sense"])
+            sense_rows.append((sense_id, lex_rowid, entry_rowid, synset_rowid))
+        self.next_rowids["entries"] = next_rowid
+        return [
+            ("entries.insert_complete", "entries", entry_rows),
+            ("forms.insert_complete", None, form_rows),
+            ("senses.insert", "senses", sense_rows),
+        ]
+
+    def resolve_definitions(self, chunk: list[dict[str, str]]) -> list[Batch]:
+        lex_rowid = self.lexicon.lex_rowid
+        definition_rows = []
+        for row in chunk:
+            synset = self._synset(row)
+            if synset is not None:
+                definition_rows.append((lex_rowid, synset[0], row["definition"], row.get("language"), None, None))
+        return [("definitions.insert", "definitions", definition_rows)]
+
+    def resolve_relations(self, chunk: list[dict[str, str]]) -> list[Batch]:
+        lex_rowid = self.lexicon.lex_rowid
+        relation_rows = []
+        for row in chunk:
+            source, target = self.synset_rowids.get(row.get("source")), self.synset_rowids.get(row.get("target"))
+            if source is None or target is None:
+                self.counts["skipped"] += 1
+            else:
+                relation_rows.append((lex_rowid, source[0], target[0], RelationType[row["type"]].value, None))
+        return [("synset_relations.insert", "relations", relation_rows)]
+
+    def write(self, conn, batches: list[Batch]) -> None:
+        for statement, counter, rows in batches:
+            cur = _statements.executemany(conn, statement, rows)
+            if counter is not None:
+                # Duplicate relations are not inserted
+                self.counts[counter] += max(cur.rowcount, 0)
+
+    def _import(self, table: str, rows: Iterator[dict[str, str]]) -> None:
+        resolve = getattr(self, f"resolve_{table}")
+        with _connection() as conn:
+            self.prepare(conn)
+            for chunk in _chunks(rows, self.chunk_size):
+                self.write(conn, resolve(chunk))
+
+    def import_synsets(self, rows: Iterator[dict[str, str]]) -> None:
+        self._import("synsets", rows)
+
+    def import_senses(self, rows: Iterator[dict[str, str]]) -> None:
+        self._import("senses", rows)
+
+    def import_definitions(self, rows: Iterator[dict[str, str]]) -> None:
+        self._import("definitions", rows)
+
+    def import_relations(self, rows: Iterator[dict[str, str]]) -> None:
+        self._import("relations", rows)
+
+
+def import_tables(
+        lexicon: LexiconEditor | str | int,
+        synsets: Path | str,
+        senses: Optional[Path | str] = None,
+        definitions: Optional[Path | str] = None,
+        relations: Optional[Path | str] = None,
+        delimiter: Optional[str] = None,
+        chunk_size: int = 50000,
+) -> dict[str, Any]:
+    """
+
+    Imports synset, sense, definition and relation tables into a lexicon in a single transaction and returns the
+    number of imported rows per table (and the number of rows skipped because of unknown synsets or repeated senses,
+    and of unknown ILIs).
+
+    >>> lex = LexiconEditor.create_new_lexicon("dom", "Domain", "en", "a@b.c", "MIT", "1")
+    >>> import_tables(lex, "synsets.tsv", "senses.tsv", relations="relations.tsv")
+
+    """
+    importer = TableImporter(lexicon, chunk_size)
+    with transaction():
+        importer.import_synsets(read_table(synsets, delimiter))
+        if senses:
+            importer.import_senses(read_table(senses, delimiter))
+        if definitions:
+            importer.import_definitions(read_table(definitions, delimiter))
+        if relations:
+            importer.import_relations(read_table(relations, delimiter))
+        importer.lexicon.set_modified()
+        _bulk_changed(importer.lexicon.lex_rowid, relations=bool(relations))
+    importer.log_skipped()
+    return importer.counts
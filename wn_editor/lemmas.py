@@ -0,0 +1,227 @@
+"""
+Lexicon-scoped lemma lookups.
+
+:func:`find_senses`, :func:`find_entries` and :func:`find_synsets` look a lemma up in a single lexicon with one indexed
+join over forms, entries and senses, without building any wn objects. Optionally, :func:`enable_lemma_index` loads
+all lemmas of a lexicon once into an in-memory hash index which the editors keep up to date, so that the form lookup
+needs no query at all.
+
+A lemma is a form of rank 0 or, for forms added by the editors, without a rank.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+from typing import Iterable, Optional
+
+from wn_editor.editor import (
+    LexiconEditor,
+    _chunks,
+    _connection,
+    _qs,
+    _statements,
+    _state,
+)
+
+_LEMMA = "coalesce(f.rank, 0) = 0 AND f.form != '_'"
+
+_statements.register(
+    "lemmas.load",
+    f"""
+    SELECT e.rowid, e.pos, f.form FROM entries AS e JOIN forms AS f ON f.entry_rowid = e.rowid
+    WHERE e.lexicon_rowid = ? AND {_LEMMA}
+    """,
+)
+_statements.register(
+    "lemmas.find_senses",
+    f"""
+    SELECT s.rowid, s.entry_rowid, s.synset_rowid FROM forms AS f
+    JOIN entries AS e ON e.rowid = f.entry_rowid
+    JOIN senses AS s ON s.entry_rowid = e.rowid
+    WHERE f.form = ? AND f.lexicon_rowid = ? AND {_LEMMA}
+    """,
+)
+_statements.register(
+    "lemmas.find_senses_pos",
+    f"""
+    SELECT s.rowid, s.entry_rowid, s.synset_rowid FROM forms AS f
+    JOIN entries AS e ON e.rowid = f.entry_rowid
+    JOIN senses AS s ON s.entry_rowid = e.rowid
+    WHERE f.form = ? AND f.lexicon_rowid = ? AND {_LEMMA} AND e.pos = ?
+    """,
+)
+_statements.register(
+    "lemmas.find_entries",
+    f"""
+    SELECT DISTINCT e.rowid FROM forms AS f JOIN entries AS e ON e.rowid = f.entry_rowid
+    WHERE f.form = ? AND f.lexicon_rowid = ? AND {_LEMMA}
+    """,
+)
+_statements.register(
+    "lemmas.find_entries_pos",
+    f"""
+    SELECT DISTINCT e.rowid FROM forms AS f JOIN entries AS e ON e.rowid = f.entry_rowid
+    WHERE f.form = ? AND f.lexicon_rowid = ? AND {_LEMMA} AND e.pos = ?
+    """,
+)
+_statements.register("lemmas.entry_of_form", "SELECT entry_rowid FROM forms WHERE rowid = ?")
+
+
+class LemmaIndex:
+    """
+
+    In-memory hash index of all lemmas of one lexicon. ``entries`` maps a lemma to the rowids and parts of speech of
+    its entries, ``lemmas`` maps the rowid of every entry to its lemmas. With ``reuse_entries``,
+    :meth:`wn_editor.editor.SynsetEditor.add_word` and the table importer attach new senses to an existing entry with
+    the same lemma and part of speech instead of creating a new entry.
+
+    """
+
+    def __init__(self, lex_rowid: int, reuse_entries: bool = False) -> None:
+        self.lex_rowid = lex_rowid
+        self.reuse_entries = reuse_entries
+        self.entries: dict[str, dict[int, str]] = {}
+        self.lemmas: dict[int, set[str]] = {}
+        self.load()
+
+    def load(self) -> None:
+        """
+        (Re)load all lemmas of the lexicon with a single query
+        """
+        self.entries.clear()
+        self.lemmas.clear()
+        with _connection() as conn:
+            for row in _statements.execute(conn, "lemmas.load", (self.lex_rowid,)).fetchall():
+                self.add(*row)
+
+    def add(self, entry_rowid: int, pos: str, lemma: str) -> None:
+        self.entries.setdefault(lemma, {})[entry_rowid] = pos
+        self.lemmas.setdefault(entry_rowid, set()).add(lemma)
+
+    def remove(self, entry_rowid: int) -> None:
+        for lemma in self.lemmas.pop(entry_rowid, ()):
+            entries = self.entries[lemma]
+            entries.pop(entry_rowid, None)
+            if not entries:
+                del self.entries[lemma]
+
+    def find(self, lemma: str, pos: Optional[str] = None) -> list[int]:
+        """
+        Returns the rowids of the entries with this lemma (and part of speech)
+        """
+        return [rowid for rowid, p in self.entries.get(lemma, {}).items() if pos is None or p == pos]
+
+
+def _indexes() -> dict[int, LemmaIndex]:
+    """
+    The enabled indexes of the current database by lexicon rowid
+    """
+    return _state("lemma_indexes")
+
+
+def _lex_rowid(lexicon: LexiconEditor | str | int) -> int:
+    return (lexicon if isinstance(lexicon, LexiconEditor) else LexiconEditor(lexicon)).lex_rowid
+
+
+def enable_lemma_index(lexicon: LexiconEditor | str | int, reuse_entries: bool = False) -> LemmaIndex:
+    """
+    Load all lemmas of a lexicon into memory and keep them up to date while editing
+    """
+    index = LemmaIndex(_lex_rowid(lexicon), reuse_entries)
+    _indexes()[index.lex_rowid] = index
+    return index
+
+
+def disable_lemma_index(lexicon: LexiconEditor | str | int) -> None:
+    _indexes().pop(_lex_rowid(lexicon), None)
+
+
+def get_lemma_index(lexicon: LexiconEditor | str | int) -> Optional[LemmaIndex]:
+    return _indexes().get(_lex_rowid(lexicon))
+
+
+def find_entries(lexicon: LexiconEditor | str | int, lemma: str, pos: Optional[str] = None) -> list[int]:
+    """
+    Returns the rowids of all entries of a lexicon with the given lemma (and part of speech)
+    """
+    lex_rowid = _lex_rowid(lexicon)
+    index = _indexes().get(lex_rowid)
+    if index is not None:
+        return index.find(lemma, pos)
+    with _connection() as conn:
+        if pos is None:
+            cur = _statements.execute(conn, "lemmas.find_entries", (lemma, lex_rowid))
+        else:
+            cur = _statements.execute(conn, "lemmas.find_entries_pos", (lemma, lex_rowid, pos))
+        return [r[0] for r in cur.fetchall()]
+
+
+def find_senses(
+        lexicon: LexiconEditor | str | int, lemma: str, pos: Optional[str] = None
+) -> list[tuple[int, int, int]]:
+    """
+    Returns (sense rowid, entry rowid, synset rowid) of all senses of a lexicon with the given lemma (and part of speech)
+    """
+    lex_rowid = _lex_rowid(lexicon)
+    index = _indexes().get(lex_rowid)
+    with _connection() as conn:
+        if index is not None:
+            result = []
+            for part in _chunks(index.find(lemma, pos), 500):
+                name = _statements.register(
+                    f"senses.by_entry_rowids.{len(part)}",
+                    f"SELECT rowid, entry_rowid, synset_rowid FROM senses WHERE entry_rowid IN ({_qs(part)})",
+                )
+                result.extend(_statements.execute(conn, name, part).fetchall())
+            return result
+        if pos is None:
+            return _statements.execute(conn, "lemmas.find_senses", (lemma, lex_rowid)).fetchall()
+        return _statements.execute(conn, "lemmas.find_senses_pos", (lemma, lex_rowid, pos)).fetchall()
+
+
+def find_synsets(lexicon: LexiconEditor | str | int, lemma: str, pos: Optional[str] = None) -> list[int]:
+    """
+    Returns the rowids of all synsets of a lexicon containing the given lemma (as a word of the given part of speech)
+    """
+    return list(dict.fromkeys(synset_rowid for _, _, synset_rowid in find_senses(lexicon, lemma, pos)))
+
+
+def _entries_changed(conn: sqlite3.Connection, entry_rowids: Iterable[int]) -> None:
+    """
+    Reloads the lemmas of the given entries into the enabled indexes
+    """
+    indexes = _indexes()
+    if not indexes:
+        return
+    for part in _chunks(set(entry_rowids), 500):
+        for index in indexes.values():
+            for rowid in part:
+                index.remove(rowid)
+        name = _statements.register(
+            f"lemmas.load_entries.{len(part)}",
+            f"""
+            SELECT e.lexicon_rowid, e.rowid, e.pos, f.form FROM entries AS e JOIN forms AS f ON f.entry_rowid = e.rowid
+            WHERE e.rowid IN ({_qs(part)}) AND {_LEMMA}
+            """,
+        )
+        for lex_rowid, *row in _statements.execute(conn, name, part).fetchall():
+            if lex_rowid in indexes:
+                indexes[lex_rowid].add(*row)
+
+
+def _entry_of_form(conn: sqlite3.Connection, form_rowid: int) -> Optional[int]:
+    if not _indexes():
+        return None
+    res = _statements.execute(conn, "lemmas.entry_of_form", (form_rowid,)).fetchall()
+    return res[0][0] if res else None
+
+
+def _entry_deleted(entry_rowid: int) -> None:
+    for index in _indexes().values():
+        index.remove(entry_rowid)
+
+
+def _lexicon_changed(lex_rowid: int) -> None:
+    index = _indexes().get(lex_rowid)
+    if index is not None:
+        index.load()
@@ -0,0 +1,174 @@
+"""
+Database maintenance after large imports and deletions.
+
+:func:`optimize_database` runs the maintenance steps that are possible for the wn database and the editor index
+database and reports the page statistics of both before and after.
+
+wn refuses to open a database whose schema (the statements in ``sqlite_master``, in their order) differs from the one
+it created. This rules out most maintenance of the wn database: ANALYZE creates the ``sqlite_stat1`` table and VACUUM
+rewrites ``sqlite_master`` with all tables before all indexes. For the wn database
+
+* the planner statistics are only refreshed (with ``PRAGMA optimize``) if they are already present. wn never creates
+  them, so for a database created by wn this step does nothing;
+* free pages are only returned to the file system if the database already uses incremental auto-vacuum, which wn does
+  not set up either. Otherwise their number is logged and the file keeps its size;
+* the write-ahead log is checkpointed, if the database uses one.
+
+The editor index database has no such restriction and is analyzed and vacuumed normally.
+
+After every transaction (see :func:`wn_editor.editor.transaction`) and threaded import in which the editors changed at
+least :data:`AUTO_OPTIMIZE_CHANGES` rows since the last maintenance of the connection, :func:`optimize_database` runs
+automatically.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import time
+from typing import NamedTuple, Optional
+
+import wn
+from wn._add import logger
+
+from wn_editor.editor import INDEX_DATABASE, _in_transaction, _index_tables, _state, _statements, connect
+
+# PRAGMA auto_vacuum value of incremental auto-vacuum
+_INCREMENTAL = 2
+
+# Number of changed rows after which a transaction is followed by optimize_database(), None to never run it
+# automatically
+AUTO_OPTIMIZE_CHANGES: Optional[int] = 100000
+
+
+class DatabaseStats(NamedTuple):
+    page_size: int
+    page_count: int
+    freelist_count: int
+    auto_vacuum: int
+
+    @property
+    def size(self) -> int:
+        return self.page_size * self.page_count
+
+    @property
+    def fragmentation(self) -> float:
+        """
+        The share of free pages in the file
+        """
+        return self.freelist_count / self.page_count if self.page_count else 0.0
+
+
+class MaintenanceReport(NamedTuple):
+    """
+
+    The result of :func:`optimize_database`: the page statistics per database (``main`` and, if present, the editor
+    index database) before and after, and the duration of every step in seconds.
+
+    """
+
+    before: dict[str, DatabaseStats]
+    after: dict[str, DatabaseStats]
+    steps: dict[str, float]
+
+    def __str__(self) -> str:
+        lines = []
+        for schema, after in self.after.items():
+            for name, stats in (("before", self.before[schema]), ("after", after)):
+                lines.append(
+                    f"{schema} {name}: {stats.page_count} pages ({stats.size / 2 ** 20:.1f} MiB), "
+                    f"{stats.freelist_count} free ({stats.fragmentation:.1%})"
+                )
+        lines.extend(f"  {step}: {seconds:.2f}s" for step, seconds in self.steps.items())
+        return "\n".join(lines)
+
+
+def _stats(conn: sqlite3.Connection) -> dict[str, DatabaseStats]:
+    schemas = ["main", INDEX_DATABASE] if _index_tables(conn) else ["main"]
+    return {
+        schema: DatabaseStats(
+            *(conn.execute(f"PRAGMA {schema}.{name}").fetchone()[0] for name in DatabaseStats._fields)
+        )
+        for schema in schemas
+    }
+
+
+def database_stats() -> dict[str, DatabaseStats]:
+    """
+    Returns the page size, page count, number of free pages and auto-vacuum mode of the wn and editor index databases
+    """
+    return _stats(connect())
+
+
+def optimize_database(
+        analyze: bool = True, vacuum: bool = True, checkpoint: bool = True, pages: Optional[int] = None
+) -> MaintenanceReport:
+    """
+
+    Runs the maintenance steps outside of any transaction and returns a :class:`MaintenanceReport`.
+
+    ``analyze`` refreshes the planner statistics and ``vacuum`` returns up to ``pages`` (default: all) free pages to the
+    file system; for the wn database both only happen within the limits given in the module documentation, the editor
+    index database is analyzed and fully vacuumed. ``checkpoint`` copies the write-ahead log into the database and
+    truncates it.
+
+    >>> print(optimize_database())
+    main before: 52011 pages (203.2 MiB), 9120 free (17.5%)
+    main after: 52011 pages (203.2 MiB), 9120 free (17.5%)
+    wn_editor_index before: 8240 pages (32.2 MiB), 2113 free (25.6%)
+    wn_editor_index after: 6127 pages (23.9 MiB), 0 free (0.0%)
+    ...
+
+    """
+    return _optimize(connect(), analyze, vacuum, checkpoint, pages)
+
+
+def _optimize(
+        conn: sqlite3.Connection, analyze: bool, vacuum: bool, checkpoint: bool, pages: Optional[int]
+) -> MaintenanceReport:
+    if _in_transaction(conn):
+        raise wn.Error("The database cannot be optimized inside a transaction")
+    if conn.in_transaction:
+        conn.commit()
+    steps = {}
+
+    def timed(name: str, sql: str) -> None:
+        began = time.perf_counter()
+        # executescript steps the statement to completion, execute() would free only a single page per call of
+        # PRAGMA incremental_vacuum
+        conn.executescript(sql)
+        steps[name] = time.perf_counter() - began
+
+    before = _stats(conn)
+    if analyze:
+        if conn.execute("SELECT 1 FROM main.sqlite_master WHERE name = 'sqlite_stat1'").fetchall():
+            timed("optimize main", "PRAGMA main.optimize")
+        if INDEX_DATABASE in before:
+            timed(f"analyze {INDEX_DATABASE}", f"ANALYZE {INDEX_DATABASE}")
+    if vacuum:
+        if before["main"].auto_vacuum == _INCREMENTAL:
+            timed("incremental vacuum main", f"PRAGMA main.incremental_vacuum({pages or 0})")
+        elif before["main"].freelist_count:
+            logger.info(
+                f"{before['main'].freelist_count} free pages of the wn database cannot be returned to the file "
+                "system, it does not use incremental auto-vacuum"
+            )
+        if INDEX_DATABASE in before:
+            timed(f"vacuum {INDEX_DATABASE}", f"VACUUM {INDEX_DATABASE}")
+    if checkpoint:
+        timed("checkpoint", "PRAGMA main.wal_checkpoint(TRUNCATE)")
+    _state("maintenance", conn)["changes"] = conn.total_changes
+    return MaintenanceReport(before, _stats(conn), steps)
+
+
+def _session_ended(conn: sqlite3.Connection) -> None:
+    """
+    Runs the maintenance if enough rows were changed since the last one, outside of transactions and dry runs
+    """
+    if AUTO_OPTIMIZE_CHANGES is None or conn.in_transaction or _in_transaction(conn):
+        return
+    if _statements.recorder is not None:
+        return
+    changes = conn.total_changes - _state("maintenance", conn).get("changes", 0)
+    if changes >= AUTO_OPTIMIZE_CHANGES:
+        report = _optimize(conn, True, True, True, None)
+        logger.info(f"Optimized the database after {changes} changed rows:\n{report}")
@@ -0,0 +1,286 @@
+"""
+Merging one lexicon into another without creating duplicates.
+
+Both lexicons are fetched with one query per table and matched with in-memory hash joins: synsets by ILI and then by
+their set of lemmas (and part of speech), entries by lemma and part of speech. Only the senses, definitions, examples,
+counts and relations missing in the target lexicon are inserted, all in a single transaction.
+"""
+
+from __future__ import annotations
+
+from wn_editor.editor import (
+    LexiconEditor,
+    _get_lex_name_from_lex_id,
+    _bulk_changed,
+    _lock_for_write,
+    _statements,
+    transaction,
+)
+
+# Table -> the table of the synsets or senses its rows belong to
+_EXAMPLE_TABLES = {"synset_examples": "synsets", "sense_examples": "senses"}
+_RELATION_TABLES = {
+    "synset_relations": ("synsets", "synsets"),
+    "sense_relations": ("senses", "senses"),
+    "sense_synset_relations": ("senses", "synsets"),
+}
+
+_statements.register("merge.synsets", "SELECT rowid, id, ili_rowid, pos FROM synsets WHERE lexicon_rowid = ?")
+_statements.register("merge.entries", "SELECT rowid, id, pos FROM entries WHERE lexicon_rowid = ?")
+_statements.register(
+    "merge.forms",
+    """
+    SELECT rowid, id, entry_rowid, form, normalized_form, script, rank FROM forms
+    WHERE lexicon_rowid = ? ORDER BY entry_rowid, rank, rowid
+    """,
+)
+_statements.register("merge.senses", "SELECT rowid, id, entry_rowid, synset_rowid FROM senses WHERE lexicon_rowid = ?")
+_statements.register(
+    "merge.definitions",
+    "SELECT synset_rowid, definition, language, sense_rowid, metadata FROM definitions WHERE lexicon_rowid = ?",
+)
+_statements.register(
+    "merge.synset_examples",
+    "SELECT synset_rowid, example, language, metadata FROM synset_examples WHERE lexicon_rowid = ?",
+)
+_statements.register(
+    "merge.sense_examples",
+    "SELECT sense_rowid, example, language, metadata FROM sense_examples WHERE lexicon_rowid = ?",
+)
+_statements.register("merge.counts", "SELECT sense_rowid, count, metadata FROM counts WHERE lexicon_rowid = ?")
+for _table in _RELATION_TABLES:
+    _statements.register(
+        f"merge.{_table}",
+        f"SELECT source_rowid, target_rowid, type_rowid, metadata FROM {_table} WHERE lexicon_rowid = ?",
+    )
+
+
+class MergeReport:
+    """
+
+    The result of :func:`merge_lexicons`. ``counts`` holds the number of matched, added and skipped (already present)
+    rows, ``synsets``, ``entries`` and ``senses`` map the rowids of the merged lexicon to those in the target lexicon.
+
+    """
+
+    def __init__(self, lex_rowid: int, other_rowid: int) -> None:
+        self.lex_rowid = lex_rowid
+        self.other_rowid = other_rowid
+        self.counts: dict[str, int] = {}
+        self.synsets: dict[int, int] = {}
+        self.entries: dict[int, int] = {}
+        self.senses: dict[int, int] = {}
+
+    def count(self, name: str, n: int = 1) -> None:
+        self.counts[name] = self.counts.get(name, 0) + n
+
+    def __str__(self) -> str:
+        lines = [f"Merged lexicon {self.other_rowid} into {self.lex_rowid}"]
+        lines.extend(f"  {name}: {count}" for name, count in sorted(self.counts.items()))
+        return "\n".join(lines)
+
+
+def _lemmas(forms: list[tuple]) -> dict[int, tuple]:
+    """
+    Returns the first form row (lowest rank) of every entry
+    """
+    lemmas = {}
+    for row in forms:
+        lemmas.setdefault(row[2], row)
+    return lemmas
+
+
+def _unique(id_: str, prefix: str, taken: set[str]) -> str:
+    """
+    Returns ``id_`` or, if it is taken, a prefixed and numbered variant of it, and marks it as taken
+    """
+    candidate, n = id_, 1
+    while candidate in taken:
+        candidate = f"{prefix}-{id_}" + (f"-{n}" if n > 1 else "")
+        n += 1
+    taken.add(candidate)
+    return candidate
+
+
+def _max_rowid(conn, table: str) -> int:
+    return _statements.execute(conn, f"{table}.max_rowid").fetchone()[0]
+
+
+def merge_lexicons(
+        lexicon: LexiconEditor | str | int, other: LexiconEditor | str | int, match_lemmas: bool = True
+) -> MergeReport:
+    """
+
+    Merges ``other`` into ``lexicon`` and returns a :class:`MergeReport`. ``other`` is left untouched.
+    Synsets of ``other`` are matched to synsets of ``lexicon`` with the same ILI or, if ``match_lemmas`` is set, with
+    the same part of speech and set of lemmas; unmatched synsets are copied, without their ILI if a synset of
+    ``lexicon`` already has it. Entries are matched by lemma and part of speech; unmatched entries are copied with all
+    their forms. Senses, definitions, examples, counts and synset and sense relations are only inserted if ``lexicon``
+    does not have them yet.
+
+    """
+    lexicon = lexicon if isinstance(lexicon, LexiconEditor) else LexiconEditor(lexicon)
+    other = other if isinstance(other, LexiconEditor) else LexiconEditor(other)
+    lex_rowid, other_rowid = lexicon.lex_rowid, other.lex_rowid
+    if lex_rowid == other_rowid:
+        raise AttributeError("Cannot merge a lexicon into itself")
+    prefix = _get_lex_name_from_lex_id(other_rowid)
+    report = MergeReport(lex_rowid, other_rowid)
+
+    with transaction() as conn:
+        _lock_for_write(conn)
+        fetched = {}
+        for name in ("synsets", "entries", "forms", "senses", "definitions", *_EXAMPLE_TABLES, "counts",
+                     *_RELATION_TABLES):
+            fetched[name] = tuple(
+                _statements.execute(conn, f"merge.{name}", (rowid,)).fetchall() for rowid in (lex_rowid, other_rowid)
+            )
+
+        # Entries: hash join on (lemma, pos)
+        base_lemmas, other_lemmas = (_lemmas(forms) for forms in fetched["forms"])
+        by_lemma = {
+            (base_lemmas[rowid][3], pos): rowid for rowid, _, pos in fetched["entries"][0] if rowid in base_lemmas
+        }
+        entry_ids = {id_ for _, id_, _ in fetched["entries"][0]}
+        new_entries, new_forms = [], []
+        next_entry, next_form = _max_rowid(conn, "entries") + 1, _max_rowid(conn, "forms") + 1
+        for rowid, id_, pos in fetched["entries"][1]:
+            key = (other_lemmas[rowid][3], pos) if rowid in other_lemmas else None
+            if key in by_lemma:
+                report.entries[rowid] = by_lemma[key]
+                report.count("entries matched")
+                continue
+            report.entries[rowid] = next_entry
+            if key:
+                by_lemma[key] = next_entry
+            new_entries.append((next_entry, _unique(id_, prefix, entry_ids), lex_rowid, pos))
+            next_entry += 1
+        copied = {row[0] for row in new_entries}
+        for _, form_id, entry_rowid, *form in fetched["forms"][1]:
+            if report.entries[entry_rowid] in copied:
+                new_forms.append((next_form, form_id, lex_rowid, report.entries[entry_rowid], *form))
+                next_form += 1
+        _statements.executemany(conn, "entries.insert_complete", new_entries)
+        _statements.executemany(conn, "forms.insert_complete", new_forms)
+        report.count("entries added", len(new_entries))
+        report.count("forms added", len(new_forms))
+
+        # Synsets: hash join on ILI, then on (pos, lemma set)
+        def lemma_sets(senses, lemmas):
+            sets = {}
+            for _, _, entry_rowid, synset_rowid in senses:
+                if entry_rowid in lemmas:
+                    sets.setdefault(synset_rowid, set()).add(lemmas[entry_rowid][3])
+            return {rowid: frozenset(lemma_set) for rowid, lemma_set in sets.items()}
+
+        base_sets = lemma_sets(fetched["senses"][0], base_lemmas)
+        other_sets = lemma_sets(fetched["senses"][1], other_lemmas)
+        by_ili = {ili: rowid for rowid, _, ili, _ in fetched["synsets"][0] if ili is not None}
+        by_set = {(pos, base_sets[rowid]): rowid for rowid, _, _, pos in fetched["synsets"][0] if rowid in base_sets}
+        synset_ids = {id_ for _, id_, _, _ in fetched["synsets"][0]}
+        ilis = set(by_ili)
+        new_synsets = []
+        next_synset = _max_rowid(conn, "synsets") + 1
+        for rowid, id_, ili, pos in fetched["synsets"][1]:
+            key = (pos, other_sets.get(rowid))
+            if ili is not None and ili in by_ili:
+                report.synsets[rowid] = by_ili[ili]
+                report.count("synsets matched by ili")
+            elif match_lemmas and key[1] and key in by_set:
+                report.synsets[rowid] = by_set[key]
+                report.count("synsets matched by lemmas")
+            else:
+                if ili in ilis:
+                    # Another copied synset has the ILI already
+                    report.count("synset ilis skipped")
+                    ili = None
+                elif ili is not None:
+                    ilis.add(ili)
+                report.synsets[rowid] = next_synset
+                new_synsets.append((next_synset, _unique(id_, prefix, synset_ids), lex_rowid, ili, pos))
+                next_synset += 1
+        _statements.executemany(conn, "synsets.insert_complete", new_synsets)
+        report.count("synsets added", len(new_synsets))
+
+        # Senses: anti-join on (entry, synset)
+        existing = {(entry_rowid, synset_rowid): rowid for rowid, _, entry_rowid, synset_rowid in fetched["senses"][0]}
+        sense_ids = {id_ for _, id_, _, _ in fetched["senses"][0]}
+        new_senses = []
+        next_sense = _max_rowid(conn, "senses") + 1
+        for rowid, id_, entry_rowid, synset_rowid in fetched["senses"][1]:
+            key = (report.entries[entry_rowid], report.synsets[synset_rowid])
+            if key in existing:
+                report.senses[rowid] = existing[key]
+                report.count("senses skipped")
+                continue
+            report.senses[rowid] = existing[key] = next_sense
+            new_senses.append((next_sense, _unique(id_, prefix, sense_ids), lex_rowid, *key))
+            next_sense += 1
+        _statements.executemany(conn, "senses.insert_complete", new_senses)
+        report.count("senses added", len(new_senses))
+
+        # Definitions: anti-join on (synset, text)
+        definitions = {(synset_rowid, text) for synset_rowid, text, *_ in fetched["definitions"][0]}
+        new_definitions = []
+        for synset_rowid, text, language, sense_rowid, metadata in fetched["definitions"][1]:
+            key = (report.synsets[synset_rowid], text)
+            if key in definitions:
+                report.count("definitions skipped")
+                continue
+            definitions.add(key)
+            sense_rowid = report.senses.get(sense_rowid) if sense_rowid is not None else None
+            new_definitions.append((lex_rowid, key[0], text, language, sense_rowid, metadata))
+        _statements.executemany(conn, "definitions.insert", new_definitions)
+        report.count("definitions added", len(new_definitions))
+
+        maps = {"synsets": report.synsets, "senses": report.senses}
+
+        # Examples: anti-join on (synset or sense, text)
+        for table, owner_table in _EXAMPLE_TABLES.items():
+            examples = {tuple(row[:2]) for row in fetched[table][0]}
+            new_examples = []
+            for owner_rowid, text, language, metadata in fetched[table][1]:
+                key = (maps[owner_table][owner_rowid], text)
+                if key in examples:
+                    report.count(f"{table} skipped")
+                    continue
+                examples.add(key)
+                new_examples.append((lex_rowid, *key, language, metadata))
+            _statements.executemany(conn, f"{table}.insert", new_examples)
+            report.count(f"{table} added", len(new_examples))
+
+        # Counts: anti-join on (sense, count)
+        counts = {tuple(row[:2]) for row in fetched["counts"][0]}
+        new_counts = []
+        for sense_rowid, count, metadata in fetched["counts"][1]:
+            key = (report.senses[sense_rowid], count)
+            if key in counts:
+                report.count("counts skipped")
+                continue
+            counts.add(key)
+            new_counts.append((lex_rowid, *key, metadata))
+        _statements.executemany(conn, "counts.insert", new_counts)
+        report.count("counts added", len(new_counts))
+
+        # Relations: anti-join on (source, target, type)
+        for table, (source_table, target_table) in _RELATION_TABLES.items():
+            relations = {tuple(row[:3]) for row in fetched[table][0]}
+            new_relations = []
+            for source_rowid, target_rowid, type_rowid, metadata in fetched[table][1]:
+                # Relations to other lexicons keep their target
+                key = (
+                    maps[source_table].get(source_rowid, source_rowid),
+                    maps[target_table].get(target_rowid, target_rowid),
+                    type_rowid,
+                )
+                if key in relations:
+                    report.count(f"{table} skipped")
+                    continue
+                relations.add(key)
+                new_relations.append((lex_rowid, *key, metadata))
+            _statements.executemany(conn, f"{table}.insert", new_relations)
+            report.count(f"{table} added", len(new_relations))
+
+        lexicon.set_modified()
+        _bulk_changed(lex_rowid, relations=bool(report.counts.get("synset_relations added")))
+    return report
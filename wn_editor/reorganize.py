@@ -0,0 +1,458 @@
+"""
+Set-based restructuring of synsets and senses.
+
+:func:`merge_synsets` merges synsets into other synsets, :func:`split_synset` moves senses of a synset into a new
+synset and :func:`move_senses` moves senses to other synsets and entries. Instead of deleting and re-creating senses and
+relations one by one, merges and moves run a fixed number of UPDATE and DELETE statements over temporary tables
+mapping every synset or sense to its target, no matter how many are changed, in a single transaction and undo step.
+
+Synsets and senses are given as :class:`wn.Synset`/:class:`wn.Sense`, as editors or as rowids.
+"""
+
+from __future__ import annotations
+
+from typing import Iterable, Optional
+
+import wn
+
+from wn_editor import closure, cycles, search
+from wn_editor.editor import (
+    EntryEditor,
+    SenseEditor,
+    SynsetEditor,
+    _chunks,
+    _statements,
+    get_row_id,
+    transaction,
+)
+
+_MERGES = "synset_merges"
+_SENSE_MERGES = "sense_merges"
+_MOVES = "sense_moves"
+
+# Rows referring to a sense or synset by rowid, as (table, column), moved to the new sense or synset
+_SENSE_REFERENCES = [
+    ("sense_relations", "source_rowid"),
+    ("sense_relations", "target_rowid"),
+    ("sense_synset_relations", "source_rowid"),
+    ("sense_examples", "sense_rowid"),
+    ("counts", "sense_rowid"),
+    ("adjpositions", "sense_rowid"),
+    ("syntactic_behaviour_senses", "sense_rowid"),
+    ("definitions", "sense_rowid"),
+]
+_SYNSET_REFERENCES = [
+    ("senses", "synset_rowid"),
+    ("definitions", "synset_rowid"),
+    ("synset_examples", "synset_rowid"),
+    ("synset_relations", "source_rowid"),
+    ("synset_relations", "target_rowid"),
+    ("sense_synset_relations", "target_rowid"),
+    # A synset has at most one proposed ILI, the one of the target is kept
+    ("proposed_ilis", "synset_rowid"),
+]
+
+_RELATION_KEY = ["lexicon_rowid", "source_rowid", "target_rowid", "type_rowid"]
+
+_NEW_SYNSETS = f"SELECT new_rowid FROM temp.{_MERGES}"
+_NEW_SENSES = f"SELECT new_rowid FROM temp.{_SENSE_MERGES}"
+
+for _mapping in (_MERGES, _SENSE_MERGES):
+    _statements.register(
+        f"reorganize.create.{_mapping}",
+        f"CREATE TEMP TABLE IF NOT EXISTS {_mapping} (old_rowid INTEGER PRIMARY KEY, new_rowid INTEGER NOT NULL)",
+    )
+    _statements.register(f"reorganize.clear.{_mapping}", f"DELETE FROM temp.{_mapping}")
+_statements.register(
+    f"reorganize.create.{_MOVES}",
+    f"""
+    CREATE TEMP TABLE IF NOT EXISTS {_MOVES} (
+        sense_rowid INTEGER PRIMARY KEY,
+        synset_rowid INTEGER,
+        entry_rowid INTEGER
+    )
+    """,
+)
+_statements.register(f"reorganize.clear.{_MOVES}", f"DELETE FROM temp.{_MOVES}")
+_statements.register("reorganize.insert_merge", f"INSERT INTO temp.{_MERGES} VALUES (?,?)")
+_statements.register("reorganize.insert_move", f"INSERT OR REPLACE INTO temp.{_MOVES} VALUES (?,?,?)")
+_statements.register(
+    "reorganize.missing_synsets",
+    f"""
+    SELECT m.old_rowid, m.new_rowid FROM temp.{_MERGES} AS m
+    WHERE NOT EXISTS (SELECT 1 FROM synsets AS s WHERE s.rowid = m.old_rowid)
+    OR NOT EXISTS (SELECT 1 FROM synsets AS s WHERE s.rowid = m.new_rowid)
+    """,
+)
+_statements.register(
+    "reorganize.set_modified",
+    f"""
+    UPDATE lexicons SET modified = 1 WHERE rowid IN (
+        SELECT lexicon_rowid FROM synsets WHERE rowid IN (SELECT old_rowid FROM temp.{_MERGES} UNION {_NEW_SYNSETS})
+        UNION SELECT lexicon_rowid FROM senses WHERE synset_rowid IN (SELECT old_rowid FROM temp.{_MERGES})
+    )
+    """,
+)
+# Senses of the same entry ending up in the same synset are merged into the one already in the target synset or else
+# into the first one
+_statements.register(
+    "reorganize.find_sense_merges",
+    f"""
+    INSERT INTO temp.{_SENSE_MERGES} (old_rowid, new_rowid)
+    SELECT rowid, keeper FROM (
+        SELECT s.rowid, first_value(s.rowid) OVER (
+            PARTITION BY coalesce(m.new_rowid, s.synset_rowid), s.entry_rowid
+            ORDER BY m.new_rowid IS NOT NULL, s.rowid
+        ) AS keeper
+        FROM senses AS s LEFT JOIN temp.{_MERGES} AS m ON m.old_rowid = s.synset_rowid
+        WHERE s.synset_rowid IN (SELECT old_rowid FROM temp.{_MERGES} UNION {_NEW_SYNSETS})
+    )
+    WHERE rowid != keeper
+    """,
+)
+for _mapping, _references in ((_SENSE_MERGES, _SENSE_REFERENCES), (_MERGES, _SYNSET_REFERENCES)):
+    for _table, _column in _references:
+        _statements.register(
+            f"reorganize.redirect.{_table}.{_column}",
+            f"""
+            UPDATE OR IGNORE {_table}
+            SET {_column} = (SELECT m.new_rowid FROM temp.{_mapping} AS m WHERE m.old_rowid = {_table}.{_column})
+            WHERE {_column} IN (SELECT old_rowid FROM temp.{_mapping})
+            """,
+        )
+_statements.register(
+    "reorganize.delete_merged_senses", f"DELETE FROM senses WHERE rowid IN (SELECT old_rowid FROM temp.{_SENSE_MERGES})"
+)
+_statements.register(
+    "reorganize.merge_ilis",
+    f"""
+    UPDATE synsets SET ili_rowid = (
+        SELECT o.ili_rowid FROM temp.{_MERGES} AS m JOIN synsets AS o ON o.rowid = m.old_rowid
+        WHERE m.new_rowid = synsets.rowid AND o.ili_rowid IS NOT NULL ORDER BY o.rowid LIMIT 1
+    )
+    WHERE ili_rowid IS NULL AND rowid IN ({_NEW_SYNSETS})
+    """,
+)
+_statements.register(
+    "reorganize.set_lexicalized",
+    f"""
+    UPDATE synsets SET lexicalized = 1
+    WHERE lexicalized = 0 AND rowid IN ({_NEW_SYNSETS})
+    AND EXISTS (SELECT 1 FROM senses AS s WHERE s.synset_rowid = synsets.rowid)
+    """,
+)
+_statements.register(
+    "reorganize.delete_synset_loops",
+    f"DELETE FROM synset_relations WHERE source_rowid = target_rowid AND source_rowid IN ({_NEW_SYNSETS})",
+)
+_statements.register(
+    "reorganize.delete_sense_loops",
+    f"DELETE FROM sense_relations WHERE source_rowid = target_rowid AND source_rowid IN ({_NEW_SENSES})",
+)
+
+
+_statements.register(
+    "reorganize.invalid_moves",
+    f"""
+    SELECT m.sense_rowid FROM temp.{_MOVES} AS m LEFT JOIN senses AS s ON s.rowid = m.sense_rowid
+    WHERE s.rowid IS NULL
+    OR (m.synset_rowid IS NOT NULL AND NOT EXISTS (SELECT 1 FROM synsets AS ss WHERE ss.rowid = m.synset_rowid))
+    OR (m.entry_rowid IS NOT NULL AND NOT EXISTS (
+        SELECT 1 FROM entries AS e WHERE e.rowid = m.entry_rowid AND e.lexicon_rowid = s.lexicon_rowid
+    ))
+    """,
+)
+_statements.register(
+    "reorganize.moves_modified",
+    f"""
+    UPDATE lexicons SET modified = 1 WHERE rowid IN (
+        SELECT s.lexicon_rowid FROM temp.{_MOVES} AS m JOIN senses AS s ON s.rowid = m.sense_rowid
+        UNION SELECT ss.lexicon_rowid FROM temp.{_MOVES} AS m JOIN senses AS s ON s.rowid = m.sense_rowid
+        JOIN synsets AS ss ON ss.rowid = s.synset_rowid
+        UNION SELECT ss.lexicon_rowid FROM temp.{_MOVES} AS m JOIN synsets AS ss ON ss.rowid = m.synset_rowid
+    )
+    """,
+)
+_statements.register(
+    "reorganize.move_senses",
+    f"""
+    UPDATE senses SET
+    synset_rowid = coalesce(
+        (SELECT m.synset_rowid FROM temp.{_MOVES} AS m WHERE m.sense_rowid = senses.rowid), synset_rowid
+    ),
+    entry_rowid = coalesce(
+        (SELECT m.entry_rowid FROM temp.{_MOVES} AS m WHERE m.sense_rowid = senses.rowid), entry_rowid
+    )
+    WHERE rowid IN (SELECT sense_rowid FROM temp.{_MOVES})
+    """,
+)
+# A moved sense meeting a sense of the same entry in its new synset is merged into the one that was there before
+_statements.register(
+    "reorganize.find_moved_sense_merges",
+    f"""
+    INSERT INTO temp.{_SENSE_MERGES} (old_rowid, new_rowid)
+    SELECT rowid, keeper FROM (
+        SELECT s.rowid, first_value(s.rowid) OVER (
+            PARTITION BY s.synset_rowid, s.entry_rowid
+            ORDER BY s.rowid IN (SELECT sense_rowid FROM temp.{_MOVES}), s.rowid
+        ) AS keeper
+        FROM senses AS s
+        WHERE s.synset_rowid IN (
+            SELECT synset_rowid FROM senses WHERE rowid IN (SELECT sense_rowid FROM temp.{_MOVES})
+        )
+    )
+    WHERE rowid != keeper
+    """,
+)
+
+
+def _duplicates(table: str, key: list[str], where: str) -> str:
+    return f"""
+    DELETE FROM {table} WHERE rowid IN (
+        SELECT r.rowid FROM {table} AS r
+        WHERE ({where})
+        AND EXISTS (
+            SELECT 1 FROM {table} AS d WHERE {" AND ".join(f"d.{c} = r.{c}" for c in key)} AND d.rowid < r.rowid
+        )
+    )
+    """
+
+
+_DUPLICATES = {
+    "synset_relations": _duplicates(
+        "synset_relations", _RELATION_KEY, f"r.source_rowid IN ({_NEW_SYNSETS}) OR r.target_rowid IN ({_NEW_SYNSETS})"
+    ),
+    "sense_relations": _duplicates(
+        "sense_relations", _RELATION_KEY, f"r.source_rowid IN ({_NEW_SENSES}) OR r.target_rowid IN ({_NEW_SENSES})"
+    ),
+    "sense_synset_relations": _duplicates(
+        "sense_synset_relations",
+        _RELATION_KEY,
+        f"r.source_rowid IN ({_NEW_SENSES}) OR r.target_rowid IN ({_NEW_SYNSETS})",
+    ),
+    "syntactic_behaviour_senses": _duplicates(
+        "syntactic_behaviour_senses", ["syntactic_behaviour_rowid", "sense_rowid"], f"r.sense_rowid IN ({_NEW_SENSES})"
+    ),
+    "adjpositions": _duplicates("adjpositions", ["sense_rowid", "adjposition"], f"r.sense_rowid IN ({_NEW_SENSES})"),
+}
+for _table, _sql in _DUPLICATES.items():
+    _statements.register(f"reorganize.delete_duplicates.{_table}", _sql)
+_statements.register(
+    "reorganize.delete_merged_synsets", f"DELETE FROM synsets WHERE rowid IN (SELECT old_rowid FROM temp.{_MERGES})"
+)
+
+_statements.register(
+    "reorganize.copy_pos", "UPDATE synsets SET pos = (SELECT s.pos FROM synsets AS s WHERE s.rowid = ?) WHERE rowid = ?"
+)
+_statements.register("reorganize.move_sense", "UPDATE senses SET synset_rowid = ? WHERE rowid = ? AND synset_rowid = ?")
+_statements.register(
+    "reorganize.senses_modified",
+    "UPDATE lexicons SET modified = 1 WHERE rowid IN (SELECT lexicon_rowid FROM senses WHERE synset_rowid = ?)",
+)
+
+
+def _synset_rowid(synset: wn.Synset | SynsetEditor | int) -> int:
+    if isinstance(synset, wn.Synset):
+        return SynsetEditor(synset).rowid
+    if isinstance(synset, SynsetEditor):
+        return synset.rowid
+    return synset
+
+
+def _sense_rowid(sense: wn.Sense | SenseEditor | int) -> int:
+    if isinstance(sense, wn.Sense):
+        return SenseEditor(sense).row_id
+    if isinstance(sense, SenseEditor):
+        return sense.row_id
+    return sense
+
+
+def _targets(pairs: Iterable[tuple[wn.Synset | SynsetEditor | int, wn.Synset | SynsetEditor | int]]) -> dict[int, int]:
+    """
+    Maps the rowid of every merged synset to its final target, following chains like a -> b, b -> c
+    """
+    targets: dict[int, int] = {}
+    for old, new in pairs:
+        old, new = _synset_rowid(old), _synset_rowid(new)
+        if targets.setdefault(old, new) != new:
+            raise AttributeError(f"Synset {old} cannot be merged into both {targets[old]} and {new}")
+    final = {}
+    for old, new in targets.items():
+        seen = {old}
+        while new in targets:
+            if new in seen:
+                raise AttributeError(f"Synset {old} would be merged into itself")
+            seen.add(new)
+            new = targets[new]
+        final[old] = new
+    return final
+
+
+def _prepare(conn) -> None:
+    for table in (_MERGES, _SENSE_MERGES, _MOVES):
+        _statements.execute(conn, f"reorganize.create.{table}")
+        _statements.execute(conn, f"reorganize.clear.{table}")
+
+
+def _merge_senses(conn) -> int:
+    """
+    Moves everything referring to the senses in the sense mapping to their new senses and deletes them
+    """
+    for table, column in _SENSE_REFERENCES:
+        _statements.execute(conn, f"reorganize.redirect.{table}.{column}")
+    search._owners_moved(conn, _SENSE_MERGES, (search.TextKind.sense_example,))
+    return _statements.execute(conn, "reorganize.delete_merged_senses").rowcount
+
+
+def _drop_duplicates(conn) -> int:
+    """
+    Deletes the self-loops and repeated rows created by the mappings and returns the number of dropped relations
+    """
+    dropped = 0
+    for name in ("delete_synset_loops", "delete_sense_loops", "delete_duplicates.synset_relations",
+                 "delete_duplicates.sense_relations", "delete_duplicates.sense_synset_relations"):
+        dropped += _statements.execute(conn, f"reorganize.{name}").rowcount
+    _statements.execute(conn, "reorganize.delete_duplicates.syntactic_behaviour_senses")
+    _statements.execute(conn, "reorganize.delete_duplicates.adjpositions")
+    return dropped
+
+
+def merge_synsets(
+        pairs: Iterable[tuple[wn.Synset | SynsetEditor | int, wn.Synset | SynsetEditor | int]],
+        chunk_size: int = 10000,
+) -> dict[str, int]:
+    """
+
+    Merges every first synset of the (merged, target) pairs into the second one and deletes it. Its senses,
+    definitions, examples, proposed ILI and incoming and outgoing relations are moved to the target, which also gets
+    its ILI if it has none. Senses of the same entry that end up in the same synset are merged into one, with all
+    their relations, examples, counts and frames. Relations that now connect a synset or sense to itself and
+    repeated relations are dropped. Returns the number of merged synsets, moved senses, merged (duplicate) senses and
+    dropped relations.
+
+    >>> merge_synsets([(car, automobile), (motorcar, automobile)])
+    {'synsets': 2, 'senses': 3, 'duplicate_senses': 1, 'dropped_relations': 4}
+
+    """
+    targets = _targets(pairs)
+    counts = dict.fromkeys(("synsets", "senses", "duplicate_senses", "dropped_relations"), 0)
+    if not targets:
+        return counts
+    with transaction() as conn:
+        _prepare(conn)
+        for chunk in _chunks(targets.items(), chunk_size):
+            _statements.executemany(conn, "reorganize.insert_merge", chunk)
+        missing = _statements.execute(conn, "reorganize.missing_synsets").fetchall()
+        if missing:
+            raise AttributeError(f"Synsets of {len(missing)} pairs do not exist, e.g. {missing[0]}")
+        _statements.execute(conn, "reorganize.set_modified")
+
+        _statements.execute(conn, "reorganize.find_sense_merges")
+        counts["duplicate_senses"] = _merge_senses(conn)
+        for table, column in _SYNSET_REFERENCES:
+            cur = _statements.execute(conn, f"reorganize.redirect.{table}.{column}")
+            if table == "senses":
+                counts["senses"] = cur.rowcount
+        _statements.execute(conn, "reorganize.merge_ilis")
+        _statements.execute(conn, "reorganize.set_lexicalized")
+
+        counts["dropped_relations"] = _drop_duplicates(conn)
+        counts["synsets"] = _statements.execute(conn, "reorganize.delete_merged_synsets").rowcount
+        search._owners_moved(conn, _MERGES, (search.TextKind.definition, search.TextKind.synset_example))
+        closure._synsets_changed(conn, {*targets, *targets.values()})
+        for guard in cycles._guards().values():
+            guard.load()
+    return counts
+
+
+def split_synset(
+        synset: wn.Synset | SynsetEditor | int, senses: Iterable[wn.Sense | SenseEditor | int]
+) -> SynsetEditor:
+    """
+
+    Moves senses of a synset into a new synset of the same lexicon and part of speech and returns its editor. The
+    senses keep their relations, examples and counts; definitions, examples, the ILI and the relations of the synset
+    stay with the original synset.
+
+    >>> animal = split_synset(bat, [bat_animal_sense])
+    >>> animal.add_definition("nocturnal mouselike mammal")
+
+    """
+    source = synset if isinstance(synset, SynsetEditor) else SynsetEditor.from_rowid(_synset_rowid(synset))
+    if source is None:
+        raise AttributeError(f"Synset {synset} does not exist")
+    sense_rowids = list(dict.fromkeys(_sense_rowid(sense) for sense in senses))
+    if not sense_rowids:
+        raise AttributeError("No senses to split off")
+    with transaction() as conn:
+        target = SynsetEditor(source.lex_rowid)
+        _statements.execute(conn, "reorganize.copy_pos", (source.rowid, target.rowid))
+        moved = _statements.executemany(
+            conn, "reorganize.move_sense", [(target.rowid, rowid, source.rowid) for rowid in sense_rowids]
+        ).rowcount
+        if moved != len(sense_rowids):
+            raise AttributeError(f"{len(sense_rowids) - moved} of the senses are not part of synset {source.rowid}")
+        _statements.execute(conn, "reorganize.senses_modified", (target.rowid,))
+    return target
+
+
+def _entry_rowid(entry: wn.Word | EntryEditor | int) -> int:
+    if isinstance(entry, wn.Word):
+        lex_rowid = get_row_id("lexicons", {"id": entry.lexicon().id, "version": entry.lexicon().version})
+        return get_row_id("entries", {"id": entry.id, "lexicon_rowid": lex_rowid})
+    if isinstance(entry, EntryEditor):
+        return entry.entry_id
+    return entry
+
+
+def move_senses(
+        moves: Iterable[
+            tuple[
+                wn.Sense | SenseEditor | int,
+                Optional[wn.Synset | SynsetEditor | int],
+                Optional[wn.Word | EntryEditor | int],
+            ]
+        ],
+        chunk_size: int = 10000,
+) -> dict[str, int]:
+    """
+
+    Moves senses to other synsets and/or entries, given as (sense, new synset, new entry) with ``None`` for the part
+    that stays. The senses keep their rowids and IDs, and with them their relations, examples, counts and frames. New
+    entries must belong to the lexicon of the sense. A moved sense that meets a sense of the same entry in its new
+    synset is merged into that one. Synsets and entries left without senses are kept (see
+    :func:`wn_editor.validate.validate_lexicon`). The modified flag of every affected lexicon is set once. Returns the
+    number of moved senses, merged (duplicate) senses and dropped relations.
+
+    >>> move_senses([(bank_river, shore, None), (bank_money, None, bank_noun_entry)])
+    {'senses': 2, 'duplicate_senses': 0, 'dropped_relations': 0}
+
+    """
+    counts = dict.fromkeys(("senses", "duplicate_senses", "dropped_relations"), 0)
+    with transaction() as conn:
+        _prepare(conn)
+        for chunk in _chunks(moves, chunk_size):
+            _statements.executemany(
+                conn,
+                "reorganize.insert_move",
+                [
+                    (
+                        _sense_rowid(sense),
+                        None if synset is None else _synset_rowid(synset),
+                        None if entry is None else _entry_rowid(entry),
+                    )
+                    for sense, synset, entry in chunk
+                ],
+            )
+        invalid = _statements.execute(conn, "reorganize.invalid_moves").fetchall()
+        if invalid:
+            raise AttributeError(
+                f"{len(invalid)} senses do not exist or are moved to a missing synset or an entry of another lexicon, "
+                f"e.g. sense {invalid[0][0]}"
+            )
+        _statements.execute(conn, "reorganize.moves_modified")
+        counts["senses"] = _statements.execute(conn, "reorganize.move_senses").rowcount
+        _statements.execute(conn, "reorganize.find_moved_sense_merges")
+        counts["duplicate_senses"] = _merge_senses(conn)
+        counts["dropped_relations"] = _drop_duplicates(conn)
+    return counts
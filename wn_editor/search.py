@@ -0,0 +1,253 @@
+"""
+Optional FTS5 full-text index over definitions and synset and sense examples.
+
+Once enabled with :func:`enable_text_index` the index is stored in the editor index database and updated by the
+definition and example methods of the editors. :func:`search` runs a full-text query and returns editor handles of the
+matching synsets and senses. Rows changed without the editors (e.g. deleted together with their synset) are detected
+when they are found and corrected in the index; :func:`rebuild_text_index` rebuilds the whole index.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+from enum import IntEnum
+from typing import NamedTuple, Optional
+
+import wn
+
+from wn_editor.editor import (
+    INDEX_DATABASE,
+    LexiconEditor,
+    SenseEditor,
+    SynsetEditor,
+    _commit,
+    _connection,
+    _index_tables,
+    _qs,
+    _statements,
+    connect,
+)
+
+TABLE = "text_index"
+
+
+class TextKind(IntEnum):
+    definition = 1
+    synset_example = 2
+    sense_example = 3
+
+
+# kind -> (table, text column, owner column)
+_SOURCES = {
+    TextKind.definition: ("definitions", "definition", "synset_rowid"),
+    TextKind.synset_example: ("synset_examples", "example", "synset_rowid"),
+    TextKind.sense_example: ("sense_examples", "example", "sense_rowid"),
+}
+
+
+def _key(kind: TextKind, rowid: int) -> int:
+    """
+    The rowid in the index of a row of one of the source tables
+    """
+    return rowid * 4 + kind
+
+
+_statements.register(
+    "search.create",
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {INDEX_DATABASE}.{TABLE}
+    USING fts5(text, kind UNINDEXED, owner_rowid UNINDEXED, lexicon_rowid UNINDEXED)
+    """,
+)
+_statements.register("search.drop", f"DROP TABLE IF EXISTS {INDEX_DATABASE}.{TABLE}")
+_statements.register("search.clear", f"DELETE FROM {INDEX_DATABASE}.{TABLE}")
+_statements.register(
+    "search.fill",
+    f"INSERT INTO {INDEX_DATABASE}.{TABLE} (rowid, text, kind, owner_rowid, lexicon_rowid) "
+    + " UNION ALL ".join(
+        f"SELECT rowid * 4 + {kind.value}, {column}, {kind.value}, {owner}, lexicon_rowid FROM main.{table} "
+        f"WHERE {column} IS NOT NULL"
+        for kind, (table, column, owner) in _SOURCES.items()
+    ),
+)
+_statements.register(
+    "search.insert",
+    f"INSERT OR REPLACE INTO {INDEX_DATABASE}.{TABLE} (rowid, text, kind, owner_rowid, lexicon_rowid) "
+    "VALUES (?,?,?,?,?)",
+)
+_statements.register("search.set_text", f"UPDATE {INDEX_DATABASE}.{TABLE} SET text = ? WHERE rowid = ?")
+_statements.register("search.delete", f"DELETE FROM {INDEX_DATABASE}.{TABLE} WHERE rowid = ?")
+_statements.register(
+    "search.match",
+    f"""
+    SELECT rowid, text, kind, owner_rowid FROM {INDEX_DATABASE}.{TABLE}
+    WHERE {TABLE} MATCH ? ORDER BY rank LIMIT ?
+    """,
+)
+_statements.register(
+    "search.match_lexicon",
+    f"""
+    SELECT rowid, text, kind, owner_rowid FROM {INDEX_DATABASE}.{TABLE}
+    WHERE {TABLE} MATCH ? AND lexicon_rowid = ? ORDER BY rank LIMIT ?
+    """,
+)
+for _kind, (_table, _column, _owner) in _SOURCES.items():
+    _statements.register(
+        f"search.rowids.{_table}",
+        f"SELECT rowid FROM {_table} WHERE lexicon_rowid = ? AND {_owner} = ? AND {_column} = ?",
+    )
+
+
+class SearchHit(NamedTuple):
+    kind: TextKind
+    text: str
+    editor: SynsetEditor | SenseEditor
+
+
+def _enabled(conn: sqlite3.Connection) -> bool:
+    return TABLE in _index_tables(conn)
+
+
+def _text_added(
+        conn: sqlite3.Connection, kind: TextKind, rowid: int, owner_rowid: int, lex_rowid: int, text: Optional[str]
+) -> None:
+    if text is not None and _enabled(conn):
+        _statements.execute(conn, "search.insert", (_key(kind, rowid), text, kind.value, owner_rowid, lex_rowid))
+
+
+def _text_changed(conn: sqlite3.Connection, kind: TextKind, rowid: int, text: Optional[str]) -> None:
+    if _enabled(conn):
+        _statements.execute(conn, "search.set_text", (text, _key(kind, rowid)))
+
+
+def _rowids(conn: sqlite3.Connection, kind: TextKind, lex_rowid: int, owner_rowid: int, text: str) -> list[int]:
+    """
+    Returns the rowids of the rows about to be deleted by text, only if the index is enabled
+    """
+    if not _enabled(conn):
+        return []
+    name = f"search.rowids.{_SOURCES[kind][0]}"
+    return [r[0] for r in _statements.execute(conn, name, (lex_rowid, owner_rowid, text)).fetchall()]
+
+
+def _texts_deleted(conn: sqlite3.Connection, kind: TextKind, rowids: list[int]) -> None:
+    if rowids:
+        _statements.executemany(conn, "search.delete", [(_key(kind, rowid),) for rowid in rowids])
+
+
+def _owners_moved(conn: sqlite3.Connection, mapping: str, kinds: tuple[TextKind, ...]) -> None:
+    """
+    Moves the texts of the given kinds to new owners, given by a temporary table with old_rowid and new_rowid columns
+    """
+    if _enabled(conn):
+        name = _statements.register(
+            f"search.move_owners.{mapping}",
+            f"""
+            UPDATE {INDEX_DATABASE}.{TABLE}
+            SET owner_rowid = (SELECT m.new_rowid FROM temp.{mapping} AS m WHERE m.old_rowid = owner_rowid)
+            WHERE kind IN ({",".join(str(kind.value) for kind in kinds)})
+            AND owner_rowid IN (SELECT old_rowid FROM temp.{mapping})
+            """,
+        )
+        _statements.execute(conn, name)
+
+
+def _verify(conn: sqlite3.Connection, hits: list[tuple[int, str, int, int]]) -> list[tuple[int, str, int, int]]:
+    """
+    Drops hits whose source row is gone or was changed without the editors and corrects them in the index
+    """
+    current = {}
+    for kind, (table, column, owner) in _SOURCES.items():
+        rowids = [key // 4 for key, _, k, _ in hits if k == kind]
+        if rowids:
+            name = _statements.register(
+                f"search.verify.{table}.{len(rowids)}",
+                f"SELECT rowid, {column}, {owner} FROM {table} WHERE rowid IN ({_qs(rowids)})",
+            )
+            for rowid, text, owner_rowid in _statements.execute(conn, name, rowids).fetchall():
+                current[_key(kind, rowid)] = (text, owner_rowid)
+    valid = []
+    for key, text, kind, owner_rowid in hits:
+        if current.get(key) == (text, owner_rowid):
+            valid.append((key, text, kind, owner_rowid))
+        elif key in current:
+            _statements.execute(conn, "search.set_text", (current[key][0], key))
+        else:
+            _statements.execute(conn, "search.delete", (key,))
+    return valid
+
+
+def text_index_enabled() -> bool:
+    """
+    Returns whether the full-text index is enabled for the current database
+    """
+    return _enabled(connect())
+
+
+def enable_text_index() -> None:
+    """
+
+    Creates the full-text index in the editor index database and fills it. From then on the definition and example
+    methods of the editors keep it up to date.
+
+    """
+    with _connection() as conn:
+        tables = _index_tables(conn)
+        _statements.execute(conn, "search.create")
+        tables.add(TABLE)
+        _statements.execute(conn, "search.fill")
+        _commit(conn)
+
+
+def disable_text_index() -> None:
+    """
+    Drops the full-text index
+    """
+    with _connection() as conn:
+        tables = _index_tables(conn)
+        if TABLE in tables:
+            _statements.execute(conn, "search.drop")
+            tables.discard(TABLE)
+            _commit(conn)
+
+
+def rebuild_text_index() -> None:
+    """
+    Refills the full-text index from the definitions and examples in the database
+    """
+    with _connection() as conn:
+        if not _enabled(conn):
+            raise wn.Error("The text index is not enabled, see enable_text_index()")
+        _statements.execute(conn, "search.clear")
+        _statements.execute(conn, "search.fill")
+        _commit(conn)
+
+
+def search(query: str, lexicon: Optional[LexiconEditor | str | int] = None, limit: int = 50) -> list[SearchHit]:
+    """
+
+    Runs an FTS5 query over all definitions and examples (of one lexicon) and returns the best matches first, each with
+    a :class:`SynsetEditor` (definitions and synset examples) or :class:`SenseEditor` (sense examples).
+
+    >>> search('"domestic dog"', "odenet")
+    [SearchHit(kind=<TextKind.definition: 1>, text='a member of the genus Canis ...', editor=<SynsetEditor ...>)]
+
+    """
+    with _connection() as conn:
+        if not _enabled(conn):
+            raise wn.Error("The text index is not enabled, see enable_text_index()")
+        if lexicon is None:
+            hits = _statements.execute(conn, "search.match", (query, limit)).fetchall()
+        else:
+            lex_rowid = (lexicon if isinstance(lexicon, LexiconEditor) else LexiconEditor(lexicon)).lex_rowid
+            hits = _statements.execute(conn, "search.match_lexicon", (query, lex_rowid, limit)).fetchall()
+        hits = _verify(conn, hits)
+        _commit(conn)
+    return [
+        SearchHit(
+            TextKind(kind),
+            text,
+            SenseEditor.from_rowid(owner_rowid) if kind == TextKind.sense_example else SynsetEditor.from_rowid(owner_rowid),
+        )
+        for _, text, kind, owner_rowid in hits
+    ]
@@ -0,0 +1,273 @@
+"""
+Set-based integrity checks for lexicons edited with the editors in :mod:`wn_editor.editor`.
+"""
+
+from __future__ import annotations
+
+from typing import NamedTuple, Optional
+
+from wn_editor.editor import (
+    INVERSE_RELATIONS,
+    LexiconEditor,
+    _bulk_changed,
+    _commit,
+    _connection,
+    _statements,
+    transaction,
+)
+
+
+class _Check(NamedTuple):
+    name: str
+    description: str
+    query: str
+    repair: Optional[str]
+    # The repair deletes rows that still hold data (and not just broken references or placeholders)
+    destructive: bool
+
+
+_INVERSE_CTE = "WITH inverse(type_rowid, inverse_rowid) AS (VALUES %s)" % ",".join(
+    f"({rt.value},{inv.value})" for rt, inv in INVERSE_RELATIONS.items()
+)
+
+_DANGLING_RELATIONS = {
+    "synset_relations": ("synsets", "synsets"),
+    "sense_relations": ("senses", "senses"),
+    "sense_synset_relations": ("senses", "synsets"),
+}
+
+_CHECKS: list[_Check] = []
+
+
+def _check(name: str, description: str, query: str, repair: Optional[str] = None, destructive: bool = False) -> None:
+    _CHECKS.append(
+        _Check(
+            name,
+            description,
+            _statements.register(f"validate.{name}", query),
+            _statements.register(f"validate.{name}.repair", repair) if repair else None,
+            destructive,
+        )
+    )
+
+
+_PLACEHOLDER_FORMS = """
+    SELECT rowid, entry_rowid FROM forms WHERE lexicon_rowid = ? AND form = '_'
+"""
+_check(
+    "placeholder_forms",
+    "Forms still carrying the '_' placeholder of FormEditor._create",
+    _PLACEHOLDER_FORMS,
+    f"DELETE FROM forms WHERE rowid IN (SELECT rowid FROM ({_PLACEHOLDER_FORMS}))",
+)
+
+for _table, (_source, _target) in _DANGLING_RELATIONS.items():
+    _dangling = f"""
+        SELECT r.rowid, r.source_rowid, r.target_rowid, r.type_rowid FROM {_table} AS r
+        WHERE r.lexicon_rowid = ?
+        AND (NOT EXISTS (SELECT 1 FROM {_source} AS s WHERE s.rowid = r.source_rowid)
+             OR NOT EXISTS (SELECT 1 FROM {_target} AS t WHERE t.rowid = r.target_rowid)
+             OR NOT EXISTS (SELECT 1 FROM relation_types AS rt WHERE rt.rowid = r.type_rowid))
+    """
+    _check(
+        f"dangling_{_table}",
+        f"Rows of {_table} whose source, target or type does not exist",
+        _dangling,
+        f"DELETE FROM {_table} WHERE rowid IN (SELECT rowid FROM ({_dangling}))",
+    )
+
+_ORPHAN_SENSES = """
+    SELECT s.rowid, s.id FROM senses AS s
+    WHERE s.lexicon_rowid = ?
+    AND (NOT EXISTS (SELECT 1 FROM entries AS e WHERE e.rowid = s.entry_rowid)
+         OR NOT EXISTS (SELECT 1 FROM synsets AS ss WHERE ss.rowid = s.synset_rowid))
+"""
+_check(
+    "orphan_senses",
+    "Senses whose entry or synset does not exist",
+    _ORPHAN_SENSES,
+    f"DELETE FROM senses WHERE rowid IN (SELECT rowid FROM ({_ORPHAN_SENSES}))",
+)
+
+_ENTRIES_WITHOUT_SENSES = """
+    SELECT e.rowid, e.id FROM entries AS e
+    WHERE e.lexicon_rowid = ?
+    AND NOT EXISTS (SELECT 1 FROM senses AS s WHERE s.entry_rowid = e.rowid)
+"""
+_check(
+    "entries_without_senses",
+    "Entries that are not part of any sense (e.g. left behind by SynsetEditor.delete_word)",
+    _ENTRIES_WITHOUT_SENSES,
+    f"DELETE FROM entries WHERE rowid IN (SELECT rowid FROM ({_ENTRIES_WITHOUT_SENSES}))",
+    destructive=True,
+)
+_check(
+    "entries_without_forms",
+    "Entries without any form and therefore without a lemma",
+    """
+    SELECT e.rowid, e.id FROM entries AS e
+    WHERE e.lexicon_rowid = ?
+    AND NOT EXISTS (SELECT 1 FROM forms AS f WHERE f.entry_rowid = e.rowid AND f.form != '_')
+    """,
+)
+_check(
+    "synsets_without_senses",
+    "Lexicalized synsets without any sense",
+    """
+    SELECT ss.rowid, ss.id FROM synsets AS ss
+    WHERE ss.lexicon_rowid = ? AND ss.lexicalized = 1
+    AND NOT EXISTS (SELECT 1 FROM senses AS s WHERE s.synset_rowid = ss.rowid)
+    """,
+)
+_check(
+    "duplicate_synset_ids",
+    "Synset IDs used more than once in the lexicon",
+    "SELECT id, count(*) FROM synsets WHERE lexicon_rowid = ? GROUP BY id HAVING count(*) > 1",
+)
+_check(
+    "duplicate_sense_ids",
+    "Sense IDs used more than once in the lexicon",
+    "SELECT id, count(*) FROM senses WHERE lexicon_rowid = ? GROUP BY id HAVING count(*) > 1",
+)
+
+for _table in _DANGLING_RELATIONS:
+    # All but the first of the rows with the same source, target and type
+    _duplicates = f"""
+        SELECT r.rowid, r.source_rowid, r.target_rowid, r.type_rowid FROM {_table} AS r
+        WHERE r.lexicon_rowid = ?
+        AND EXISTS (
+            SELECT 1 FROM {_table} AS d
+            WHERE d.source_rowid = r.source_rowid AND d.target_rowid = r.target_rowid AND d.type_rowid = r.type_rowid
+            AND d.lexicon_rowid = r.lexicon_rowid AND d.rowid < r.rowid
+        )
+    """
+    _check(
+        f"duplicate_{_table}",
+        f"Rows of {_table} repeating the source, target and type of an earlier row",
+        _duplicates,
+        f"DELETE FROM {_table} WHERE rowid IN (SELECT rowid FROM ({_duplicates}))",
+    )
+
+for _table in ("synset_relations", "sense_relations"):
+    _missing = f"""
+        {_INVERSE_CTE}
+        SELECT DISTINCT r.lexicon_rowid, r.target_rowid, r.source_rowid, inverse.inverse_rowid
+        FROM {_table} AS r JOIN inverse ON inverse.type_rowid = r.type_rowid
+        WHERE r.lexicon_rowid = ?
+        AND NOT EXISTS (
+            SELECT 1 FROM {_table} AS i
+            WHERE i.source_rowid = r.target_rowid AND i.target_rowid = r.source_rowid
+            AND i.type_rowid = inverse.inverse_rowid
+        )
+    """
+    _check(
+        f"missing_inverse_{_table}",
+        f"Rows of {_table} without the row of the inverse relation type",
+        _missing,
+        f"""
+        INSERT INTO {_table} (lexicon_rowid, source_rowid, target_rowid, type_rowid)
+        SELECT * FROM ({_missing})
+        """,
+    )
+
+
+class ValidationReport:
+    """
+
+    The result of :func:`validate_lexicon`. ``issues`` maps the name of every check to the offending rows,
+    ``repaired`` maps the name of every repaired check to the number of rows changed.
+
+    """
+
+    def __init__(self, lex_rowid: int) -> None:
+        self.lex_rowid = lex_rowid
+        self.issues: dict[str, list[tuple]] = {}
+        self.repaired: dict[str, int] = {}
+
+    @property
+    def ok(self) -> bool:
+        return not any(self.issues.values())
+
+    def summary(self) -> dict[str, int]:
+        """
+        Returns the number of issues per check
+        """
+        return {name: len(rows) for name, rows in self.issues.items()}
+
+    def __str__(self) -> str:
+        descriptions = {check.name: check.description for check in _CHECKS}
+        lines = [f"Lexicon {self.lex_rowid}: " + ("OK" if self.ok else "issues found")]
+        for name, count in self.summary().items():
+            if count:
+                line = f"  {name}: {count}\t{descriptions[name]}"
+                if name in self.repaired:
+                    line += f" (repaired {self.repaired[name]})"
+                lines.append(line)
+        return "\n".join(lines)
+
+
+def validate_lexicon(
+        lexicon: LexiconEditor | str | int, repair: bool = False, destructive: bool = False
+) -> ValidationReport:
+    """
+
+    Runs all integrity checks over a lexicon and returns a :class:`ValidationReport`. If ``repair`` is set, every
+    issue that can be fixed without losing data is repaired in a single transaction: placeholder forms, dangling and
+    duplicate relations and orphaned senses are deleted, and missing inverse relations are added. Entries without
+    senses (with their forms, pronunciations and tags) are only deleted if ``destructive`` is set as well.
+
+    """
+    if not isinstance(lexicon, LexiconEditor):
+        lexicon = LexiconEditor(lexicon)
+    report = ValidationReport(lexicon.lex_rowid)
+    with _connection() as conn:
+        for check in _CHECKS:
+            report.issues[check.name] = _statements.execute(conn, check.query, (lexicon.lex_rowid,)).fetchall()
+    if repair and not report.ok:
+        with _connection() as conn:
+            for check in _CHECKS:
+                if check.repair and report.issues[check.name] and (destructive or not check.destructive):
+                    cur = _statements.execute(conn, check.repair, (lexicon.lex_rowid,))
+                    report.repaired[check.name] = cur.rowcount
+            _commit(conn)
+        if report.repaired:
+            lexicon.set_modified()
+            _repaired(lexicon.lex_rowid, report.repaired)
+    return report
+
+
+def _repaired(lex_rowid: int, repaired: dict[str, int]) -> None:
+    # The repairs delete rows in bulk, past the lemma index, the text index, the closure and the cycle guard (which
+    # counts every copy of a relation)
+    _bulk_changed(
+        lex_rowid,
+        relations=any(count for name, count in repaired.items() if name.endswith("synset_relations")),
+        words=any(count for name, count in repaired.items() if not name.endswith("relations")),
+    )
+
+
+def deduplicate_relations(lexicon: Optional[LexiconEditor | str | int] = None) -> dict[str, int]:
+    """
+
+    Deletes all but the first row of every synset, sense and sense-synset relation that a lexicon (default: every
+    lexicon) has more than once, i.e. repairs only the ``duplicate_*`` checks of :func:`validate_lexicon`, in a single
+    transaction. Returns the number of deleted rows per table. The editors no longer insert duplicates, so this is only
+    needed once for lexicons edited or imported before.
+
+    """
+    checks = [check for check in _CHECKS if check.name.startswith("duplicate_") and check.name.endswith("relations")]
+    deleted = dict.fromkeys((check.name[len("duplicate_"):] for check in checks), 0)
+    with transaction() as conn:
+        if lexicon is None:
+            lexicons = [LexiconEditor(r[0]) for r in _statements.execute(conn, "lexicons.rowids").fetchall()]
+        else:
+            lexicons = [lexicon if isinstance(lexicon, LexiconEditor) else LexiconEditor(lexicon)]
+        for lex in lexicons:
+            repaired = {}
+            for check in checks:
+                repaired[check.name] = _statements.execute(conn, check.repair, (lex.lex_rowid,)).rowcount
+                deleted[check.name[len("duplicate_"):]] += repaired[check.name]
+            if any(repaired.values()):
+                lex.set_modified()
+                _repaired(lex.lex_rowid, repaired)
+    return deleted